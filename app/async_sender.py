@@ -0,0 +1,393 @@
+"""
+Asyncio Campaign Engine
+"""
+import asyncio
+import base64
+import inspect
+import smtplib
+import socket
+import ssl
+from .rate_limiter import recipient_domain
+from .smtp_pipelining import CRLF, encode_message, envelope_commands, check_envelope_replies
+from .smtp_pool import is_connection_error
+
+
+class AsyncSMTPClient:
+    """Minimal SMTP client speaking over asyncio streams"""
+
+    def __init__(self, host, port, timeout=60, local_hostname=None):
+        self.host = host
+        self.port = int(port)
+        self.timeout = timeout
+        self.local_hostname = local_hostname or socket.getfqdn()
+        self.reader = None
+        self.writer = None
+        self.esmtp_features = {}
+
+    async def connect(self):
+        """Open the connection and greet the server"""
+        self.reader, self.writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout
+        )
+        code, message = await self.read_reply()
+        if code != 220:
+            await self.close()
+            raise smtplib.SMTPConnectError(code, message)
+        await self.ehlo()
+
+    async def ehlo(self):
+        """Send EHLO and record the advertised extensions"""
+        code, message = await self.command(f"EHLO {self.local_hostname}")
+        if code != 250:
+            raise smtplib.SMTPHeloError(code, message)
+        self.esmtp_features = {}
+        for line in message.decode("latin-1").split("\n")[1:]:
+            parts = line.strip().split(None, 1)
+            if parts:
+                self.esmtp_features[parts[0].lower()] = parts[1] if len(parts) > 1 else ""
+
+    def has_extn(self, name):
+        """Check whether the server advertised an extension"""
+        return name.lower() in self.esmtp_features
+
+    async def starttls(self, context=None):
+        """Upgrade the connection to TLS and re-issue EHLO"""
+        if not self.has_extn("starttls"):
+            raise smtplib.SMTPNotSupportedError("STARTTLS extension not supported by server.")
+        code, message = await self.command("STARTTLS")
+        if code != 220:
+            raise smtplib.SMTPResponseException(code, message)
+        context = context or ssl.create_default_context()
+        if not hasattr(self.writer, "start_tls"):
+            raise smtplib.SMTPException("STARTTLS over asyncio streams requires Python 3.11+")
+        await self.writer.start_tls(context, server_hostname=self.host)
+        await self.ehlo()
+
+    async def login(self, user, password):
+        """Authenticate with AUTH PLAIN, falling back to AUTH LOGIN"""
+        mechanisms = self.esmtp_features.get("auth", "").upper().split()
+        if "PLAIN" in mechanisms or not mechanisms:
+            token = base64.b64encode(f"\0{user}\0{password}".encode("utf-8")).decode("ascii")
+            code, message = await self.command(f"AUTH PLAIN {token}")
+        else:
+            code, message = await self.command("AUTH LOGIN")
+            if code == 334:
+                code, message = await self.command(base64.b64encode(user.encode("utf-8")).decode("ascii"))
+            if code == 334:
+                code, message = await self.command(base64.b64encode(password.encode("utf-8")).decode("ascii"))
+        if code not in (235, 503):
+            raise smtplib.SMTPAuthenticationError(code, message)
+
+    async def sendmail(self, from_addr, to_addrs, msg):
+        """Send one message; returns refused recipients like smtplib"""
+        if isinstance(to_addrs, str):
+            to_addrs = [to_addrs]
+        if self.has_extn("pipelining"):
+            return await self.sendmail_pipelined(from_addr, to_addrs, msg)
+
+        code, message = await self.command(f"MAIL FROM:<{from_addr}>")
+        if code != 250:
+            await self.rset()
+            raise smtplib.SMTPSenderRefused(code, message, from_addr)
+
+        refused = {}
+        for address in to_addrs:
+            code, message = await self.command(f"RCPT TO:<{address}>")
+            if code not in (250, 251):
+                refused[address] = (code, message)
+        if len(refused) == len(to_addrs):
+            await self.rset()
+            raise smtplib.SMTPRecipientsRefused(refused)
+
+        code, message = await self.command("DATA")
+        if code != 354:
+            await self.rset()
+            raise smtplib.SMTPDataError(code, message)
+
+        self.writer.write(encode_message(msg))
+        await self.writer.drain()
+        code, message = await self.read_reply()
+        if code != 250:
+            await self.rset()
+            raise smtplib.SMTPDataError(code, message)
+        return refused
+
+    async def sendmail_pipelined(self, from_addr, to_addrs, msg):
+        """Send MAIL FROM, RCPT TO and DATA in one round-trip (RFC 2920)"""
+        self.writer.write(envelope_commands(from_addr, to_addrs))
+        await self.writer.drain()
+        replies = [await self.read_reply() for _ in range(len(to_addrs) + 2)]
+        try:
+            refused = check_envelope_replies(from_addr, to_addrs, replies)
+        except smtplib.SMTPException:
+            if replies[-1][0] == 354:
+                # Server accepted DATA anyway; end the empty message before resetting
+                self.writer.write(b"." + CRLF)
+                await self.read_reply()
+            await self.rset()
+            raise
+
+        self.writer.write(encode_message(msg))
+        await self.writer.drain()
+        code, message = await self.read_reply()
+        if code != 250:
+            await self.rset()
+            raise smtplib.SMTPDataError(code, message)
+        return refused
+
+    async def rset(self):
+        """Reset the transaction, ignoring a dropped connection"""
+        try:
+            await self.command("RSET")
+        except (smtplib.SMTPServerDisconnected, ConnectionError, OSError):
+            pass
+
+    async def noop(self):
+        """Send NOOP to check that the session is alive"""
+        return await self.command("NOOP")
+
+    async def quit(self):
+        """Say goodbye and close the connection"""
+        try:
+            await self.command("QUIT")
+        except Exception:
+            pass
+        await self.close()
+
+    async def close(self):
+        """Close the underlying stream"""
+        if self.writer:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except Exception:
+                pass
+        self.reader = self.writer = None
+
+    async def command(self, line):
+        """Send one command line and wait for its reply"""
+        if not self.writer:
+            raise smtplib.SMTPServerDisconnected("please run connect() first")
+        self.writer.write(line.encode("utf-8") + CRLF)
+        await self.writer.drain()
+        return await self.read_reply()
+
+    async def read_reply(self):
+        """Read a (possibly multi-line) reply as (code, message)"""
+        lines = []
+        while True:
+            try:
+                raw = await asyncio.wait_for(self.reader.readline(), self.timeout)
+            except asyncio.TimeoutError:
+                raise smtplib.SMTPServerDisconnected("Timed out waiting for server reply")
+            if not raw:
+                await self.close()
+                raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+            lines.append(raw[4:].strip(b" \t\r\n"))
+            if raw[3:4] != b"-":
+                break
+        try:
+            code = int(raw[:3])
+        except ValueError:
+            code = -1
+        return code, b"\n".join(lines)
+
+
+class AsyncCampaignEngine:
+    """Send a campaign with many messages in flight on a single thread
+
+    ``jobs`` is an iterable of ``(to_email, message)`` pairs that is consumed
+    lazily, so at most ``max_in_flight`` messages exist at any one time. They
+    are spread over ``connections`` SMTP sessions opened with the credentials
+    of ``email_sender`` and paced by ``rate_limiter`` when one is given;
+    ``domain_concurrency`` caps the sends in flight per recipient domain.
+    ``on_sent(to_email)`` and ``on_failed(to_email, error)`` are called as
+    each message completes; both may be plain functions or coroutines.
+    With a ``retry_policy``, transient failures are re-queued after their
+    backoff without holding an in-flight slot, and ``on_retry(to_email,
+    error, delay)`` is called instead of ``on_failed``. Set
+    ``blocking_jobs`` when taking the next job may block (e.g. waiting on a
+    render pool); jobs are then pulled from a worker thread so the event
+    loop keeps serving the sessions meanwhile.
+
+    Each send is booked with ``rate_limiter`` before it takes an in-flight
+    slot, so waiting on a bucket never holds one. Jobs are booked in the
+    order they come, which lets a throttled domain at the head hold up the
+    rest; set ``paced_jobs`` when the jobs already come paced and
+    interleaved (a DomainScheduler built with the same limiter) and only
+    retries are booked here.
+    """
+
+    def __init__(self, email_sender, connections=4, max_in_flight=100,
+                 on_sent=None, on_failed=None, use_tls=True, rate_limiter=None,
+                 domain_concurrency=None, retry_policy=None, on_retry=None, blocking_jobs=False,
+                 paced_jobs=False):
+        self.email_sender = email_sender
+        self.connections = max(1, int(connections))
+        self.max_in_flight = max(self.connections, int(max_in_flight))
+        self.on_sent = on_sent
+        self.on_failed = on_failed
+        self.use_tls = use_tls
+        self.rate_limiter = rate_limiter
+        self.domain_concurrency = int(domain_concurrency or 0)
+        self.retry_policy = retry_policy
+        self.on_retry = on_retry
+        self.blocking_jobs = blocking_jobs
+        self.paced_jobs = paced_jobs
+        self._domain_slots = {}
+        self.stopped = False
+        self._idle = None
+
+    def run(self, jobs):
+        """Run the campaign to completion on the calling thread"""
+        return asyncio.run(self.run_async(jobs))
+
+    def stop(self):
+        """Stop taking new jobs; messages already in flight still finish"""
+        self.stopped = True
+
+    async def run_async(self, jobs):
+        """Coroutine form of ``run``; returns (sent, failed) counts"""
+        # One token per connection slot: None means "not opened yet"
+        self._idle = asyncio.LifoQueue()
+        for _ in range(self.connections):
+            self._idle.put_nowait(None)
+        self.sent = 0
+        self.failed = 0
+        self._domain_slots = {}
+        self._slots = slots = asyncio.Semaphore(self.max_in_flight)
+        self._tasks = tasks = set()
+
+        try:
+            async for to_email, message in self._jobs(jobs):
+                if self.stopped:
+                    break
+                if not self.paced_jobs:
+                    await self._pace(to_email)
+                await slots.acquire()
+                task = asyncio.ensure_future(self._send(to_email, message))
+                tasks.add(task)
+                task.add_done_callback(lambda t: (tasks.discard(t), slots.release()))
+            # Retries scheduled while draining add new tasks to the set
+            while tasks:
+                await asyncio.gather(*list(tasks))
+        finally:
+            while not self._idle.empty():
+                client = self._idle.get_nowait()
+                if client is not None:
+                    await client.quit()
+        return self.sent, self.failed
+
+    async def _jobs(self, jobs):
+        """Iterate ``jobs``, off the event loop when they may block"""
+        if not self.blocking_jobs:
+            for job in jobs:
+                yield job
+            return
+        loop = asyncio.get_running_loop()
+        iterator = iter(jobs)
+        while True:
+            job = await loop.run_in_executor(None, next, iterator, None)
+            if job is None:
+                return
+            yield job
+
+    async def _send(self, to_email, message, attempt=1):
+        """Deliver one message under the per-domain concurrency cap"""
+        domain = recipient_domain(to_email)
+        if not self.domain_concurrency:
+            return await self._deliver(to_email, domain, message, attempt)
+        slots = self._domain_slots.get(domain)
+        if slots is None:
+            slots = self._domain_slots[domain] = asyncio.Semaphore(self.domain_concurrency)
+        async with slots:
+            await self._deliver(to_email, domain, message, attempt)
+
+    async def _retry(self, to_email, message, attempt, delay, error):
+        """Wait out the backoff, then send again under an in-flight slot"""
+        await asyncio.sleep(delay)
+        if self.stopped:
+            self.failed += 1
+            return await self._notify(self.on_failed, to_email, error)
+        await self._pace(to_email)
+        async with self._slots:
+            await self._send(to_email, message, attempt)
+
+    async def _pace(self, to_email):
+        """Wait until ``rate_limiter`` allows one more send to ``to_email``"""
+        if self.rate_limiter:
+            await self.rate_limiter.acquire_async(self.email_sender.email, recipient_domain(to_email))
+
+    async def _deliver(self, to_email, domain, message, attempt=1):
+        """Deliver one message, retrying once on a dropped session"""
+        try:
+            for session_try in (1, 2):
+                client = await self._checkout()
+                try:
+                    await client.sendmail(self.email_sender.email, to_email, message)
+                except Exception as e:
+                    if not is_connection_error(e):
+                        self._idle.put_nowait(client)
+                        raise
+                    await self._discard(client)
+                    if session_try == 2:
+                        raise
+                    continue
+                self._idle.put_nowait(client)
+                break
+        except Exception as e:
+            delay = None
+            if self.retry_policy and not self.stopped:
+                delay = self.retry_policy.decide(to_email, e, attempt)
+            if delay is None:
+                self.failed += 1
+                await self._notify(self.on_failed, to_email, e)
+            else:
+                task = asyncio.ensure_future(
+                    self._retry(to_email, message, attempt + 1, delay, e))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+                await self._notify(self.on_retry, to_email, e, delay)
+        else:
+            self.sent += 1
+            await self._notify(self.on_sent, to_email)
+
+    async def _checkout(self):
+        """Take an idle session, or open one if a free slot comes up first"""
+        client = await self._idle.get()
+        if client is not None:
+            return client
+        try:
+            return await self._open()
+        except Exception:
+            self._idle.put_nowait(None)
+            raise
+
+    async def _open(self):
+        """Open and authenticate a new session"""
+        sender = self.email_sender
+        client = AsyncSMTPClient(sender.server_address, sender.port)
+        await client.connect()
+        try:
+            if self.use_tls:
+                await client.starttls()
+            if sender.password:
+                await client.login(sender.email, sender.password)
+        except Exception:
+            await client.close()
+            raise
+        return client
+
+    async def _discard(self, client):
+        """Drop a dead session and free its slot"""
+        self._idle.put_nowait(None)
+        await client.close()
+
+    @staticmethod
+    async def _notify(callback, *args):
+        """Invoke a sync or async completion callback"""
+        if callback is None:
+            return
+        result = callback(*args)
+        if inspect.isawaitable(result):
+            await result
@@ -0,0 +1,341 @@
+"""
+Campaign Runner
+"""
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from .async_sender import AsyncCampaignEngine
+from .rate_limiter import RateLimiter
+from .scheduler import DomainScheduler
+from .image_cache import ImagePartCache
+from .template_engine import CompiledTemplate
+from .outbox import PENDING, SENT, FAILED, SUPPRESSED
+from .retry import RetryPolicy, error_code
+from .render_pool import RenderPipeline, MESSAGE_KEY
+from .recipient_source import iter_chunks
+from .suppression import SuppressionList
+from .dedupe import Deduplicator
+from .validation import Validator
+
+
+# Recipient key counting the sends tried so far
+ATTEMPT_KEY = "_attempt"
+
+
+class CampaignRunner:
+    """Send one campaign through an EmailSender, with no UI dependencies
+
+    Every recipient is recorded in ``outbox`` so the campaign can be
+    resumed. Progress is reported through optional callbacks, called from
+    the sending threads: ``log(message)``, ``on_sent(email)``,
+    ``on_failed(email, error)``, ``on_retry(email, error, delay)`` and
+    ``on_skipped(count, reason)`` for recipients never sent because they
+    are "suppressed", a "duplicate" or fail validation ("invalid",
+    "disposable", "no-mx").
+    Both the Send tab and the command-line runner drive campaigns this way.
+    """
+
+    def __init__(self, email_sender, config_manager, outbox, log=None,
+                 on_sent=None, on_failed=None, on_retry=None, on_skipped=None):
+        self.email_sender = email_sender
+        self.config_manager = config_manager
+        self.outbox = outbox
+        self.log = log or (lambda message: None)
+        self.on_sent = on_sent
+        self.on_failed = on_failed
+        self.on_retry = on_retry
+        self.on_skipped = on_skipped
+        self.campaign_id = None
+        self.success_count = 0
+        self.failed_count = 0
+        self.retry = None
+        self._stoppable = None
+
+    def run(self, subject, body, recipients, attached_image=None, campaign_id=None,
+            rate_limiter=None):
+        """Send to every recipient; returns (sent, failed) counts
+
+        ``rate_limiter`` replaces the one built from the settings, e.g. one
+        shared by every account of a sharded campaign.
+        """
+        self.success_count = 0
+        self.failed_count = 0
+        self.count_lock = threading.Lock()
+        config = self.config_manager
+        sender = self.email_sender
+
+        # Transient failures go back on the schedule instead of being dropped
+        self.retry = RetryPolicy.from_config(config)
+
+        # Known up front when resuming or sharding, so rows the validator
+        # rejects below can be closed in the outbox
+        self.campaign_id = campaign_id
+
+        # Default subject if empty
+        final_subject = subject if subject.strip() else f"Campaign - {datetime.now().strftime('%Y-%m-%d')}"
+
+        streaming = not isinstance(recipients, list)
+        chunk_size = getattr(recipients, "chunk_size", 1000)
+
+        # Normalize addresses, drop repeats and undeliverable addresses
+        # before anything is recorded
+        dedupe = Deduplicator.from_config(config)
+        if dedupe is not None:
+            recipients = dedupe.filter(recipients, self.duplicate)
+        validator = Validator.from_config(config)
+        if validator is not None:
+            recipients = validator.filter(recipients, self.rejected)
+        if not streaming and not isinstance(recipients, list):
+            recipients = list(recipients)
+
+        # Record every recipient as pending so a crash can be resumed. A list
+        # is recorded up front; a lazy source (RecipientSource) is streamed and
+        # recorded chunk by chunk as it is read, so sending starts at once.
+        record = campaign_id is None and streaming
+        if campaign_id is None:
+            campaign_id = self.outbox.create_campaign(
+                subject, body, [] if streaming else recipients, attached_image
+            )
+        self.campaign_id = campaign_id
+        chunks = self.stream(recipients, campaign_id if record else None, chunk_size) if streaming else [recipients]
+
+        # Unsubscribed and bounced addresses are dropped before rendering
+        suppression = SuppressionList.from_config(config)
+        if suppression is not None:
+            self.log(f"🚫 Checking {len(suppression)} suppressed addresses")
+            if streaming:
+                chunks = (self.suppress(suppression, chunk) for chunk in chunks)
+            else:
+                recipients = self.suppress(suppression, recipients)
+                chunks = [recipients]
+
+        # Handle embedded images
+        embedded_images = None
+        if attached_image:
+            embedded_images = {'attached_image': attached_image}
+
+        # Image parts are read and encoded once per campaign
+        sender.image_cache = ImagePartCache.from_config(config)
+
+        # Placeholders are parsed once; each recipient is a single join
+        template = CompiledTemplate(body)
+
+        # Headers, boundaries and images are serialized once for the whole campaign
+        compiled = sender.compile_message(final_subject, embedded_images)
+
+        # Optionally render in worker processes, ahead of the senders
+        pipeline = RenderPipeline.from_config(config, template, compiled)
+        if pipeline is not None:
+            self.log(f"🧮 Rendering in {pipeline.workers} worker processes")
+
+        limiter = rate_limiter if rate_limiter is not None else RateLimiter.from_config(config)
+        try:
+            pool_size = max(1, int(config.get("pool_size", "1")))
+        except ValueError:
+            pool_size = 1
+
+        if streaming:
+            self.log("🚀 Starting campaign: streaming recipients")
+        else:
+            self.log(f"🚀 Starting campaign: {len(recipients)} emails")
+
+        # Interleave domains so one provider's throttling never stalls the others
+        feeding = streaming or pipeline is not None
+        scheduler = DomainScheduler.from_config(
+            [] if feeding else recipients, config,
+            rate_limiter=limiter, account=sender.email
+        )
+        self._stoppable = [scheduler]
+        if feeding:
+            # The scheduler doubles as the bounded queue between the
+            # reader/renderer and the senders
+            lookahead = pipeline.lookahead if pipeline else 2 * chunk_size
+            scheduler.open_feed(max_pending=lookahead)
+            threading.Thread(
+                target=self.feed, args=(scheduler, pipeline, chunks), daemon=True
+            ).start()
+
+        if config.get("engine", "threads") == "async":
+            self.send_async(scheduler, compiled, template, pool_size, limiter)
+        else:
+            if pool_size > 1:
+                self.log(f"🔀 Sending over {pool_size} SMTP sessions")
+                sender.start_pool(pool_size)
+            try:
+                with ThreadPoolExecutor(max_workers=pool_size) as executor:
+                    for _ in range(pool_size):
+                        executor.submit(self.send_worker, scheduler, compiled, template)
+            finally:
+                sender.stop_pool()
+
+        self._stoppable = None
+        sender.image_cache.clear()
+        self.outbox.finish_campaign(campaign_id)
+
+        if dedupe is not None and dedupe.duplicates:
+            self.log(f"🧹 {dedupe.summary()}")
+            for email, winner, row in dedupe.samples[:5]:
+                self.log(f"   {email}: row {winner} kept, row {row} dropped")
+        if validator is not None and validator.rejected:
+            self.log(f"🔍 {validator.summary()}")
+        if suppression is not None and suppression.suppressed:
+            self.log(f"🚫 {suppression.suppressed} suppressed recipients skipped")
+        if self.retry.retries:
+            self.log(f"🔁 {self.retry.retries} retries scheduled")
+        for email, reason in self.retry.final_failures.items():
+            self.log(f"   {email}: {reason}")
+        self.log(f"✅ Campaign complete: {self.success_count} sent, {self.failed_count} failed")
+        return self.success_count, self.failed_count
+
+    def stop(self):
+        """Hand out no more recipients; sends in progress still finish"""
+        for stoppable in self._stoppable or ():
+            stoppable.stop()
+
+    def stream(self, source, campaign_id=None, chunk_size=1000):
+        """Chunks of a lazy source, recorded in the outbox as they are read"""
+        for chunk in iter_chunks(source, chunk_size):
+            if campaign_id is not None:
+                self.outbox.add_recipients(campaign_id, chunk)
+            yield chunk
+
+    def duplicate(self, recipient, winner, row):
+        """A repeated address was dropped"""
+        if self.on_skipped:
+            self.on_skipped(1, "duplicate")
+
+    def rejected(self, recipient, verdict):
+        """An invalid, disposable or unreachable address was dropped"""
+        if self.campaign_id is not None:
+            # Recorded under the verdict so a resume does not pick it up again
+            self.outbox.record(self.campaign_id, recipient['email'], verdict)
+        if self.on_skipped:
+            self.on_skipped(1, verdict)
+
+    def suppress(self, suppression, recipients):
+        """Recipients not on the suppression list; the rest are recorded as suppressed"""
+        kept, suppressed = suppression.split(recipients)
+        for recipient in suppressed:
+            self.outbox.record(self.campaign_id, recipient['email'], SUPPRESSED)
+        if suppressed and self.on_skipped:
+            self.on_skipped(len(suppressed), SUPPRESSED)
+        return kept
+
+    def feed(self, scheduler, pipeline, chunks):
+        """Move recipients (rendered by the pool, if any) into the scheduler"""
+        recipients = itertools.chain.from_iterable(chunks)
+        items = pipeline.render(recipients) if pipeline else ((r, None) for r in recipients)
+        try:
+            for recipient, message in items:
+                if message is not None:
+                    recipient = dict(recipient, **{MESSAGE_KEY: message})
+                if not scheduler.add(recipient):
+                    break
+        except Exception as e:
+            self.log(f"❌ Reading recipients stopped: {str(e)}")
+        finally:
+            items.close()
+            scheduler.close_feed()
+
+    def send_async(self, scheduler, compiled, template, connections, limiter):
+        """Send with the asyncio engine, overlapping many SMTP round-trips"""
+        config = self.config_manager
+        try:
+            max_in_flight = int(config.get("max_in_flight", "100"))
+        except ValueError:
+            max_in_flight = 100
+
+        def jobs():
+            # The scheduler waits out rate limits here, on the engine's job
+            # thread, so a throttled domain never holds an in-flight slot
+            for recipient in scheduler:
+                email = recipient['email']
+                message = recipient.get(MESSAGE_KEY)
+                if message is None:
+                    personalized_body = template.render(recipient)
+                    message = compiled.render(email, personalized_body)
+                yield email, message
+
+        self.log(f"⚡ Async engine: {connections} connections, {max_in_flight} in flight")
+        engine = AsyncCampaignEngine(
+            self.email_sender,
+            connections=connections,
+            max_in_flight=max_in_flight,
+            on_sent=self.sent,
+            on_failed=self.failed,
+            on_retry=self.retrying,
+            retry_policy=self.retry,
+            use_tls=self.email_sender.use_tls,
+            rate_limiter=limiter,
+            domain_concurrency=config.get("domain_concurrency"),
+            blocking_jobs=True,
+            paced_jobs=True
+        )
+        self._stoppable.append(engine)
+        engine.run(jobs())
+
+    def send_worker(self, scheduler, compiled, template):
+        """Pull recipients from the scheduler until the campaign is done"""
+        while True:
+            recipient = scheduler.acquire()
+            if recipient is None:
+                break
+            try:
+                delay = self.send_one(recipient, compiled, template)
+                if delay is not None:
+                    scheduler.defer(recipient, delay)
+            finally:
+                scheduler.release(recipient)
+
+    def send_one(self, recipient, compiled, template):
+        """Send to a single recipient; safe to call from worker threads
+
+        Returns the backoff in seconds when a transient failure should be
+        retried, otherwise None.
+        """
+        email = recipient['email']
+        # Kept on the recipient itself so memory does not grow with the list
+        attempt = recipient[ATTEMPT_KEY] = recipient.get(ATTEMPT_KEY, 0) + 1
+        try:
+            message = recipient.get(MESSAGE_KEY)
+            if message is not None:
+                # Already rendered by the render pool
+                self.email_sender.deliver(email, message)
+            else:
+                # Fill {{name}}, {{link}} and any CSV column placeholders
+                personalized_body = template.render(recipient)
+                self.email_sender.send_compiled(compiled, to_email=email, html_content=personalized_body)
+        except Exception as e:
+            delay = self.retry.decide(email, e, attempt)
+            if delay is not None:
+                self.retrying(email, e, delay)
+                return delay
+            self.failed(email, e)
+        else:
+            self.sent(email)
+        return None
+
+    def sent(self, email):
+        """Record a delivered message"""
+        self.outbox.record(self.campaign_id, email, SENT, 250, account=self.email_sender.email)
+        with self.count_lock:
+            self.success_count += 1
+        if self.on_sent:
+            self.on_sent(email)
+
+    def failed(self, email, error):
+        """Record a final failure"""
+        self.outbox.record(self.campaign_id, email, FAILED, error_code(error), str(error),
+                           account=self.email_sender.email)
+        with self.count_lock:
+            self.failed_count += 1
+        if self.on_failed:
+            self.on_failed(email, error)
+
+    def retrying(self, email, error, delay):
+        """Record a transient failure that will be tried again"""
+        self.outbox.record(self.campaign_id, email, PENDING, error_code(error), str(error),
+                           account=self.email_sender.email)
+        if self.on_retry:
+            self.on_retry(email, error, delay)
@@ -0,0 +1,147 @@
+"""
+Headless Command-Line Campaign Runner
+"""
+import argparse
+import json
+import signal
+import sys
+import threading
+import time
+from .config import ConfigManager
+from .email_sender import EmailSender
+from .campaign import CampaignRunner
+from .sharding import ShardedCampaign
+from .outbox import Outbox
+from .recipient_source import RecipientSource
+from .retry import error_code
+
+
+class JsonLinesReporter:
+    """Write campaign progress to a stream as one JSON object per line"""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self.total = 0
+        self.done = 0
+        self._lock = threading.Lock()
+
+    def emit(self, event, **fields):
+        """Write one event line and flush it"""
+        fields = {"event": event, "time": round(time.time(), 3), **fields}
+        line = json.dumps(fields, ensure_ascii=False)
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+    def log(self, message):
+        self.emit("log", message=message)
+
+    def sent(self, email):
+        with self._lock:
+            self.done += 1
+            done = self.done
+        self.emit("sent", email=email, done=done, total=self.total)
+
+    def failed(self, email, error):
+        with self._lock:
+            self.done += 1
+            done = self.done
+        self.emit("failed", email=email, code=error_code(error), error=str(error),
+                  done=done, total=self.total)
+
+    def skipped(self, count, reason):
+        with self._lock:
+            self.done += count
+            done = self.done
+        self.emit("skipped", count=count, reason=reason, done=done, total=self.total)
+
+    def retry(self, email, error, delay):
+        self.emit("retry", email=email, code=error_code(error), error=str(error),
+                  delay=round(delay, 1))
+
+
+def build_parser():
+    """Command-line arguments"""
+    parser = argparse.ArgumentParser(
+        prog="send_campaign",
+        description="Send an email campaign without the GUI. "
+                    "Progress is written to stdout as JSON lines."
+    )
+    parser.add_argument("template", nargs="?", help="HTML body template; {{column}} placeholders are filled per recipient")
+    parser.add_argument("recipients", nargs="?", help="recipients CSV (email,link,name plus any extra columns)")
+    parser.add_argument("-s", "--subject", default="", help="email subject")
+    parser.add_argument("-i", "--image", help="image to embed as cid:attached_image")
+    parser.add_argument("-c", "--config", default="config/smtp_config.json", help="SMTP profile (default: %(default)s)")
+    parser.add_argument("--resume", action="store_true", help="resume the last unfinished campaign instead")
+    return parser
+
+
+def main(argv=None):
+    """Run a campaign from the command line; returns the exit status"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    reporter = JsonLinesReporter()
+
+    config_manager = ConfigManager(args.config)
+    profiles = config_manager.profiles()
+    for profile in profiles:
+        if not all(profile.get(key) for key in ("server", "port", "email", "password")):
+            reporter.emit("error", error=f"Incomplete SMTP profile {profile.name!r} in {args.config}")
+            return 2
+
+    outbox = Outbox.from_config(config_manager)
+    campaign_id = None
+    if args.resume:
+        campaign = outbox.latest_unfinished()
+        if campaign is None:
+            reporter.emit("done", sent=0, failed=0, message="No unfinished campaign to resume")
+            return 0
+        subject, body, image = campaign['subject'], campaign['body'], campaign['image']
+        recipients = outbox.unsent_recipients(campaign['id'])
+        campaign_id = campaign['id']
+        total = len(recipients)
+    else:
+        if not args.template or not args.recipients:
+            parser.error("template and recipients are required unless --resume is given")
+        try:
+            with open(args.template, encoding="utf-8") as f:
+                body = f.read()
+            # Read lazily so sending starts on the first rows of a huge file
+            recipients = RecipientSource(args.recipients)
+            total = recipients.count_rows()
+        except OSError as e:
+            reporter.emit("error", error=str(e))
+            return 2
+        subject, image = args.subject, args.image
+
+    callbacks = dict(log=reporter.log, on_sent=reporter.sent, on_failed=reporter.failed,
+                     on_retry=reporter.retry, on_skipped=reporter.skipped)
+    email_sender = None
+    if len(profiles) > 1:
+        runner = ShardedCampaign(config_manager, outbox, **callbacks)
+    else:
+        email_sender = EmailSender.from_config(profiles[0])
+        runner = CampaignRunner(email_sender, profiles[0], outbox, **callbacks)
+
+    # Ctrl+C stops handing out recipients; a second one aborts
+    def interrupt(signum, frame):
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        reporter.emit("log", message="Stopping after messages in flight")
+        runner.stop()
+    signal.signal(signal.SIGINT, interrupt)
+
+    # For a CSV this is the line count, an upper bound on valid recipients
+    reporter.total = total
+    reporter.emit("start", total=total, subject=subject)
+    try:
+        sent, failed = runner.run(subject, body, recipients, image, campaign_id)
+    finally:
+        if email_sender is not None:
+            email_sender.disconnect()
+        outbox.close()
+    reporter.emit("done", campaign_id=runner.campaign_id, sent=sent, failed=failed)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -47,3 +47,33 @@ class ConfigManager:
         else:
             # Update single key-value pair
             self.config[key_or_dict] = value
+    
+    def profiles(self):
+        """SMTP accounts to send from, as ProfileConfig views
+        
+        ``accounts`` may list several profiles (server, port, email,
+        password, reply_to, weight, daily_quota, hourly_quota, pool_size...);
+        keys an account leaves out fall back to the top-level settings.
+        Without ``accounts`` the top-level profile is the only one.
+        """
+        accounts = self.config.get("accounts") or [{}]
+        return [ProfileConfig(self, account) for account in accounts]
+
+
+class ProfileConfig:
+    """One SMTP account's settings layered over the shared configuration"""
+    
+    def __init__(self, base, overrides):
+        self.base = base
+        self.overrides = overrides
+    
+    @property
+    def name(self):
+        """Display name of the account"""
+        return self.get("name") or self.get("email") or "default"
+    
+    def get(self, key, default=None):
+        """Get configuration value, preferring the account's own"""
+        if key in self.overrides:
+            return self.overrides[key]
+        return self.base.get(key, default)
@@ -0,0 +1,179 @@
+"""
+Recipient Normalization and De-duplication
+"""
+import array
+import heapq
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+from .recipient_source import clean_email
+from .suppression import address_hash
+
+
+# Spilled runs hold sorted (address hash, row) pairs
+RECORD = struct.Struct(">QQ")
+
+# Rough cost of one remembered address in the in-memory table
+ENTRY_BYTES = 120
+
+# Spilled runs are merged into one once there are more than this
+MAX_RUNS = 4
+
+
+class SpilledRun:
+    """A sorted run of (address hash, row) records, memory-mapped for lookups"""
+
+    def __init__(self, path):
+        self.path = path
+        self.count = os.path.getsize(path) // RECORD.size
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @classmethod
+    def write(cls, path, records):
+        """Write sorted (key, row) pairs and open the run"""
+        with open(path, "wb") as f:
+            buffer = array.array("Q")
+            for key, row in records:
+                buffer.append(key)
+                buffer.append(row)
+                if len(buffer) >= 1 << 17:
+                    cls._write(f, buffer)
+                    buffer = array.array("Q")
+            cls._write(f, buffer)
+        return cls(path)
+
+    @staticmethod
+    def _write(f, buffer):
+        if sys.byteorder == "little":
+            buffer.byteswap()
+        buffer.tofile(f)
+
+    def find(self, key):
+        """Row recorded for ``key``, or None (binary search)"""
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            found, row = RECORD.unpack_from(self._map, middle * RECORD.size)
+            if found == key:
+                return row
+            if found < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def __iter__(self):
+        return RECORD.iter_unpack(self._map)
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+class Deduplicator:
+    """Single-pass address normalization and duplicate removal
+
+    Addresses are cleaned (surrounding whitespace and zero-width
+    characters removed, domain lower-cased) and compared case-insensitively.
+    The first row for an address wins and later rows are dropped, so the
+    stage can stream: nothing is held back waiting for later rows.
+
+    Seen addresses live in a table of 64-bit hashes mapped to the row that
+    won. Once it would exceed ``memory_mb`` it is sorted and spilled to a
+    memory-mapped run on disk and lookups binary-search the runs, which are
+    merged as they accumulate (an external sort), so lists larger than RAM
+    are de-duplicated in the same single pass.
+    """
+
+    def __init__(self, memory_mb=64, spill_dir=None, max_samples=100):
+        self.max_entries = max(1024, int(memory_mb * 1024 * 1024 / ENTRY_BYTES))
+        self.spill_dir = spill_dir
+        self.max_samples = max_samples
+        self.total = 0
+        self.duplicates = 0
+        self.samples = []
+        self.spills = 0
+
+    @classmethod
+    def from_config(cls, config_manager):
+        """Stage sized by ``dedupe_memory_mb``; None when ``dedupe`` is false"""
+        if not config_manager.get("dedupe", True):
+            return None
+        try:
+            memory_mb = float(config_manager.get("dedupe_memory_mb", 64))
+        except (TypeError, ValueError):
+            memory_mb = 64
+        return cls(memory_mb=memory_mb, spill_dir=config_manager.get("dedupe_spill_dir"))
+
+    @property
+    def unique(self):
+        """Rows kept so far"""
+        return self.total - self.duplicates
+
+    def filter(self, recipients, on_duplicate=None):
+        """Yield each address's first row, normalized; rows are numbered from 1
+
+        ``on_duplicate(recipient, winner_row, row)`` is called for every
+        dropped row. The first ``max_samples`` drops are also kept in
+        ``samples`` as (email, winner row, dropped row).
+        """
+        seen = {}
+        runs = []
+        workdir = None
+        try:
+            for recipient in recipients:
+                self.total += 1
+                row = self.total
+                email = clean_email(recipient['email'])
+                if email != recipient['email']:
+                    recipient = dict(recipient, email=email)
+                key = address_hash(email)
+
+                winner = seen.get(key)
+                if winner is None:
+                    for run in runs:
+                        winner = run.find(key)
+                        if winner is not None:
+                            break
+                if winner is not None:
+                    self.duplicates += 1
+                    if len(self.samples) < self.max_samples:
+                        self.samples.append((email, winner, row))
+                    if on_duplicate:
+                        on_duplicate(recipient, winner, row)
+                    continue
+
+                seen[key] = row
+                if len(seen) >= self.max_entries:
+                    if workdir is None:
+                        workdir = tempfile.mkdtemp(prefix="dedupe-", dir=self.spill_dir)
+                    runs.append(SpilledRun.write(
+                        os.path.join(workdir, f"run{self.spills}"), sorted(seen.items())
+                    ))
+                    self.spills += 1
+                    seen.clear()
+                    if len(runs) > MAX_RUNS:
+                        runs = [self._merge(runs, workdir)]
+                yield recipient
+        finally:
+            for run in runs:
+                run.close()
+            if workdir is not None:
+                shutil.rmtree(workdir, ignore_errors=True)
+
+    def _merge(self, runs, workdir):
+        """Merge sorted runs into one"""
+        merged = SpilledRun.write(os.path.join(workdir, f"merged{self.spills}"), heapq.merge(*runs))
+        for run in runs:
+            run.close()
+            os.unlink(run.path)
+        return merged
+
+    def summary(self):
+        """One line describing what was removed"""
+        return (f"{self.duplicates} duplicate recipients removed, "
+                f"{self.unique} unique (the first row of each address is kept)")
@@ -7,9 +7,13 @@ import time
 import random
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from email.mime.image import MIMEImage
 from datetime import datetime
-import re
+from .smtp_pool import SMTPConnectionPool
+from .smtp_pipelining import sendmail_pipelined
+from .message_compiler import CompiledMessage
+from .image_cache import ImagePartCache
+from .recipient_source import iter_recipients
+from .watermark import BEEFREE_RULES, strip_watermarks
 
 
 class EmailSender:
@@ -22,19 +26,51 @@ class EmailSender:
         self.password = password
         self.reply_to = reply_to or email
         self.server = None
+        self.pool = None
+        self.use_pipelining = True
+        self.use_tls = True
+        self.image_cache = ImagePartCache()
+    
+    @classmethod
+    def from_config(cls, config_manager):
+        """Build a sender from the saved SMTP profile"""
+        get = config_manager.get
+        sender = cls(get("server"), get("port"), get("email"), get("password"), get("reply_to"))
+        # Only plaintext relays and local test sinks turn STARTTLS off
+        sender.use_tls = str(get("use_tls", True)).lower() not in ("false", "0", "no", "off")
+        return sender
+    
+    def open_session(self):
+        """Open a new authenticated STARTTLS session"""
+        server = smtplib.SMTP(self.server_address, int(self.port))
+        if self.use_tls:
+            server.starttls()
+        server.login(self.email, self.password)
+        return server
     
     def connect(self):
         """Connect to SMTP server"""
         try:
-            self.server = smtplib.SMTP(self.server_address, int(self.port))
-            self.server.starttls()
-            self.server.login(self.email, self.password)
+            self.server = self.open_session()
             return True
         except Exception as e:
-            raise Exception(f"Connection failed: {str(e)}")
+            raise Exception(f"Connection failed: {str(e)}") from e
+    
+    def start_pool(self, size):
+        """Send through a pool of ``size`` concurrent sessions"""
+        self.stop_pool()
+        self.pool = SMTPConnectionPool(self.open_session, size)
+        return self.pool
+    
+    def stop_pool(self):
+        """Close the session pool and fall back to the single session"""
+        if self.pool:
+            self.pool.close()
+            self.pool = None
     
     def disconnect(self):
         """Disconnect from SMTP server"""
+        self.stop_pool()
         if self.server:
             try:
                 self.server.quit()
@@ -45,9 +81,7 @@ class EmailSender:
     def test_connection(self):
         """Test SMTP connection and keep it open"""
         try:
-            self.server = smtplib.SMTP(self.server_address, int(self.port))
-            self.server.starttls()
-            self.server.login(self.email, self.password)
+            self.server = self.open_session()
             return True
         except Exception as e:
             self.server = None
@@ -55,10 +89,11 @@ class EmailSender:
     
     def send_email(self, to_email, subject, html_content, embedded_images=None, qrcode_path=None):
         """Send a single email"""
-        # Ensure connection is active
-        if not self.server:
-            self.connect()
-        
+        msg = self.build_message(to_email, subject, html_content, embedded_images, qrcode_path)
+        self.deliver(to_email, msg.as_string())
+    
+    def build_message(self, to_email, subject, html_content, embedded_images=None, qrcode_path=None):
+        """Build the MIME message for one recipient"""
         msg = MIMEMultipart('related')
         msg['From'] = self.email
         msg['To'] = to_email
@@ -72,94 +107,70 @@ class EmailSender:
         if embedded_images:
             for cid_name, image_path in embedded_images.items():
                 try:
-                    with open(image_path, 'rb') as img_file:
-                        img_data = img_file.read()
-                        image = MIMEImage(img_data)
-                        image.add_header('Content-ID', f'<{cid_name}>')
-                        image.add_header('Content-Disposition', 'inline', filename=os.path.basename(image_path))
-                        msg.attach(image)
+                    image = self.image_cache.part(image_path, cid_name, os.path.basename(image_path))
+                    msg.attach(image)
                 except Exception as img_error:
                     print(f"Could not embed {os.path.basename(image_path)}: {str(img_error)}")
         
         # Embed dynamic QR code
-        if qrcode_path and os.path.exists(qrcode_path):
-            try:
-                with open(qrcode_path, 'rb') as qr_file:
-                    qr_data = qr_file.read()
-                    qr_image = MIMEImage(qr_data)
-                    qr_image.add_header('Content-ID', '<qrcode>')
-                    qr_image.add_header('Content-Disposition', 'inline', filename='qrcode.png')
-                    msg.attach(qr_image)
-            except Exception as qr_error:
-                print(f"Could not embed QR code: {str(qr_error)}")
+        if qrcode_path:
+            qr_image = self.qrcode_part(qrcode_path)
+            if qr_image is not None:
+                msg.attach(qr_image)
         
+        return msg
+    
+    def qrcode_part(self, qrcode_path):
+        """Build the inline QR code image part, or None if it cannot be read"""
+        if not os.path.exists(qrcode_path):
+            return None
         try:
-            self.server.sendmail(self.email, to_email, msg.as_string())
-        except (smtplib.SMTPServerDisconnected, AttributeError):
-            # Reconnect if connection was lost
+            return self.image_cache.part(qrcode_path, 'qrcode', 'qrcode.png')
+        except Exception as qr_error:
+            print(f"Could not embed QR code: {str(qr_error)}")
+            return None
+    
+    def compile_message(self, subject, embedded_images=None):
+        """Serialize the parts shared by every recipient once per campaign"""
+        return CompiledMessage(self, subject, embedded_images)
+    
+    def send_compiled(self, compiled, to_email, html_content, qrcode_path=None):
+        """Send a compiled message with the personalized HTML spliced in"""
+        self.deliver(to_email, compiled.render(to_email, html_content, qrcode_path))
+    
+    def deliver(self, to_email, msg_string):
+        """Hand a serialized message (str or wire bytes) to the SMTP server
+
+        A dropped session is discarded and the error re-raised so the retry
+        scheduler can try again later; the next send reconnects.
+        """
+        if self.pool:
+            with self.pool.session() as server:
+                self.sendmail(server, to_email, msg_string)
+            return
+        
+        # Ensure connection is active
+        if not self.server:
             self.connect()
-            self.server.sendmail(self.email, to_email, msg.as_string())
+        
+        try:
+            self.sendmail(self.server, to_email, msg_string)
+        except smtplib.SMTPServerDisconnected:
+            self.server = None
+            raise
+    
+    def sendmail(self, server, to_email, msg_string):
+        """Run one SMTP transaction, pipelining the envelope when supported"""
+        if self.use_pipelining:
+            return sendmail_pipelined(server, self.email, to_email, msg_string)
+        return server.sendmail(self.email, to_email, msg_string)
     
     @staticmethod
     def remove_beefree_watermark(html_content):
-        """Remove Beefree watermark from HTML"""
-        pattern = re.compile(
-            r'<tr>.*?Beefree-logo\.png.*?</tr>',
-            re.IGNORECASE | re.DOTALL
-        )
-        cleaned_html = pattern.sub('', html_content)
-        
-        pattern_2 = re.compile(
-            r'<table.*?designedwithbeefree\.com.*?</table>',
-            re.IGNORECASE | re.DOTALL
-        )
-        cleaned_html = pattern_2.sub('', cleaned_html)
-        
-        return cleaned_html
+        """Remove Beefree watermark from HTML (the row with its logo and the table linking to it)"""
+        return strip_watermarks(html_content, BEEFREE_RULES)
     
     @staticmethod
     def parse_recipients(text):
         """Parse recipients from text"""
-        recipients = []
-        lines = text.strip().split('\n')
-        
-        # Check if first line is a header
-        first_line = lines[0].strip() if lines else ""
-        has_header = 'email' in first_line.lower() or 'id' in first_line.lower()
-        
-        start_index = 1 if has_header else 0
-
-        for line in lines[start_index:]:
-            line = line.strip()
-            if not line:
-                continue
-
-            if ',' in line:
-                parts = [p.strip() for p in line.split(',')]
-                
-                if len(parts) >= 3:
-                    # Format: email,link,full name
-                    email = parts[0]
-                    link = parts[1] if parts[1] else "#"
-                    name = parts[2] if parts[2] else ""
-                elif len(parts) >= 2:
-                    email = parts[0]
-                    link = parts[1] if parts[1].startswith('http') else "#"
-                    name = parts[1] if not parts[1].startswith('http') else ""
-                else:
-                    email = parts[0]
-                    name = ""
-                    link = "#"
-            else:
-                email = line.strip()
-                name = ""
-                link = "#"
-
-            if re.match(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', email):
-                recipients.append({
-                    "email": email, 
-                    "name": name if name else "Valued Customer", 
-                    "link": link
-                })
-
-        return recipients
+        return list(iter_recipients(text.strip().split('\n')))
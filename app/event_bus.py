@@ -0,0 +1,70 @@
+"""
+Campaign Event Bus
+"""
+import itertools
+from collections import deque
+from datetime import datetime
+
+
+class EventBus:
+    """Hands campaign events from worker threads to the Tk thread
+
+    Publishing is a ``deque.append``, which is atomic in CPython, so the
+    engine never takes a lock or waits on the UI. The UI calls ``drain()``
+    on a fixed-rate ``after`` tick and applies everything that arrived since
+    the last tick at once: progress steps are summed and log lines are
+    written in one insert.
+
+    Log lines go to a ring buffer: if the UI falls behind, the oldest lines
+    are dropped rather than queued, so memory and the cost of a tick stay
+    flat however fast messages are sent. Each line carries a sequence
+    number, so a tick knows how many were dropped and says so in one
+    extra line; ``drain()`` never returns more than ``max_lines`` lines.
+    """
+
+    def __init__(self, max_lines=1000):
+        self.max_lines = max_lines
+        self._events = deque()
+        # One line is kept free for the note about dropped lines
+        self._lines = deque(maxlen=max(1, max_lines - 1))
+        self._sequence = itertools.count()
+        self._next = 0          # sequence number the next drain expects
+
+    def publish(self, kind, *args):
+        """Queue a ``(kind, args)`` event; safe from any thread"""
+        self._events.append((kind, args))
+
+    def log(self, message):
+        """Queue a timestamped status line; safe from any thread"""
+        # next() on itertools.count is atomic in CPython, like the append
+        self._lines.append((next(self._sequence), f"[{datetime.now().strftime('%H:%M:%S')}] {message}"))
+
+    def drain(self):
+        """(events, log lines) published since the last call
+
+        The line list starts with a note when the ring buffer overflowed.
+        """
+        events = _pop_all(self._events)
+        entries = _pop_all(self._lines)
+        lines = [line for _, line in entries]
+        if entries:
+            # Lines logged since the last drain that did not make it here.
+            # Threads can append slightly out of sequence, hence max().
+            last = max(sequence for sequence, _ in entries)
+            skipped = last + 1 - self._next - len(entries)
+            self._next = max(self._next, last + 1)
+            if skipped > 0:
+                lines.insert(0, f"… {skipped} earlier messages skipped")
+        return events, lines
+
+
+def _pop_all(queue):
+    """Pop what is in ``queue`` now, leaving anything appended meanwhile"""
+    items = []
+    pop = queue.popleft
+    try:
+        for _ in range(len(queue)):
+            items.append(pop())
+    except IndexError:
+        pass
+    return items
@@ -1,9 +1,21 @@
 """
 HTML Text Extraction Utility
 """
+import hashlib
+import re
+import threading
+from collections import OrderedDict
 from html.parser import HTMLParser
 
 
+# Tags that start and end a line of text
+BLOCK_TAGS = ('p', 'div', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'li', 'ul', 'ol', 'tr')
+
+# Candidate places to cut a document into separately extracted segments
+_CUT_RE = re.compile(r"</(?:%s)\s*>" % "|".join(BLOCK_TAGS), re.IGNORECASE)
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+
 class HTMLTextExtractor(HTMLParser):
     """Extract plain text from HTML content"""
     
@@ -22,7 +34,7 @@ class HTMLTextExtractor(HTMLParser):
             self.text.append("[Link: ")
         elif tag == 'br':
             self.text.append('\n')
-        elif tag in ['p', 'div', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'li', 'ul', 'ol', 'tr']:
+        elif tag in BLOCK_TAGS:
             if self.text and self.text[-1] != '\n':
                  self.text.append('\n')
 
@@ -33,7 +45,7 @@ class HTMLTextExtractor(HTMLParser):
             self.in_script = False
         elif tag == 'a':
              self.text.append("] ")
-        elif tag in ['p', 'div', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'li', 'ul', 'ol', 'tr']:
+        elif tag in BLOCK_TAGS:
             self.text.append('\n')
 
     def handle_data(self, data):
@@ -41,3 +53,125 @@ class HTMLTextExtractor(HTMLParser):
             clean_data = data.strip()
             if clean_data:
                 self.text.append(clean_data + ' ')
+
+    def get_text(self):
+        """The text fed so far, one block per line"""
+        return normalize_text(''.join(self.text))
+
+
+def normalize_text(raw):
+    """Collapse runs of spaces, trim lines and keep at most one blank line"""
+    text = "\n".join(" ".join(line.split()) for line in raw.split("\n"))
+    return _BLANK_LINES_RE.sub("\n\n", text).strip()
+
+
+def split_segments(html):
+    """Cut HTML after every block end tag
+
+    A cut can land inside a comment, a <style> block or a quoted attribute;
+    TextRenderer checks each piece with the parser and joins it to the next
+    one when it did not end cleanly.
+    """
+    segments = []
+    start = 0
+    for found in _CUT_RE.finditer(html):
+        segments.append(html[start:found.end()])
+        start = found.end()
+    segments.append(html[start:])
+    return segments
+
+
+def _digest(text):
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
+class TextRenderer:
+    """HTML to plain text with caching at two levels
+
+    Whole results are kept in an LRU keyed by a hash of the HTML, so asking
+    again for the same content (a redraw, the same template for every
+    recipient) is a dictionary lookup. Below that the document is cut into
+    segments at block end tags and each segment's raw text is cached by
+    its hash too, so after an edit only the segments that changed are
+    parsed again. A segment is only used on its own when the parser ends
+    it in the state a fresh parser starts in (no pending markup, not in
+    <style> or <script>), which makes the joined result identical to
+    extracting the whole document at once. Safe to share between threads,
+    e.g. the preview and send workers building text/plain parts.
+    """
+
+    def __init__(self, max_documents=64, max_segments=8192):
+        self.max_documents = max_documents
+        self.max_segments = max_segments
+        self.documents = OrderedDict()
+        self.segments = OrderedDict()
+        self.parsed = 0
+        self._lock = threading.Lock()
+
+    def render(self, html):
+        """Plain text of ``html``"""
+        key = _digest(html)
+        with self._lock:
+            text = self.documents.get(key)
+            if text is not None:
+                self.documents.move_to_end(key)
+                return text
+
+        pieces = []
+        pending = ""
+        segments = split_segments(html)
+        last = len(segments) - 1
+        for i, segment in enumerate(segments):
+            raw = self._segment(pending + segment, final=i == last)
+            if raw is None:
+                # Cut inside markup: carry the text over to the next segment
+                pending += segment
+                continue
+            pending = ""
+            pieces.append(raw)
+        text = normalize_text(''.join(pieces))
+
+        with self._lock:
+            self.documents[key] = text
+            if len(self.documents) > self.max_documents:
+                self.documents.popitem(last=False)
+        return text
+
+    def _segment(self, segment, final):
+        """Raw extractor output for one segment, or None if it ends mid-markup"""
+        key = _digest(segment)
+        with self._lock:
+            if key in self.segments:
+                self.segments.move_to_end(key)
+                return self.segments[key]
+
+        parser = HTMLTextExtractor()
+        parser.feed(segment)
+        if final:
+            parser.close()
+            raw = ''.join(parser.text)
+        elif parser.rawdata or parser.cdata_elem or parser.in_style or parser.in_script:
+            raw = None
+        else:
+            raw = ''.join(parser.text)
+
+        with self._lock:
+            self.parsed += 1
+            self.segments[key] = raw
+            if len(self.segments) > self.max_segments:
+                self.segments.popitem(last=False)
+        return raw
+
+    def clear(self):
+        with self._lock:
+            self.documents.clear()
+            self.segments.clear()
+
+
+# Shared by the compose preview and anything rendering text at send time
+text_renderer = TextRenderer()
+
+
+def html_to_text(html):
+    """Plain text of ``html`` through the shared, cached renderer"""
+    return text_renderer.render(html)
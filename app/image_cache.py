@@ -0,0 +1,106 @@
+"""
+Campaign-Scoped Image Part Cache
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from email.mime.base import MIMEBase
+from email.mime.image import MIMEImage
+
+
+class ImagePartCache:
+    """Content-addressed LRU cache of base64-encoded image parts
+
+    Files are identified by (path, mtime, size) so an unchanged file is
+    never read twice, and the encoded payload is stored under the SHA-1 of
+    its bytes so identical images (e.g. repeated QR codes) share one entry.
+    Payloads are evicted least-recently-used once ``max_bytes`` is exceeded.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._digests = OrderedDict()
+        self._payloads = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config_manager):
+        """Build a cache sized by ``image_cache_mb``"""
+        try:
+            megabytes = float(config_manager.get("image_cache_mb", 64))
+        except (TypeError, ValueError):
+            megabytes = 64
+        return cls(max_bytes=int(megabytes * 1024 * 1024))
+
+    def encoded(self, path):
+        """(subtype, base64 payload) for an image file"""
+        stat = os.stat(path)
+        file_key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            digest = self._digests.get(file_key)
+            if digest is not None:
+                self._digests.move_to_end(file_key)
+                entry = self._payloads.get(digest)
+                if entry is not None:
+                    self._payloads.move_to_end(digest)
+                    self.hits += 1
+                    return entry
+
+        with open(path, 'rb') as img_file:
+            data = img_file.read()
+        digest = hashlib.sha1(data).hexdigest()
+
+        with self._lock:
+            self._remember(file_key, digest)
+            entry = self._payloads.get(digest)
+            if entry is not None:
+                self._payloads.move_to_end(digest)
+                self.hits += 1
+                return entry
+
+        # Encode outside the lock; MIMEImage also sniffs the subtype
+        image = MIMEImage(data)
+        entry = (image.get_content_subtype(), image.get_payload())
+
+        with self._lock:
+            self.misses += 1
+            if digest not in self._payloads:
+                self._payloads[digest] = entry
+                self.size += len(entry[1])
+                self._evict()
+        return entry
+
+    def part(self, path, cid, filename):
+        """Inline image part equivalent to a freshly built MIMEImage"""
+        subtype, payload = self.encoded(path)
+        image = MIMEBase('image', subtype)
+        image.set_payload(payload)
+        image['Content-Transfer-Encoding'] = 'base64'
+        image.add_header('Content-ID', f'<{cid}>')
+        image.add_header('Content-Disposition', 'inline', filename=filename)
+        return image
+
+    def clear(self):
+        """Drop every cached entry"""
+        with self._lock:
+            self._digests.clear()
+            self._payloads.clear()
+            self.size = 0
+
+    def _remember(self, file_key, digest):
+        """Map a file to its content digest; lock must be held"""
+        self._digests[file_key] = digest
+        self._digests.move_to_end(file_key)
+        while len(self._digests) > 65536:
+            self._digests.popitem(last=False)
+
+    def _evict(self):
+        """Evict least-recently-used payloads over budget; lock must be held"""
+        while self.size > self.max_bytes and len(self._payloads) > 1:
+            _, (_, payload) = self._payloads.popitem(last=False)
+            self.size -= len(payload)
@@ -0,0 +1,109 @@
+"""
+Background Recipient Import
+"""
+import os
+import queue
+import threading
+import time
+
+
+class ImportJob:
+    """Run a file import on a worker thread and report through a queue
+
+    ``work(job)`` runs on the worker and calls ``job.report(rows,
+    bytes_read)`` as it goes, optionally with a ``batch`` for the UI. The
+    Tk side never waits on the worker: it drains ``events()`` from an
+    ``after`` callback and shows ``status()``. ``report`` returns False
+    once ``cancel()`` is called, which the work treats as a request to stop.
+
+    At most ``max_pending`` batches wait in the queue; past that the worker
+    blocks, so a slow consumer cannot make the import buffer the whole file.
+    """
+
+    def __init__(self, work, path, max_pending=8):
+        self.work = work
+        self.path = path
+        self.total_bytes = os.path.getsize(path)
+        self.rows = 0
+        self.bytes_read = 0
+        self.started = None
+        self.finished = False
+        self._events = queue.Queue(maxsize=max_pending)
+        self._cancel = threading.Event()
+
+    def start(self):
+        self.started = time.monotonic()
+        threading.Thread(target=self._run, daemon=True).start()
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def report(self, rows, bytes_read, total_bytes=None, batch=None):
+        """Record progress from the worker; returns False once cancelled
+
+        Matches the ``progress`` callback of ``RecipientStore.import_file``.
+        """
+        self.rows = rows
+        self.bytes_read = bytes_read
+        if total_bytes is not None:
+            self.total_bytes = total_bytes
+        if batch is not None:
+            self._put(("batch", batch))
+        return not self.cancelled
+
+    def events(self, limit=None):
+        """Drain waiting events without blocking: ("batch", data),
+        ("done", result), ("cancelled", None) or ("error", exception)
+        """
+        events = []
+        while limit is None or len(events) < limit:
+            try:
+                events.append(self._events.get_nowait())
+            except queue.Empty:
+                break
+        return events
+
+    def status(self):
+        """One line of progress: rows, rows/sec, percentage and ETA"""
+        elapsed = max(time.monotonic() - self.started, 1e-6) if self.started else 0
+        text = f"{self.rows:,} rows"
+        if not elapsed:
+            return text
+        text += f"  ·  {self.rows / elapsed:,.0f} rows/sec"
+        if self.total_bytes and self.bytes_read:
+            fraction = min(1.0, self.bytes_read / self.total_bytes)
+            remaining = elapsed * (1 - fraction) / fraction
+            text += f"  ·  {fraction:.0%}  ·  ETA {format_duration(remaining)}"
+        return text
+
+    def _run(self):
+        try:
+            result = self.work(self)
+            event = ("cancelled", None) if self.cancelled else ("done", result)
+        except Exception as e:
+            event = ("error", e)
+        self.finished = True
+        # The final event must not be lost to a full queue
+        self._put(event, force=True)
+
+    def _put(self, event, force=False):
+        while force or not self.cancelled:
+            try:
+                self._events.put(event, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+
+def format_duration(seconds):
+    """m:ss (or h:mm:ss) for a duration in seconds"""
+    minutes, seconds = divmod(int(seconds + 0.5), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
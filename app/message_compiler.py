@@ -0,0 +1,77 @@
+"""
+Precompiled MIME Messages
+"""
+import base64
+import re
+
+
+TO_TOKEN = "recipient@compiled.invalid"
+HTML_TOKEN = "@@COMPILED-HTML-PART@@"
+CRLF = b"\r\n"
+_EOL_RE = re.compile(r"\r\n|\r|\n")
+
+
+def to_wire(text):
+    """Convert serialized message text to CRLF bytes, as smtplib would"""
+    return _EOL_RE.sub("\r\n", text).encode("ascii")
+
+
+def html_part(html, boundary):
+    """Wire bytes of an HTML part identical to ``MIMEText(html, 'html')``"""
+    if html.isascii() and boundary not in html:
+        text = html.replace("\r\n", "\n").replace("\r", "\n").replace("\n", "\r\n")
+        return (b'Content-Type: text/html; charset="us-ascii"\r\n'
+                b'MIME-Version: 1.0\r\n'
+                b'Content-Transfer-Encoding: 7bit\r\n\r\n' + text.encode("ascii"))
+    return (b'Content-Type: text/html; charset="utf-8"\r\n'
+            b'MIME-Version: 1.0\r\n'
+            b'Content-Transfer-Encoding: base64\r\n\r\n'
+            + base64.encodebytes(html.encode("utf-8")).replace(b"\n", CRLF))
+
+
+class CompiledMessage:
+    """A campaign message serialized once, with per-recipient splicing
+
+    The headers, boundaries and embedded image parts are rendered to wire
+    bytes a single time. ``render()`` then only encodes the personalized
+    HTML part and the To header for each recipient.
+    """
+
+    def __init__(self, email_sender, subject, embedded_images=None):
+        self.email_sender = email_sender
+        skeleton = email_sender.build_message(TO_TOKEN, subject, HTML_TOKEN, embedded_images)
+        text = skeleton.as_string()
+        self.boundary = skeleton.get_boundary()
+
+        delimiter = "\n--" + self.boundary
+        marker = text.index(HTML_TOKEN)
+        part_start = text.rindex(delimiter, 0, marker) + len(delimiter) + 1
+        part_end = text.index(delimiter, marker)
+        closing = text.rindex(delimiter + "--")
+        to_start = text.index(TO_TOKEN)
+
+        self.head = to_wire(text[:to_start])
+        self.middle = to_wire(text[to_start + len(TO_TOKEN):part_start])
+        self.parts = to_wire(text[part_end:closing])
+        self.closing = to_wire(text[closing:])
+        self.delimiter = to_wire(delimiter + "\n")
+
+    def __getstate__(self):
+        """Pickle without the sender (and its sockets) for render workers"""
+        state = self.__dict__.copy()
+        state['email_sender'] = None
+        return state
+
+    def render(self, to_email, html_content, qrcode_path=None):
+        """Wire-ready bytes for one recipient"""
+        chunks = [
+            self.head, to_email.encode("ascii"), self.middle,
+            html_part(html_content, self.boundary), self.parts
+        ]
+        if qrcode_path:
+            qr_part = self.email_sender.qrcode_part(qrcode_path)
+            if qr_part is not None:
+                chunks.append(self.delimiter)
+                chunks.append(to_wire(qr_part.as_string()))
+        chunks.append(self.closing)
+        return b"".join(chunks)
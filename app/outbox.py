@@ -0,0 +1,199 @@
+"""
+Durable Campaign Outbox
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from .validation import INVALID, DISPOSABLE, NO_MX
+
+
+PENDING = "pending"
+SENT = "sent"
+FAILED = "failed"
+SUPPRESSED = "suppressed"
+
+# Recipients dropped by validation are stored under its verdict
+REJECTED = (INVALID, DISPOSABLE, NO_MX)
+
+# Statuses that need no further sending
+DONE = (SENT, SUPPRESSED) + REJECTED
+_DONE_PARAMS = ", ".join("?" * len(DONE))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS campaigns (
+    id INTEGER PRIMARY KEY,
+    subject TEXT,
+    body TEXT,
+    image TEXT,
+    total INTEGER,
+    status TEXT,
+    created_at TEXT
+);
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY,
+    campaign_id INTEGER NOT NULL,
+    email TEXT NOT NULL,
+    data TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    smtp_code INTEGER,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL,
+    account TEXT,
+    UNIQUE (campaign_id, email)
+);
+"""
+
+
+class Outbox:
+    """Per-recipient send state for campaigns, stored in SQLite (WAL mode)
+
+    Results are buffered and written in batches of ``batch_size`` or every
+    ``flush_interval`` seconds so the database never throttles sending. A
+    crash can therefore lose the last unflushed batch, which is sent again
+    on resume.
+    """
+
+    def __init__(self, path="data/outbox.db", batch_size=500, flush_interval=1.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(outbox)")]
+        if "account" not in columns:
+            # Outboxes created before multi-account sending
+            self.conn.execute("ALTER TABLE outbox ADD COLUMN account TEXT")
+        self._pending = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config_manager):
+        """Open the outbox at ``outbox_path``"""
+        return cls(config_manager.get("outbox_path", "data/outbox.db"))
+
+    def create_campaign(self, subject, body, recipients, image=None):
+        """Record a new campaign with every recipient pending; returns its id"""
+        with self._lock, self.conn:
+            campaign_id = self.conn.execute(
+                "INSERT INTO campaigns (subject, body, image, total, status, created_at) "
+                "VALUES (?, ?, ?, ?, 'running', ?)",
+                (subject, body, image, len(recipients), datetime.now().isoformat())
+            ).lastrowid
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO outbox (campaign_id, email, data) VALUES (?, ?, ?)",
+                ((campaign_id, r['email'], json.dumps(r)) for r in recipients)
+            )
+        return campaign_id
+
+    def add_recipients(self, campaign_id, recipients):
+        """Record more pending recipients of a streamed campaign; returns how many were new"""
+        with self._lock, self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO outbox (campaign_id, email, data) VALUES (?, ?, ?)",
+                ((campaign_id, r['email'], json.dumps(r)) for r in recipients)
+            )
+            added = self.conn.total_changes - before
+            self.conn.execute(
+                "UPDATE campaigns SET total = total + ? WHERE id = ?", (added, campaign_id)
+            )
+        return added
+
+    def record(self, campaign_id, email, status, code=None, error=None, account=None):
+        """Queue a result; written with the next batch"""
+        with self._lock:
+            self._pending.append((status, code, error, time.time(), account, campaign_id, email))
+            due = (len(self._pending) >= self.batch_size
+                   or time.monotonic() - self._last_flush >= self.flush_interval)
+            if due:
+                self._flush()
+
+    def flush(self):
+        """Write all queued results in one transaction"""
+        with self._lock:
+            self._flush()
+
+    def finish_campaign(self, campaign_id):
+        """Mark a campaign complete once nothing is left to send"""
+        with self._lock:
+            self._flush()
+            remaining = self.conn.execute(
+                f"SELECT COUNT(*) FROM outbox WHERE campaign_id = ? AND status NOT IN ({_DONE_PARAMS})",
+                (campaign_id, *DONE)
+            ).fetchone()[0]
+            with self.conn:
+                self.conn.execute(
+                    "UPDATE campaigns SET status = ? WHERE id = ?",
+                    ("complete" if not remaining else "incomplete", campaign_id)
+                )
+        return remaining
+
+    def latest_unfinished(self):
+        """Most recent campaign that still has unsent recipients, or None"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT id, subject, body, image, total FROM campaigns "
+                "WHERE status != 'complete' ORDER BY id DESC LIMIT 1"
+            ).fetchone()
+        if row is None:
+            return None
+        keys = ("id", "subject", "body", "image", "total")
+        return dict(zip(keys, row))
+
+    def unsent_recipients(self, campaign_id):
+        """Recipients not yet sent, in original order"""
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT data FROM outbox WHERE campaign_id = ? AND status NOT IN ({_DONE_PARAMS}) ORDER BY id",
+                (campaign_id, *DONE)
+            ).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def counts(self, campaign_id):
+        """Number of recipients per status"""
+        with self._lock:
+            self._flush()
+            rows = self.conn.execute(
+                "SELECT status, COUNT(*) FROM outbox WHERE campaign_id = ? GROUP BY status",
+                (campaign_id,)
+            ).fetchall()
+        return dict(rows)
+
+    def sent_since(self, account, since):
+        """Messages ``account`` sent after the ``since`` timestamp, across campaigns"""
+        with self._lock:
+            self._flush()
+            return self.conn.execute(
+                "SELECT COUNT(*) FROM outbox WHERE account = ? AND status = ? AND updated_at >= ?",
+                (account, SENT, since)
+            ).fetchone()[0]
+
+    def close(self):
+        """Flush and close the database"""
+        with self._lock:
+            self._flush()
+            self.conn.close()
+
+    def _flush(self):
+        """Write queued results; lock must be held"""
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE outbox SET status = ?, smtp_code = ?, error = ?, updated_at = ?, "
+                "account = COALESCE(?, account), attempts = attempts + 1 "
+                "WHERE campaign_id = ? AND email = ?",
+                batch
+            )
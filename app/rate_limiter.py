@@ -0,0 +1,183 @@
+"""
+Token-Bucket Rate Limiting
+"""
+import asyncio
+import re
+import threading
+import time
+
+
+_UNITS = {
+    "s": 1, "sec": 1, "second": 1,
+    "m": 60, "min": 60, "minute": 60,
+    "h": 3600, "hr": 3600, "hour": 3600,
+    "d": 86400, "day": 86400,
+}
+_RATE_RE = re.compile(r"^\s*([0-9]*\.?[0-9]+)\s*(?:/\s*([a-z]+?)s?)?\s*$", re.IGNORECASE)
+
+
+def parse_rate(spec):
+    """Turn "500/hour", "20/min" or "2" (per second) into messages per second"""
+    if spec in (None, ""):
+        return None
+    if isinstance(spec, (int, float)):
+        return float(spec) if spec > 0 else None
+    match = _RATE_RE.match(str(spec))
+    if not match:
+        raise ValueError(f"Invalid rate limit: {spec!r}")
+    count, unit = match.groups()
+    seconds = _UNITS.get((unit or "s").lower())
+    if seconds is None:
+        raise ValueError(f"Invalid rate limit unit: {unit!r}")
+    rate = float(count) / seconds
+    return rate if rate > 0 else None
+
+
+def parse_burst(spec):
+    """Turn a burst setting like 20 or "20.0" into a count; 1 when unset or invalid"""
+    try:
+        return max(1, int(float(spec)))
+    except (TypeError, ValueError):
+        return 1
+
+
+class TokenBucket:
+    """A token bucket refilled at ``rate`` tokens/sec holding at most ``burst``
+
+    Tracked as a theoretical arrival time (GCRA), which is equivalent to a
+    token bucket but lets several buckets agree on one future send time.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self.interval = 1.0 / self.rate
+        self.tolerance = (self.burst - 1) * self.interval
+        self.tat = 0.0
+
+    def earliest(self, now):
+        """Earliest time at which one more token is available"""
+        return max(now, self.tat - self.tolerance)
+
+    def consume(self, at):
+        """Take one token at time ``at``"""
+        self.tat = max(self.tat, at) + self.interval
+
+
+class RateLimiter:
+    """Token buckets at global, per-account and per-recipient-domain scope
+
+    ``reserve()`` books one send in every bucket that applies and returns how
+    long the caller must wait before sending, so slow sends count towards
+    the limit instead of being followed by a fixed sleep. One limiter can
+    be shared by several accounts; ``limit_account()`` gives an account its
+    own rate.
+    """
+
+    def __init__(self, global_rate=None, global_burst=1, account_rate=None, account_burst=1,
+                 domain_rate=None, domain_burst=1, domain_overrides=None):
+        self.global_bucket = TokenBucket(global_rate, global_burst) if global_rate else None
+        self.account_rate = account_rate
+        self.account_burst = account_burst
+        self.domain_rate = domain_rate
+        self.domain_burst = domain_burst
+        self.domain_overrides = {
+            domain.lower(): parse_rate(spec) for domain, spec in (domain_overrides or {}).items()
+        }
+        self.account_overrides = {}
+        self.account_buckets = {}
+        self.domain_buckets = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config_manager):
+        """Build the limiter from ConfigManager keys
+
+        ``rate_limit`` / ``rate_burst`` set the global bucket,
+        ``account_rate_limit`` / ``account_burst`` the per-account one and
+        ``domain_rate_limit`` / ``domain_burst`` / ``domain_rate_limits`` the
+        per-domain ones. Without ``rate_limit`` the legacy ``delay`` setting
+        becomes one message every ``delay`` seconds.
+        """
+        get = config_manager.get
+        global_rate = parse_rate(get("rate_limit"))
+        if global_rate is None:
+            try:
+                delay = float(get("delay", "10"))
+            except (TypeError, ValueError):
+                delay = 10
+            global_rate = 1.0 / delay if delay > 0 else None
+        return cls(
+            global_rate=global_rate,
+            global_burst=parse_burst(get("rate_burst")),
+            account_rate=parse_rate(get("account_rate_limit")),
+            account_burst=parse_burst(get("account_burst")),
+            domain_rate=parse_rate(get("domain_rate_limit")),
+            domain_burst=parse_burst(get("domain_burst")),
+            domain_overrides=get("domain_rate_limits") or {},
+        )
+
+    def limit_account(self, account, rate, burst=1):
+        """Pace ``account`` at ``rate`` messages/sec (None for no account limit)"""
+        with self._lock:
+            self.account_overrides[account] = (rate, burst)
+            self.account_buckets.pop(account, None)
+
+    def buckets_for(self, account=None, domain=None):
+        """Buckets that apply to one send; call with the lock held"""
+        buckets = [self.global_bucket] if self.global_bucket else []
+        if account:
+            rate, burst = self.account_overrides.get(account, (self.account_rate, self.account_burst))
+            if rate:
+                bucket = self.account_buckets.get(account)
+                if bucket is None:
+                    bucket = self.account_buckets[account] = TokenBucket(rate, burst)
+                buckets.append(bucket)
+        if domain:
+            domain = domain.lower()
+            rate = self.domain_overrides.get(domain, self.domain_rate)
+            if rate:
+                bucket = self.domain_buckets.get(domain)
+                if bucket is None:
+                    bucket = self.domain_buckets[domain] = TokenBucket(rate, self.domain_burst)
+                buckets.append(bucket)
+        return buckets
+
+    def reserve(self, account=None, domain=None):
+        """Book one send and return the seconds to wait before making it"""
+        now = time.monotonic()
+        with self._lock:
+            buckets = self.buckets_for(account, domain)
+            at = max([bucket.earliest(now) for bucket in buckets], default=now)
+            for bucket in buckets:
+                bucket.consume(at)
+        return at - now
+
+    def delay_for(self, account=None, domain=None):
+        """Seconds until a send would be allowed, without booking it"""
+        now = time.monotonic()
+        with self._lock:
+            buckets = self.buckets_for(account, domain)
+            return max([bucket.earliest(now) for bucket in buckets], default=now) - now
+
+    def acquire(self, account=None, domain=None, stop_event=None):
+        """Block until one send is allowed; returns the time waited"""
+        wait = self.reserve(account, domain)
+        if wait > 0:
+            if stop_event is not None:
+                stop_event.wait(wait)
+            else:
+                time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, account=None, domain=None):
+        """Asyncio form of ``acquire``"""
+        wait = self.reserve(account, domain)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+def recipient_domain(email):
+    """Domain part of an address, lower-cased"""
+    return email.rpartition("@")[2].lower()
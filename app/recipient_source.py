@@ -0,0 +1,122 @@
+"""
+Streaming Recipient Sources
+"""
+import csv
+import itertools
+from .validation import valid_address
+
+
+# Invisible characters that survive copy-pasting from documents and sheets
+_INVISIBLE = "\u200b\u200c\u200d\u2060\ufeff"
+
+
+def clean_email(email):
+    """Address as it should be sent: trimmed, invisible characters removed
+    and the domain lower-cased (the local part is left as typed)"""
+    email = email.strip().strip(_INVISIBLE).strip()
+    local, at, domain = email.rpartition("@")
+    return f"{local}@{domain.lower()}" if at else email
+
+
+def normalize_email(email):
+    """Canonical form used to compare addresses: cleaned and lower-cased"""
+    return clean_email(email).lower()
+
+
+def iter_recipients(lines):
+    """Yield recipient dicts from CSV/TXT lines, one row at a time
+
+    The first line is a header when it mentions "email" or "id"; its
+    columns become extra {{column}} placeholders. Rows are read as
+    email,link,name (see ``recipient_from_row``) and rows without a valid
+    address are skipped.
+    """
+    lines = iter(lines)
+    first_line = next(lines, "")
+    lowered = first_line.lower()
+    if 'email' in lowered or 'id' in lowered:
+        columns = [c.strip().lower() for c in next(csv.reader([first_line]))]
+    else:
+        columns = []
+        lines = itertools.chain([first_line], lines)
+
+    for row in csv.reader(lines):
+        recipient = recipient_from_row([part.strip() for part in row], columns)
+        if recipient is not None:
+            yield recipient
+
+
+def recipient_from_row(parts, columns=()):
+    """Recipient dict for one split row, or None if it has no valid email"""
+    if not parts or not parts[0]:
+        return None
+    email = clean_email(parts[0])
+    if len(parts) >= 3:
+        # Format: email,link,full name
+        link = parts[1] if parts[1] else "#"
+        name = parts[2]
+    elif len(parts) == 2:
+        link = parts[1] if parts[1].startswith('http') else "#"
+        name = parts[1] if not parts[1].startswith('http') else ""
+    else:
+        link = "#"
+        name = ""
+
+    if not valid_address(email):
+        return None
+    recipient = {"email": email, "name": name if name else "Valued Customer", "link": link}
+    if columns and len(parts) > 1:
+        for column, value in zip(columns, parts):
+            if column:
+                recipient.setdefault(column, value)
+    return recipient
+
+
+def iter_chunks(recipients, chunk_size=1000):
+    """Lists of recipients from a RecipientSource or any iterable"""
+    if hasattr(recipients, "chunks"):
+        yield from recipients.chunks()
+        return
+    recipients = iter(recipients)
+    while True:
+        chunk = list(itertools.islice(recipients, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class RecipientSource:
+    """Recipients read lazily from a CSV or TXT file
+
+    Iterating yields one recipient at a time and ``chunks()`` yields lists
+    of up to ``chunk_size``, so a campaign can start on the first rows of
+    a multi-million row file while memory stays constant. The file is
+    re-read on every pass.
+    """
+
+    def __init__(self, path, chunk_size=1000, encoding="utf-8-sig"):
+        self.path = path
+        self.chunk_size = max(1, int(chunk_size))
+        self.encoding = encoding
+
+    def __iter__(self):
+        with open(self.path, encoding=self.encoding, newline="") as f:
+            yield from iter_recipients(f)
+
+    def chunks(self):
+        """Yield lists of up to ``chunk_size`` valid recipients"""
+        return iter_chunks(iter(self), self.chunk_size)
+
+    def count_rows(self):
+        """Number of lines in the file, without parsing it
+
+        An upper bound on the recipients (it includes the header and any
+        invalid rows), cheap enough to size a progress bar.
+        """
+        lines = 0
+        last = b"\n"
+        with open(self.path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                lines += block.count(b"\n")
+                last = block[-1:]
+        return lines + (last != b"\n")
@@ -0,0 +1,271 @@
+"""
+SQLite Recipient Store
+"""
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from .recipient_source import iter_recipients
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS recipients (
+    id INTEGER PRIMARY KEY,
+    email TEXT NOT NULL,
+    domain TEXT NOT NULL,
+    name TEXT,
+    link TEXT,
+    data TEXT
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+INDEXES = (
+    "CREATE INDEX IF NOT EXISTS recipients_email ON recipients (email)",
+    "CREATE INDEX IF NOT EXISTS recipients_domain ON recipients (domain)",
+)
+
+# Keys stored in their own columns; any other CSV column goes to ``data``
+FIXED_KEYS = ("email", "name", "link")
+
+
+def recipient_row(recipient):
+    """(email, domain, name, link, data) row for a recipient dict"""
+    email = recipient['email']
+    extra = {k: v for k, v in recipient.items() if k not in FIXED_KEYS}
+    return (
+        email,
+        email.rpartition("@")[2].lower(),
+        recipient.get("name"),
+        recipient.get("link"),
+        json.dumps(extra, ensure_ascii=False) if extra else None
+    )
+
+
+def row_recipient(row):
+    """Recipient dict for an (email, name, link, data) row"""
+    email, name, link, data = row
+    recipient = {"email": email, "name": name, "link": link}
+    if data:
+        recipient.update(json.loads(data))
+    return recipient
+
+
+class RecipientStore:
+    """The recipient list, kept in SQLite so it survives restarts
+
+    Imports parse the file once and insert it with ``executemany`` in a
+    single transaction, so a cancelled or failed import leaves the previous
+    list intact. Rows are indexed on email and domain; CSV columns beyond
+    email, name and link are kept as JSON for {{column}} placeholders.
+    Iterating streams rows through a cursor on a separate connection, so a
+    campaign can read the list while the UI keeps using the store; file
+    imports write on their own connection too, so they can run on a worker
+    thread while the UI keeps paging through the list as it was.
+    """
+
+    def __init__(self, path="data/recipients.db", chunk_size=1000, batch_size=5000):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.batch_size = batch_size
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Transactions are managed explicitly (BEGIN/COMMIT)
+        self.conn = self._connect()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self._create_indexes(self.conn)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config_manager):
+        """Open the store at ``recipients_path``"""
+        return cls(config_manager.get("recipients_path", "data/recipients.db"))
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def __len__(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM recipients").fetchone()[0]
+
+    def __iter__(self):
+        """Recipient dicts in list order, read through a cursor"""
+        conn = self._connect()
+        try:
+            cursor = conn.execute("SELECT email, name, link, data FROM recipients ORDER BY id")
+            for row in cursor:
+                yield row_recipient(row)
+        finally:
+            conn.close()
+
+    def chunks(self):
+        """Yield lists of up to ``chunk_size`` recipients"""
+        conn = self._connect()
+        try:
+            cursor = conn.execute("SELECT email, name, link, data FROM recipients ORDER BY id")
+            while True:
+                rows = cursor.fetchmany(self.chunk_size)
+                if not rows:
+                    return
+                yield [row_recipient(row) for row in rows]
+        finally:
+            conn.close()
+
+    def count(self, search=None, domain=None):
+        """Number of recipients matching a search and/or domain filter
+
+        A search scans the table, so this runs on its own connection and
+        can be called from a worker thread without holding up the store.
+        """
+        where, params = self._where(search, domain)
+        conn = self._connect()
+        try:
+            return conn.execute(f"SELECT COUNT(*) FROM recipients{where}", params).fetchone()[0]
+        finally:
+            conn.close()
+
+    def page(self, offset, limit, search=None, domain=None):
+        """(id, email, name, link, domain, data) rows of one page, in list order"""
+        where, params = self._where(search, domain)
+        with self._lock:
+            return self.conn.execute(
+                f"SELECT id, email, name, link, domain, data FROM recipients{where} "
+                f"ORDER BY id LIMIT ? OFFSET ?",
+                (*params, limit, offset)
+            ).fetchall()
+
+    @staticmethod
+    def _where(search, domain):
+        """WHERE clause and parameters for ``count`` and ``page``
+
+        The domain filter uses its index; search is a case-insensitive
+        substring match on email and name.
+        """
+        clauses = []
+        params = []
+        if domain:
+            clauses.append("domain = ?")
+            params.append(domain.lower())
+        if search:
+            pattern = "%" + search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            clauses.append("(email LIKE ? ESCAPE '\\' OR name LIKE ? ESCAPE '\\')")
+            params.extend((pattern, pattern))
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def import_file(self, path, replace=True, encoding="utf-8-sig", progress=None):
+        """Load a CSV/TXT file; returns the number of recipients imported
+
+        ``progress(rows, bytes_read, total_bytes)`` is called after every
+        batch; returning False cancels the import, which is rolled back.
+        With ``replace`` the file becomes the whole list. Safe to call from
+        a worker thread: readers keep seeing the previous list until commit.
+        """
+        total_bytes = os.path.getsize(path)
+        conn = self._connect()
+        try:
+            with open(path, "rb") as f:
+                position = [0]
+
+                def lines():
+                    for raw in f:
+                        position[0] += len(raw)
+                        yield raw.decode(encoding, errors="replace")
+
+                def report(rows):
+                    return progress is None or progress(rows, position[0], total_bytes) is not False
+
+                return self._insert(conn, iter_recipients(lines()), replace, report, source=path)
+        finally:
+            conn.close()
+
+    def add(self, recipients):
+        """Append recipients to the list; returns how many were added"""
+        with self._lock:
+            return self._insert(self.conn, recipients, replace=False)
+
+    def clear(self):
+        """Remove every recipient"""
+        with self._lock:
+            self.conn.execute("BEGIN")
+            self.conn.execute("DELETE FROM recipients")
+            self.conn.execute("DELETE FROM meta")
+            self.conn.execute("COMMIT")
+
+    def info(self):
+        """Metadata of the last import: source, imported_at, columns"""
+        with self._lock:
+            rows = self.conn.execute("SELECT key, value FROM meta").fetchall()
+        info = dict(rows)
+        if "columns" in info:
+            info["columns"] = json.loads(info["columns"])
+        return info
+
+    def domains(self, limit=10):
+        """Most common recipient domains as (domain, count) pairs"""
+        with self._lock:
+            return self.conn.execute(
+                "SELECT domain, COUNT(*) AS n FROM recipients GROUP BY domain "
+                "ORDER BY n DESC LIMIT ?", (limit,)
+            ).fetchall()
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    def _insert(self, conn, recipients, replace, report=None, source=None):
+        """Insert in batches inside one transaction on ``conn``; returns the row count"""
+        count = 0
+        columns = {}
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if replace:
+                # Rebuilding the indexes once is faster than updating them per row
+                conn.execute("DELETE FROM recipients")
+                conn.execute("DROP INDEX IF EXISTS recipients_email")
+                conn.execute("DROP INDEX IF EXISTS recipients_domain")
+            batch = []
+            for recipient in recipients:
+                columns.update(dict.fromkeys(recipient))
+                batch.append(recipient_row(recipient))
+                if len(batch) >= self.batch_size:
+                    count += self._write(conn, batch)
+                    batch = []
+                    if report is not None and not report(count):
+                        conn.execute("ROLLBACK")
+                        return 0
+            count += self._write(conn, batch)
+            if report is not None:
+                report(count)
+            self._create_indexes(conn)
+            if source is not None:
+                conn.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", [
+                    ("source", os.path.abspath(source)),
+                    ("imported_at", datetime.now().isoformat()),
+                    ("columns", json.dumps(list(columns))),
+                ])
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return count
+
+    @staticmethod
+    def _create_indexes(conn):
+        for statement in INDEXES:
+            conn.execute(statement)
+
+    @staticmethod
+    def _write(conn, batch):
+        conn.executemany(
+            "INSERT INTO recipients (email, domain, name, link, data) VALUES (?, ?, ?, ?, ?)",
+            batch
+        )
+        return len(batch)
@@ -0,0 +1,133 @@
+"""
+Multi-Process Message Rendering
+"""
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+
+# Recipient key carrying the pre-rendered wire bytes
+MESSAGE_KEY = "_message"
+
+# Per-process state installed by _init_worker
+_template = None
+_compiled = None
+
+
+def _init_worker(template, compiled):
+    """Receive the campaign template and skeleton once per worker process"""
+    global _template, _compiled
+    _template = template
+    _compiled = compiled
+
+
+def _render_chunk(recipients):
+    """Wire-ready message bytes for a chunk of recipients"""
+    return [
+        _compiled.render(recipient['email'], _template.render(recipient))
+        for recipient in recipients
+    ]
+
+
+class RenderPipeline:
+    """Render personalized messages in worker processes, ahead of the senders
+
+    Recipients are cut into chunks of ``chunk_size`` and rendered to wire
+    bytes by a pool of ``workers`` processes, so personalization and MIME
+    encoding use every core instead of sharing the GIL with the SMTP
+    threads. At most ``max_chunks`` chunks are queued or rendering at a
+    time, which bounds memory however long the list is.
+    """
+
+    def __init__(self, template, compiled, workers=None, chunk_size=64, max_chunks=None):
+        self.template = template
+        self.compiled = compiled
+        self.workers = max(1, int(workers or os.cpu_count() or 1))
+        self.chunk_size = max(1, int(chunk_size))
+        self.max_chunks = max(1, int(max_chunks or self.workers * 2))
+        self.stopped = False
+
+    @classmethod
+    def from_config(cls, config_manager, template, compiled):
+        """Pipeline sized by ``render_workers``; None to render inline
+
+        ``render_workers`` is a process count or "auto" for one per core.
+        The default 0 keeps rendering on the sending threads.
+        """
+        workers = str(config_manager.get("render_workers", 0) or 0).strip().lower()
+        if workers == "auto":
+            workers = os.cpu_count() or 1
+        try:
+            workers = int(workers)
+        except ValueError:
+            workers = 0
+        if workers < 1:
+            return None
+        try:
+            chunk_size = int(config_manager.get("render_chunk_size", 64))
+        except (TypeError, ValueError):
+            chunk_size = 64
+        return cls(template, compiled, workers=workers, chunk_size=chunk_size)
+
+    @property
+    def lookahead(self):
+        """Rendered messages worth keeping queued for the network stage"""
+        return self.chunk_size * self.max_chunks
+
+    def render(self, recipients):
+        """Yield (recipient, message bytes) pairs in input order"""
+        self.stopped = False
+        executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            # spawn is safe from threaded (Tk) processes and on every platform
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.template, self.compiled)
+        )
+        pending = queue.Queue(maxsize=self.max_chunks)
+        feeder = threading.Thread(
+            target=self._submit, args=(executor, recipients, pending), daemon=True
+        )
+        feeder.start()
+        try:
+            while True:
+                item = pending.get()
+                if item is None:
+                    break
+                chunk, future = item
+                if isinstance(future, BaseException):
+                    raise future
+                yield from zip(chunk, future.result())
+        finally:
+            self.stopped = True
+            # Unblock the feeder if it is waiting on a full queue
+            while feeder.is_alive():
+                try:
+                    pending.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def stop(self):
+        """Stop rendering new chunks"""
+        self.stopped = True
+
+    def _submit(self, executor, recipients, pending):
+        """Feeder thread: submit chunks in order, blocking on the bounded queue"""
+        chunk = []
+        try:
+            for recipient in recipients:
+                if self.stopped:
+                    return
+                chunk.append(recipient)
+                if len(chunk) >= self.chunk_size:
+                    pending.put((chunk, executor.submit(_render_chunk, chunk)))
+                    chunk = []
+            if chunk and not self.stopped:
+                pending.put((chunk, executor.submit(_render_chunk, chunk)))
+        except Exception as e:
+            pending.put((chunk, e))
+        finally:
+            pending.put(None)
@@ -0,0 +1,92 @@
+"""
+Retry Policy for Transient SMTP Failures
+"""
+import random
+import smtplib
+import threading
+
+
+TRANSIENT = "transient"
+PERMANENT = "permanent"
+
+
+def error_code(error):
+    """SMTP reply code carried by an exception (or its cause), if any"""
+    while error is not None:
+        code = getattr(error, "smtp_code", None)
+        if code is None and getattr(error, "recipients", None):
+            code = next(iter(error.recipients.values()))[0]
+        if code is not None:
+            return code
+        error = error.__cause__
+    return None
+
+
+def classify(error):
+    """TRANSIENT for 4xx replies and dropped connections, PERMANENT otherwise"""
+    code = error_code(error)
+    if code is not None:
+        return TRANSIENT if 400 <= code < 500 else PERMANENT
+
+    while error is not None:
+        if isinstance(error, smtplib.SMTPServerDisconnected):
+            return TRANSIENT
+        if isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException):
+            # Refused, reset or timed-out sockets
+            return TRANSIENT
+        error = error.__cause__
+    return PERMANENT
+
+
+class RetryPolicy:
+    """Decide whether and when a failed recipient is tried again
+
+    Transient failures are retried up to ``max_attempts`` sends in total
+    with jittered exponential backoff (``base_delay`` doubling up to
+    ``max_delay``). ``budget`` caps the number of retries per campaign so a
+    broken relay cannot keep the campaign alive forever. The reason a
+    recipient finally failed is kept in ``final_failures``.
+    """
+
+    def __init__(self, max_attempts=4, base_delay=30, max_delay=1800, jitter=0.5, budget=None):
+        self.max_attempts = max(1, int(max_attempts))
+        self.base_delay = float(base_delay)
+        self.max_delay = float(max_delay)
+        self.jitter = jitter
+        self.budget = budget
+        self.retries = 0
+        self.final_failures = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config_manager):
+        """Build a policy from the ``retry_*`` configuration keys"""
+        get = config_manager.get
+        budget = get("retry_budget")
+        return cls(
+            max_attempts=int(get("retry_attempts", 4)),
+            base_delay=float(get("retry_base_delay", 30)),
+            max_delay=float(get("retry_max_delay", 1800)),
+            budget=int(budget) if budget not in (None, "") else None,
+        )
+
+    def backoff(self, attempt):
+        """Jittered delay before retry number ``attempt`` (1-based)"""
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return delay * (1 - self.jitter * random.random())
+
+    def decide(self, email, error, attempt):
+        """Seconds until the next try, or None if the failure is final"""
+        kind = classify(error)
+        with self._lock:
+            if kind == PERMANENT:
+                reason = "permanent error"
+            elif attempt >= self.max_attempts:
+                reason = f"gave up after {attempt} attempts"
+            elif self.budget is not None and self.retries >= self.budget:
+                reason = "campaign retry budget exhausted"
+            else:
+                self.retries += 1
+                return self.backoff(attempt)
+            self.final_failures[email] = f"{reason}: {error}"
+        return None
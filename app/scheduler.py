@@ -0,0 +1,226 @@
+"""
+Per-Recipient-Domain Scheduling
+"""
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from .rate_limiter import recipient_domain
+
+
+class DomainScheduler:
+    """Interleave recipients across their domains
+
+    Recipients are bucketed by domain and handed out round-robin, or
+    weighted when ``weights`` maps a domain to how many sends it gets per
+    turn. A domain is skipped while it has ``max_per_domain`` sends in
+    progress or while ``rate_limiter`` says it must wait, so one large
+    provider never stalls the rest of the list.
+
+    Worker threads call ``acquire()`` for the next recipient and
+    ``release()`` once the send finished. ``defer()`` puts a recipient on a
+    delay heap for a later retry without holding up anyone else. Between
+    ``open_feed()`` and ``close_feed()`` more recipients may arrive through
+    ``add()``, which blocks while ``max_pending`` are already queued;
+    retries waiting out their backoff do not count, so they never hold
+    up new recipients.
+    """
+
+    def __init__(self, recipients, weights=None, max_per_domain=None, rate_limiter=None, account=None):
+        self.queues = {}
+        for recipient in recipients:
+            domain = recipient_domain(recipient['email'])
+            queue = self.queues.get(domain)
+            if queue is None:
+                queue = self.queues[domain] = deque()
+            queue.append(recipient)
+
+        weights = {domain.lower(): weight for domain, weight in (weights or {}).items()}
+        self.configured_weights = weights
+        self.weights = {domain: max(1, int(weights.get(domain, 1))) for domain in self.queues}
+        self.credits = dict(self.weights)
+        self.rotation = deque(self.queues)
+        self.active = dict.fromkeys(self.queues, 0)
+        self.max_per_domain = max_per_domain or None
+        self.rate_limiter = rate_limiter
+        self.account = account
+        self.remaining = sum(len(queue) for queue in self.queues.values())
+        self.in_flight = 0
+        self.deferred = []
+        self._seq = itertools.count()
+        self.feeding = False
+        self.max_pending = None
+        self.stopped = False
+        self._cond = threading.Condition()
+
+    @classmethod
+    def from_config(cls, recipients, config_manager, rate_limiter=None, account=None):
+        """Build a scheduler from ``domain_weights`` and ``domain_concurrency``"""
+        try:
+            max_per_domain = int(config_manager.get("domain_concurrency", 0))
+        except (TypeError, ValueError):
+            max_per_domain = 0
+        return cls(
+            recipients,
+            weights=config_manager.get("domain_weights") or {},
+            max_per_domain=max_per_domain,
+            rate_limiter=rate_limiter,
+            account=account
+        )
+
+    def __len__(self):
+        return self.remaining
+
+    def acquire(self):
+        """Block until a recipient may be sent to; None when done or stopped"""
+        with self._cond:
+            while True:
+                if self.stopped:
+                    return None
+                if not self.remaining:
+                    if not self.in_flight and not self.feeding:
+                        return None
+                    # Sends in progress may defer a retry, the feed may add more
+                    self._cond.wait()
+                    continue
+                domain, wait = self._pick()
+                if domain is not None:
+                    break
+                # Every domain is capped, rate limited or waiting on a retry
+                self._cond.wait(wait)
+
+            recipient = self.queues[domain].popleft()
+            self.active[domain] += 1
+            self.in_flight += 1
+            self.remaining -= 1
+            if self.feeding:
+                self._cond.notify_all()
+            wait = self.rate_limiter.reserve(self.account, domain) if self.rate_limiter else 0
+
+        if wait > 0:
+            time.sleep(wait)
+        return recipient
+
+    def release(self, recipient):
+        """Mark a send as finished so its domain can be picked again"""
+        with self._cond:
+            self.active[recipient_domain(recipient['email'])] -= 1
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def defer(self, recipient, delay):
+        """Send to ``recipient`` again after ``delay`` seconds"""
+        with self._cond:
+            heapq.heappush(self.deferred, (time.monotonic() + delay, next(self._seq), recipient))
+            self.remaining += 1
+            self._cond.notify_all()
+
+    def open_feed(self, max_pending=None):
+        """Expect more recipients through ``add()`` until ``close_feed()``"""
+        with self._cond:
+            self.feeding = True
+            self.max_pending = max_pending
+
+    def add(self, recipient):
+        """Queue one more recipient; False once the scheduler is stopped"""
+        with self._cond:
+            while self.max_pending and self.queued() >= self.max_pending and not self.stopped:
+                self._cond.wait()
+            if self.stopped:
+                return False
+            self._enqueue(recipient)
+            self.remaining += 1
+            self._cond.notify_all()
+            return True
+
+    def queued(self):
+        """Recipients ready to be picked, not counting deferred retries; lock must be held"""
+        return self.remaining - len(self.deferred)
+
+    def close_feed(self):
+        """No more recipients will be added"""
+        with self._cond:
+            self.feeding = False
+            self._cond.notify_all()
+
+    def stop(self):
+        """Hand out no more recipients"""
+        with self._cond:
+            self.stopped = True
+            self._cond.notify_all()
+
+    def __iter__(self):
+        """Interleaved order for single-consumer use (no concurrency caps)"""
+        while True:
+            recipient = self.acquire()
+            if recipient is None:
+                return
+            self.release(recipient)
+            yield recipient
+
+    def _pick(self):
+        """Next ready domain, or (None, seconds to wait); lock must be held"""
+        retry_wait = self._release_deferred()
+        if self.rate_limiter:
+            # Global and account buckets hold back every domain alike
+            wait = self.rate_limiter.delay_for(self.account)
+            if wait > 0:
+                return None, wait
+
+        min_wait = None
+        for _ in range(len(self.rotation)):
+            if not self.rotation:
+                break
+            domain = self.rotation[0]
+            if not self.queues[domain]:
+                self.rotation.popleft()
+                continue
+
+            if self.max_per_domain and self.active[domain] >= self.max_per_domain:
+                self._next_turn(domain)
+                continue
+
+            if self.rate_limiter:
+                wait = self.rate_limiter.delay_for(self.account, domain)
+                if wait > 0:
+                    min_wait = wait if min_wait is None else min(min_wait, wait)
+                    self._next_turn(domain)
+                    continue
+
+            self.credits[domain] -= 1
+            if self.credits[domain] <= 0:
+                self._next_turn(domain)
+            return domain, 0
+        if retry_wait is not None:
+            min_wait = retry_wait if min_wait is None else min(min_wait, retry_wait)
+        return None, min_wait
+
+    def _release_deferred(self):
+        """Move due retries to the front of their domain queue; lock must be held"""
+        now = time.monotonic()
+        while self.deferred and self.deferred[0][0] <= now:
+            _, _, recipient = heapq.heappop(self.deferred)
+            self._enqueue(recipient, front=True)
+        return self.deferred[0][0] - now if self.deferred else None
+
+    def _enqueue(self, recipient, front=False):
+        """Put a recipient in its domain queue; lock must be held"""
+        domain = recipient_domain(recipient['email'])
+        queue = self.queues.get(domain)
+        if queue is None:
+            queue = self.queues[domain] = deque()
+            weight = max(1, int(self.configured_weights.get(domain, 1)))
+            self.weights[domain] = self.credits[domain] = weight
+            self.active[domain] = 0
+        if not queue and domain not in self.rotation:
+            self.rotation.append(domain)
+        if front:
+            queue.appendleft(recipient)
+        else:
+            queue.append(recipient)
+
+    def _next_turn(self, domain):
+        """Move the head domain to the back with a fresh set of credits"""
+        self.rotation.rotate(-1)
+        self.credits[domain] = self.weights[domain]
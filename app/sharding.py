@@ -0,0 +1,278 @@
+"""
+Multi-Account Campaign Sharding
+"""
+import threading
+import time
+from collections import deque
+from .config import ProfileConfig
+from .email_sender import EmailSender
+from .campaign import CampaignRunner
+from .dedupe import Deduplicator
+from .rate_limiter import RateLimiter, parse_rate, parse_burst
+from .recipient_source import iter_chunks
+
+
+DAY = 24 * 3600
+
+
+class ShardPlanner:
+    """Split one campaign's recipients across several SMTP accounts
+
+    Each account gets a share proportional to its ``weight`` (default 1),
+    capped by what is left of its ``daily_quota`` after the sends the
+    outbox recorded for it in the last 24 hours. Shares a capped account
+    cannot take go to the others. Recipients no account has room for are
+    returned unassigned, so they stay pending for a later resume.
+    """
+
+    def __init__(self, profiles, outbox=None):
+        self.profiles = list(profiles)
+        self.outbox = outbox
+
+    def remaining_quota(self, profile):
+        """Messages the account may still send today; None if unlimited"""
+        quota = profile.get("daily_quota")
+        if quota in (None, ""):
+            return None
+        used = 0
+        if self.outbox is not None:
+            used = self.outbox.sent_since(profile.get("email"), time.time() - DAY)
+        return max(0, int(quota) - used)
+
+    def allocate(self, count):
+        """Number of recipients per profile, in profile order"""
+        weights = [max(0.0, float(p.get("weight", 1) or 0)) for p in self.profiles]
+        caps = [self.remaining_quota(p) for p in self.profiles]
+        counts = [0] * len(self.profiles)
+        active = [i for i, w in enumerate(weights) if w > 0 and caps[i] != 0]
+        left = count
+
+        while left and active:
+            total = sum(weights[i] for i in active)
+            shares = {i: left * weights[i] / total for i in active}
+            capped = [i for i in active if caps[i] is not None and shares[i] >= caps[i]]
+            if capped:
+                # Fill the capped accounts and share the rest among the others
+                for i in capped:
+                    counts[i] = caps[i]
+                    left -= caps[i]
+                    active.remove(i)
+                continue
+            # Largest remainder keeps the total exact
+            for i in active:
+                counts[i] = int(shares[i])
+            rest = left - sum(counts[i] for i in active)
+            for i in sorted(active, key=lambda i: shares[i] - counts[i], reverse=True)[:rest]:
+                counts[i] += 1
+            left = 0
+        return counts
+
+    def plan(self, count):
+        """Return ([(profile, share)...], recipients no account has room for)"""
+        counts = self.allocate(count)
+        planned = [(p, share) for p, share in zip(self.profiles, counts) if share]
+        return planned, count - sum(counts)
+
+
+def recipient_count(recipients):
+    """Number of recipients (an upper bound for a file) without reading them; None if unknown"""
+    if hasattr(recipients, "count_rows"):
+        return recipients.count_rows()
+    try:
+        return len(recipients)
+    except TypeError:
+        return None
+
+
+class ShardFeed:
+    """One recipient stream read lazily on behalf of every shard
+
+    Each shard iterates ``shard(share)``, which takes the next recipients
+    from the common stream until it has had ``share`` of them, so only a
+    chunk per shard is in memory however long the list is. A faster
+    account takes its share sooner; no account goes over it. ``record``,
+    when given, is called with every chunk as it is read (to add the rows
+    to the outbox before they are sent).
+    """
+
+    def __init__(self, recipients, record=None, chunk_size=1000):
+        self.chunks = iter_chunks(recipients, chunk_size)
+        self.chunk_size = chunk_size
+        self.record = record
+        self.buffer = deque()
+        self._lock = threading.Lock()
+
+    def take(self, limit):
+        """Up to ``limit`` recipients; an empty list once the stream is done"""
+        with self._lock:
+            while len(self.buffer) < limit:
+                chunk = next(self.chunks, None)
+                if chunk is None:
+                    break
+                if self.record:
+                    self.record(chunk)
+                self.buffer.extend(chunk)
+            return [self.buffer.popleft() for _ in range(min(limit, len(self.buffer)))]
+
+    def shard(self, share):
+        """Iterate at most ``share`` recipients"""
+        while share > 0:
+            batch = self.take(min(self.chunk_size, share))
+            if not batch:
+                return
+            share -= len(batch)
+            yield from batch
+
+    def rest(self):
+        """Read (and record) what no shard took; returns how many there were"""
+        left = 0
+        while True:
+            batch = self.take(self.chunk_size)
+            if not batch:
+                return left
+            left += len(batch)
+
+
+class ShardedCampaign:
+    """Run one campaign over every configured SMTP account at once
+
+    A drop-in for CampaignRunner: each shard gets its own EmailSender,
+    connection set and rate limits, while progress from every shard is
+    merged into the same callbacks and one outbox campaign. The global and
+    per-domain rate limits are shared by all accounts, so adding accounts
+    never multiplies what one provider receives; only ``account_rate_limit``
+    is per account, and an account's ``hourly_quota`` becomes it unless
+    one is set.
+    """
+
+    def __init__(self, config_manager, outbox, log=None, on_sent=None, on_failed=None,
+                 on_retry=None, on_skipped=None):
+        self.config_manager = config_manager
+        self.outbox = outbox
+        self.log = log or (lambda message: None)
+        self.on_sent = on_sent
+        self.on_failed = on_failed
+        self.on_retry = on_retry
+        self.on_skipped = on_skipped
+        self.campaign_id = None
+        self.runners = []
+        self.stopped = False
+
+    def run(self, subject, body, recipients, attached_image=None, campaign_id=None):
+        """Send the campaign across all accounts; returns combined (sent, failed)
+
+        A RecipientStore or RecipientSource is planned on its row count and
+        streamed to the shards, recorded in the outbox as it is read; a
+        list is recorded up front.
+        """
+        self.stopped = False
+        streaming = not isinstance(recipients, list)
+        count = recipient_count(recipients)
+        if count is None:
+            # A plain iterator cannot be counted without reading it
+            recipients = list(recipients)
+            streaming = False
+        chunk_size = getattr(recipients, "chunk_size", 1000)
+
+        # Duplicates could land on different accounts, so drop them before
+        # the recipients are dealt out
+        dedupe = Deduplicator.from_config(self.config_manager)
+        if dedupe is not None:
+            recipients = dedupe.filter(recipients, self.duplicate)
+        if not streaming:
+            recipients = list(recipients)
+            count = len(recipients)
+
+        record = None
+        if campaign_id is None:
+            campaign_id = self.outbox.create_campaign(
+                subject, body, [] if streaming else recipients, attached_image
+            )
+            if streaming:
+                record = lambda chunk: self.outbox.add_recipients(campaign_id, chunk)
+        self.campaign_id = campaign_id
+
+        planner = ShardPlanner(self.config_manager.profiles(), self.outbox)
+        shards, unassigned = planner.plan(count)
+        for profile, share in shards:
+            self.log(f"📦 {profile.name}: {'up to ' if streaming else ''}{share} recipients")
+        feed = ShardFeed(recipients, record, chunk_size)
+
+        # One limiter for every shard, each account with its own rate
+        limiter = RateLimiter.from_config(self.config_manager)
+        self.runners = []
+        threads = []
+        for profile, share in shards:
+            config = self.shard_config(profile)
+            limiter.limit_account(
+                profile.get("email"),
+                parse_rate(config.get("account_rate_limit")),
+                parse_burst(config.get("account_burst"))
+            )
+            runner = CampaignRunner(
+                EmailSender.from_config(profile),
+                config,
+                self.outbox,
+                log=self.prefixed_log(profile.name),
+                on_sent=self.on_sent,
+                on_failed=self.on_failed,
+                on_retry=self.on_retry,
+                on_skipped=self.on_skipped
+            )
+            self.runners.append(runner)
+            threads.append(threading.Thread(
+                target=self.run_shard,
+                args=(runner, subject, body, feed.shard(share), attached_image, limiter),
+                daemon=True
+            ))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if not self.stopped:
+            # Rows over every account's quota still go in the outbox as pending
+            unassigned = feed.rest()
+            if unassigned:
+                self.log(f"⏸️ {unassigned} recipients are over today's account quotas "
+                         f"and stay pending; resume the campaign later")
+        if dedupe is not None and dedupe.duplicates:
+            self.log(f"🧹 {dedupe.summary()}")
+
+        self.outbox.finish_campaign(campaign_id)
+        sent = sum(r.success_count for r in self.runners)
+        failed = sum(r.failed_count for r in self.runners)
+        self.log(f"✅ All accounts done: {sent} sent, {failed} failed")
+        return sent, failed
+
+    def duplicate(self, recipient, winner, row):
+        """A repeated address was dropped"""
+        if self.on_skipped:
+            self.on_skipped(1, "duplicate")
+
+    def stop(self):
+        """Stop every shard after the messages in flight"""
+        self.stopped = True
+        for runner in self.runners:
+            runner.stop()
+
+    def run_shard(self, runner, subject, body, recipients, attached_image, rate_limiter):
+        """Thread body for one account"""
+        try:
+            runner.run(subject, body, recipients, attached_image, self.campaign_id, rate_limiter)
+        except Exception as e:
+            runner.log(f"❌ Shard stopped: {str(e)}")
+        finally:
+            runner.email_sender.disconnect()
+
+    @staticmethod
+    def shard_config(profile):
+        """Profile settings with its hourly quota applied as a rate limit"""
+        hourly = profile.get("hourly_quota")
+        if hourly in (None, "") or profile.get("account_rate_limit"):
+            return profile
+        return ProfileConfig(profile, {"account_rate_limit": f"{hourly}/hour"})
+
+    def prefixed_log(self, name):
+        """Log callback that tags lines with the account name"""
+        return lambda message: self.log(f"[{name}] {message}")
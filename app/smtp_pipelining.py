@@ -0,0 +1,96 @@
+"""
+ESMTP PIPELINING (RFC 2920) helpers shared by the blocking and async senders
+"""
+import re
+import smtplib
+
+
+CRLF = b"\r\n"
+_EOL_RE = re.compile(rb"(?:\r\n|\n|\r(?!\n))")
+_DOT_RE = re.compile(rb"(?m)^\.")
+
+
+def encode_message(msg):
+    """Normalize a message to CRLF line endings with dot-stuffing applied"""
+    if isinstance(msg, str):
+        try:
+            msg = msg.encode("ascii")
+        except UnicodeEncodeError:
+            msg = msg.encode("utf-8")
+    data = _DOT_RE.sub(b"..", _EOL_RE.sub(CRLF, msg))
+    if not data.endswith(CRLF):
+        data += CRLF
+    return data + b"." + CRLF
+
+
+def envelope_commands(from_addr, to_addrs):
+    """MAIL FROM, every RCPT TO and DATA as one pipelined write"""
+    lines = [f"MAIL FROM:<{from_addr}>"]
+    lines.extend(f"RCPT TO:<{address}>" for address in to_addrs)
+    lines.append("DATA")
+    return ("\r\n".join(lines) + "\r\n").encode("utf-8")
+
+
+def check_envelope_replies(from_addr, to_addrs, replies):
+    """Map pipelined replies back to the command that caused them
+
+    ``replies`` holds one (code, message) pair for MAIL FROM, one per
+    recipient and one for DATA, in that order. Returns the refused
+    recipients like ``smtplib.SMTP.sendmail`` or raises the same
+    exception smtplib would have raised for the failing command.
+    """
+    mail_code, mail_message = replies[0]
+    if mail_code != 250:
+        raise smtplib.SMTPSenderRefused(mail_code, mail_message, from_addr)
+
+    refused = {}
+    for address, (code, message) in zip(to_addrs, replies[1:-1]):
+        if code not in (250, 251):
+            refused[address] = (code, message)
+    if len(refused) == len(to_addrs):
+        raise smtplib.SMTPRecipientsRefused(refused)
+
+    data_code, data_message = replies[-1]
+    if data_code != 354:
+        raise smtplib.SMTPDataError(data_code, data_message)
+    return refused
+
+
+def sendmail_pipelined(server, from_addr, to_addrs, msg):
+    """Drop-in for ``server.sendmail`` that batches the envelope
+
+    Falls back to the lock-step ``sendmail`` when the server did not
+    advertise PIPELINING after EHLO.
+    """
+    if isinstance(to_addrs, str):
+        to_addrs = [to_addrs]
+    server.ehlo_or_helo_if_needed()
+    if not server.has_extn("pipelining"):
+        return server.sendmail(from_addr, to_addrs, msg)
+
+    server.send(envelope_commands(from_addr, to_addrs))
+    replies = [server.getreply() for _ in range(len(to_addrs) + 2)]
+    try:
+        refused = check_envelope_replies(from_addr, to_addrs, replies)
+    except smtplib.SMTPException:
+        if replies[-1][0] == 354:
+            # Server accepted DATA anyway; end the empty message before resetting
+            server.send(b"." + CRLF)
+            server.getreply()
+        _reset(server)
+        raise
+
+    server.send(encode_message(msg))
+    code, message = server.getreply()
+    if code != 250:
+        _reset(server)
+        raise smtplib.SMTPDataError(code, message)
+    return refused
+
+
+def _reset(server):
+    """RSET after a failed transaction, ignoring a dropped connection"""
+    try:
+        server.rset()
+    except smtplib.SMTPServerDisconnected:
+        pass
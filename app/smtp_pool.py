@@ -0,0 +1,141 @@
+"""
+SMTP Connection Pool
+"""
+import queue
+import smtplib
+import threading
+import time
+from contextlib import contextmanager
+
+
+# Errors that mean the session itself is unusable and must be replaced
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, OSError)
+
+
+def is_connection_error(error):
+    """True if ``error`` killed the session rather than being an SMTP reply
+
+    SMTPException derives from OSError, so a refused recipient would
+    otherwise look like a dead socket.
+    """
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    return isinstance(error, CONNECTION_ERRORS) and not isinstance(error, smtplib.SMTPException)
+
+
+class SMTPConnectionPool:
+    """Thread-safe pool of authenticated SMTP sessions
+
+    Sessions are opened lazily through ``factory`` up to ``size``. Idle
+    sessions are probed with NOOP before reuse and dead ones are replaced
+    without the caller noticing.
+    """
+
+    def __init__(self, factory, size=4, checkout_timeout=120, health_check_after=30):
+        self.factory = factory
+        self.size = max(1, int(size))
+        self.checkout_timeout = checkout_timeout
+        self.health_check_after = health_check_after
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._closed = False
+
+    def checkout(self, timeout=None):
+        """Take a live session out of the pool"""
+        if self._closed:
+            raise Exception("Connection pool is closed")
+
+        timeout = self.checkout_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        while True:
+            try:
+                server, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                server = None
+
+            if server is not None:
+                if self._is_alive(server, last_used):
+                    return server
+                self._discard(server)
+                continue
+
+            with self._lock:
+                can_create = self._created < self.size
+                if can_create:
+                    self._created += 1
+            if can_create:
+                try:
+                    return self.factory()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError("Timed out waiting for a free SMTP session")
+            try:
+                server, last_used = self._idle.get(timeout=remaining)
+            except queue.Empty:
+                raise TimeoutError("Timed out waiting for a free SMTP session")
+            if self._is_alive(server, last_used):
+                return server
+            self._discard(server)
+
+    def checkin(self, server, broken=False):
+        """Return a session to the pool, dropping it if it is broken"""
+        if broken or self._closed:
+            self._discard(server)
+        else:
+            self._idle.put((server, time.monotonic()))
+
+    @contextmanager
+    def session(self):
+        """Context manager that checks a session out and back in"""
+        server = self.checkout()
+        broken = False
+        try:
+            yield server
+        except CONNECTION_ERRORS as e:
+            broken = is_connection_error(e)
+            raise
+        finally:
+            self.checkin(server, broken=broken)
+
+    def close(self):
+        """Quit every idle session and refuse new checkouts"""
+        self._closed = True
+        while True:
+            try:
+                server, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(server)
+
+    @property
+    def open_sessions(self):
+        """Number of sessions currently opened by the pool"""
+        return self._created
+
+    def _is_alive(self, server, last_used):
+        """Probe sessions that sat idle long enough to have timed out"""
+        if time.monotonic() - last_used < self.health_check_after:
+            return True
+        try:
+            return server.noop()[0] == 250
+        except Exception:
+            return False
+
+    def _discard(self, server):
+        """Close a session and free its slot"""
+        with self._lock:
+            self._created = max(0, self._created - 1)
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
@@ -0,0 +1,265 @@
+"""
+Suppression List Index
+"""
+import array
+import hashlib
+import heapq
+import math
+import mmap
+import os
+import struct
+import tempfile
+from .recipient_source import normalize_email
+
+
+# File layout: header, Bloom filter bits, then sorted 8-byte address hashes
+MAGIC = b"SUPIDX01"
+HEADER = struct.Struct(">8sQQI4x")
+KEY = struct.Struct(">Q")
+
+# Hashes sorted in memory at a time while compiling (8 MB of keys)
+RUN_SIZE = 1 << 20
+
+
+def address_hash(email):
+    """64-bit hash of a normalized address
+
+    With 64 bits a list of ten million addresses gives about one false
+    match in two trillion lookups.
+    """
+    digest = hashlib.blake2b(normalize_email(email).encode("utf-8"), digest_size=8).digest()
+    return KEY.unpack(digest)[0]
+
+
+def read_addresses(path):
+    """Addresses from a plain-text list, one per line
+
+    Blank lines, ``#`` comments and a header line are skipped. Only the
+    first comma-separated field is used, so provider exports such as
+    ``email,reason,date`` work as they are.
+    """
+    with open(path, encoding="utf-8-sig", errors="replace") as f:
+        for line in f:
+            address = line.split(",", 1)[0].strip().strip('"')
+            if address and not address.startswith("#") and "@" in address:
+                yield address
+
+
+def bloom_size(count, fp_rate):
+    """(bits, hash count) for ``count`` keys at a false-positive rate"""
+    if not fp_rate or count == 0:
+        return 0, 0
+    bits = math.ceil(-count * math.log(fp_rate) / math.log(2) ** 2)
+    bits = max(64, (bits + 7) // 8 * 8)
+    hashes = max(1, round(bits / count * math.log(2)))
+    return bits, hashes
+
+
+def bloom_positions(key, bits, hashes):
+    """Bit positions of a key (double hashing over the two 32-bit halves)"""
+    low = key & 0xFFFFFFFF
+    step = (key >> 32) | 1
+    return [(low + i * step) % bits for i in range(hashes)]
+
+
+def compile_index(sources, index_path, fp_rate=0.01):
+    """Build the binary index for plain-text suppression lists
+
+    Hashes are sorted in runs of ``RUN_SIZE`` that spill to temporary
+    files and are merged, so memory stays bounded whatever the list size.
+    Returns the number of distinct addresses. The index is written to a
+    temporary file and moved into place, so readers never see half of it.
+    """
+    if isinstance(sources, (str, os.PathLike)):
+        sources = [sources]
+    directory = os.path.dirname(os.path.abspath(index_path))
+    os.makedirs(directory, exist_ok=True)
+
+    runs = []
+    total = 0
+    try:
+        keys = array.array("Q")
+        for source in sources:
+            for address in read_addresses(source):
+                keys.append(address_hash(address))
+                if len(keys) >= RUN_SIZE:
+                    runs.append(_spill(sorted(keys), directory))
+                    total += len(keys)
+                    keys = array.array("Q")
+        total += len(keys)
+        if runs:
+            if keys:
+                runs.append(_spill(sorted(keys), directory))
+            merged = heapq.merge(*(_read_run(run) for run in runs))
+        else:
+            merged = iter(sorted(keys))
+        del keys
+
+        bits, hashes = bloom_size(total, fp_rate)
+        bloom = bytearray(bits // 8)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                out.seek(HEADER.size + len(bloom))
+                count = 0
+                previous = None
+                buffer = array.array("Q")
+                for key in merged:
+                    if key == previous:
+                        continue
+                    previous = key
+                    count += 1
+                    for bit in bloom_positions(key, bits, hashes) if bits else ():
+                        bloom[bit >> 3] |= 1 << (bit & 7)
+                    buffer.append(key)
+                    if len(buffer) >= RUN_SIZE:
+                        _write_keys(out, buffer)
+                        buffer = array.array("Q")
+                _write_keys(out, buffer)
+                out.seek(0)
+                out.write(HEADER.pack(MAGIC, count, bits, hashes))
+                out.write(bloom)
+            os.replace(tmp_path, index_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    finally:
+        for run in runs:
+            os.unlink(run)
+    return count
+
+
+def _spill(keys, directory):
+    """Write one sorted run to a temporary file; returns its path"""
+    fd, path = tempfile.mkstemp(dir=directory, suffix=".run")
+    with os.fdopen(fd, "wb") as f:
+        array.array("Q", keys).tofile(f)
+    return path
+
+
+def _read_run(path, block=65536):
+    """Keys of a run file, read a block at a time"""
+    with open(path, "rb") as f:
+        while True:
+            keys = array.array("Q")
+            try:
+                keys.fromfile(f, block)
+            except EOFError:
+                # Short final block; fromfile keeps what it read
+                pass
+            if not keys:
+                return
+            yield from keys
+
+
+def _write_keys(out, keys):
+    """Append keys to the index in big-endian order"""
+    if not keys:
+        return
+    if struct.pack("=Q", 1) != KEY.pack(1):
+        keys.byteswap()
+    keys.tofile(out)
+
+
+class SuppressionList:
+    """Membership tests against a compiled suppression index
+
+    The index file is memory-mapped, never read whole: a lookup hashes the
+    normalized address, checks the Bloom filter (when the index has one)
+    and only then binary-searches the sorted hashes, touching O(log n)
+    pages. Most addresses are not suppressed, so most lookups end at the
+    filter.
+    """
+
+    def __init__(self, index_path):
+        self.path = index_path
+        self._file = open(index_path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, self.bloom_bits, self.bloom_hashes = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"Not a suppression index: {index_path}")
+        self._bloom_offset = HEADER.size
+        self._keys_offset = HEADER.size + self.bloom_bits // 8
+        self.checked = 0
+        self.suppressed = 0
+
+    @classmethod
+    def from_config(cls, config_manager):
+        """Open the index for ``suppression_list``; None if none is configured
+
+        ``suppression_list`` is a text file (or a list of them). It is
+        compiled to ``suppression_index`` (default: next to the first file,
+        with an ``.idx`` suffix) whenever the index is missing or older
+        than a list. ``suppression_bloom_fp`` sets the Bloom filter's
+        false-positive rate; 0 leaves the filter out.
+        """
+        sources = config_manager.get("suppression_list")
+        if not sources:
+            return None
+        if isinstance(sources, str):
+            sources = [sources]
+        index_path = config_manager.get("suppression_index") or sources[0] + ".idx"
+        try:
+            fp_rate = float(config_manager.get("suppression_bloom_fp", 0.01) or 0)
+        except (TypeError, ValueError):
+            fp_rate = 0.01
+        if cls.is_stale(index_path, sources):
+            compile_index(sources, index_path, fp_rate)
+        return cls(index_path)
+
+    @staticmethod
+    def is_stale(index_path, sources):
+        """True if the index is missing or older than any source list"""
+        try:
+            built = os.stat(index_path).st_mtime_ns
+        except FileNotFoundError:
+            return True
+        return any(os.stat(source).st_mtime_ns > built for source in sources)
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, email):
+        key = address_hash(email)
+        if self.bloom_bits:
+            data = self._map
+            offset = self._bloom_offset
+            for bit in bloom_positions(key, self.bloom_bits, self.bloom_hashes):
+                if not data[offset + (bit >> 3)] & (1 << (bit & 7)):
+                    return False
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            found = KEY.unpack_from(self._map, self._keys_offset + middle * 8)[0]
+            if found == key:
+                return True
+            if found < key:
+                low = middle + 1
+            else:
+                high = middle
+        return False
+
+    def split(self, recipients):
+        """(kept, suppressed) lists of recipient dicts"""
+        kept = []
+        suppressed = []
+        for recipient in recipients:
+            if recipient['email'] in self:
+                suppressed.append(recipient)
+            else:
+                kept.append(recipient)
+        self.checked += len(kept) + len(suppressed)
+        self.suppressed += len(suppressed)
+        return kept, suppressed
+
+    def close(self):
+        """Unmap the index"""
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
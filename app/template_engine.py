@@ -0,0 +1,44 @@
+"""
+Compiled Placeholder Templates
+"""
+import re
+
+
+PLACEHOLDER_RE = re.compile(r"\{\{\s*([^{}]+?)\s*\}\}")
+
+
+class CompiledTemplate:
+    """Email body parsed once into static and dynamic segments
+
+    Placeholders look like ``{{column}}`` and are matched case-insensitively
+    against the keys of the values passed to ``render()``, so any column of
+    the recipient CSV can be used. Unknown placeholders are left untouched.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.parts = []
+        self.slots = []
+        position = 0
+        for match in PLACEHOLDER_RE.finditer(text):
+            self.parts.append(text[position:match.start()])
+            self.slots.append((len(self.parts), match.group(1).lower()))
+            self.parts.append(match.group(0))
+            position = match.end()
+        self.parts.append(text[position:])
+
+    @property
+    def placeholders(self):
+        """Distinct placeholder names used by the template"""
+        return sorted({key for _, key in self.slots})
+
+    def render(self, values):
+        """Fill every placeholder from ``values`` with a single join"""
+        if not self.slots:
+            return self.text
+        parts = self.parts[:]
+        for index, key in self.slots:
+            value = values.get(key)
+            if value is not None:
+                parts[index] = value
+        return "".join(parts)
@@ -5,12 +5,16 @@ from tkinter import ttk, scrolledtext, filedialog, messagebox
 import tkinter as tk
 import os
 from .tab_base import TabBase
-from ..html_parser import HTMLTextExtractor
+from .text_watcher import TextChangeWatcher
+from ..html_parser import html_to_text
 
 
 class ComposeTab(TabBase):
     """Email Composition Tab"""
     
+    # Quiet time after the last edit before the preview is refreshed
+    PREVIEW_DELAY_MS = 300
+    
     def create_header_in_frame(self, parent, title, subtitle, accent_color="#6366f1"):
         """Create header in specific frame"""
         header_frame = ttk.Frame(parent, style="Card.TFrame")
@@ -91,8 +95,9 @@ class ComposeTab(TabBase):
         )
         self.email_body.pack(fill=tk.BOTH, expand=True, pady=(0, 15))
         
-        # Bind text change to update preview
-        self.email_body.bind("<KeyRelease>", lambda e: self.app.schedule_preview_update())
+        # Refresh the preview once typing pauses, and only if the text changed
+        self.preview_watcher = TextChangeWatcher(self.email_body, self.update_preview,
+                                                 delay_ms=self.PREVIEW_DELAY_MS)
         
         # Buttons frame
         buttons_frame = ttk.Frame(left_card, style="Card.TFrame")
@@ -117,7 +122,7 @@ class ComposeTab(TabBase):
         self.image_label.pack(side=tk.LEFT, padx=15)
         
         # Info
-        info_text = "💡 Placeholders: {{name}}, {{link}}, {{qrcode}}"
+        info_text = "💡 Placeholders: {{name}}, {{link}}, {{qrcode}} or any CSV column as {{column}}"
         ttk.Label(left_card, text=info_text, foreground="#0ea5e9", 
                  font=("Segoe UI", 10)).pack(anchor="w", pady=(15, 0))
         
@@ -197,7 +202,7 @@ class ComposeTab(TabBase):
             self.email_body.insert("1.0", html_content)
             
             # Update preview
-            self.app.schedule_preview_update()
+            self.preview_watcher.check()
             
             if show_message:
                 messagebox.showinfo("Success", "✅ Template loaded!")
@@ -234,16 +239,15 @@ class ComposeTab(TabBase):
         """Get attached image"""
         return self.attached_image
     
-    def update_preview(self):
+    def update_preview(self, html_content=None):
         """Update preview pane"""
-        html_content = self.get_body()
+        if html_content is None:
+            html_content = self.get_body()
         
-        # Convert HTML to plain text for preview
-        parser = HTMLTextExtractor()
+        # Convert HTML to plain text for preview (cached; edits re-parse only what changed)
         try:
-            parser.feed(html_content)
-            plain_text = parser.get_text()
-        except:
+            plain_text = html_to_text(html_content)
+        except Exception:
             plain_text = html_content
         
         self.preview_text.config(state="normal")
@@ -13,6 +13,7 @@ from app.ui.styles import AppStyles
 from app.config import ConfigManager
 from app.html_parser import HTMLTextExtractor
 from app.email_sender import EmailSender
+from app.recipient_store import RecipientStore
 
 
 class BulkEmailSender:
@@ -32,6 +33,9 @@ class BulkEmailSender:
         self.connection_status_label = None
         self.email_sender = None
         
+        # The recipient list persists between sessions
+        self.recipient_store = RecipientStore.from_config(self.config_manager)
+        
         # Setup styles
         AppStyles.configure_styles()
         
@@ -58,9 +62,6 @@ class BulkEmailSender:
         self.notebook.add(self.recipients_tab.frame, text="  👥  Recipients  ")
         self.notebook.add(self.compose_tab.frame, text="  ✉️  Compose  ")
         self.notebook.add(self.send_tab.frame, text="  🚀  Send  ")
-        
-        # Start preview updates
-        self.schedule_preview_update()
     
     def create_top_toolbar(self):
         """Create modern top toolbar with connection status"""
@@ -160,13 +161,7 @@ class BulkEmailSender:
     def test_and_connect_auto(self):
         """Test connection automatically"""
         try:
-            self.email_sender = EmailSender(
-                self.config_manager.get("server"),
-                self.config_manager.get("port"),
-                self.config_manager.get("email"),
-                self.config_manager.get("password"),
-                self.config_manager.get("reply_to")
-            )
+            self.email_sender = EmailSender.from_config(self.config_manager)
             self.email_sender.test_connection()
             self.is_connected = True
             self.update_connection_status(True)
@@ -187,9 +182,3 @@ class BulkEmailSender:
             self.connection_status_label.config(text="Not Connected", fg="#94a3b8", font=("Segoe UI", 10))
             self.connection_btn.config(text="🔌 Connect SMTP", bg="#6366f1")
             self.connection_btn.bind("<Leave>", lambda e: self.connection_btn.config(bg="#6366f1"))
-    
-    def schedule_preview_update(self):
-        """Schedule periodic preview updates"""
-        if hasattr(self, 'compose_tab'):
-            self.compose_tab.update_preview()
-        self.root.after(1000, self.schedule_preview_update)
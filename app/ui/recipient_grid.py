@@ -0,0 +1,239 @@
+"""
+Virtualized Recipient Grid
+"""
+import json
+import threading
+import tkinter as tk
+from collections import OrderedDict
+from tkinter import ttk
+
+
+ALL_DOMAINS = "All domains"
+
+
+class RecipientGrid:
+    """Paged Treeview over a RecipientStore that only renders visible rows
+
+    The Treeview never holds more than one screen of items: scrolling moves
+    an offset into the store and the visible window is re-rendered from
+    pages of ``PAGE_SIZE`` rows, fetched lazily and kept in a small LRU.
+    The scrollbar is driven by the row count; counting search matches
+    scans the table, so that runs on a worker thread and the tab stays
+    responsive however long the list is.
+    """
+
+    PAGE_SIZE = 200
+    MAX_PAGES = 16
+    SEARCH_DELAY_MS = 300
+    POLL_MS = 50
+
+    COLUMNS = (
+        ("row", "#", 70),
+        ("email", "Email", 260),
+        ("name", "Name", 180),
+        ("link", "Link", 240),
+        ("domain", "Domain", 150),
+        ("fields", "Other Fields", 260),
+    )
+
+    def __init__(self, parent, store, rows=15):
+        self.store = store
+        self.visible = rows
+        self.frame = ttk.Frame(parent, style="Card.TFrame")
+        self.search_var = tk.StringVar()
+        self.domain_var = tk.StringVar(value=ALL_DOMAINS)
+        self.total = 0
+        self.offset = 0
+        self.pages = OrderedDict()
+        self.filters = (None, None)
+        self._generation = 0
+        self._count_result = None
+        self._search_job = None
+        self._render_job = None
+        self.create_widgets()
+
+    def create_widgets(self):
+        # Search and filter bar
+        toolbar = ttk.Frame(self.frame, style="Card.TFrame")
+        toolbar.pack(fill=tk.X, pady=(0, 8))
+
+        ttk.Label(toolbar, text="🔍 Search:").pack(side=tk.LEFT, padx=(0, 6))
+        search_entry = ttk.Entry(toolbar, textvariable=self.search_var, width=32)
+        search_entry.pack(side=tk.LEFT, padx=(0, 16))
+        self.search_var.trace_add("write", self.on_search_changed)
+
+        ttk.Label(toolbar, text="🌐 Domain:").pack(side=tk.LEFT, padx=(0, 6))
+        self.domain_box = ttk.Combobox(toolbar, textvariable=self.domain_var, state="readonly", width=28)
+        self.domain_box.pack(side=tk.LEFT)
+        self.domain_box.bind("<<ComboboxSelected>>", lambda e: self.apply_filters())
+
+        self.count_label = ttk.Label(toolbar, text="", foreground="#94a3b8")
+        self.count_label.pack(side=tk.RIGHT)
+
+        # Grid with a scrollbar that maps to the whole list, not the items
+        body = ttk.Frame(self.frame, style="Card.TFrame")
+        body.pack(fill=tk.BOTH, expand=True)
+
+        self.tree = ttk.Treeview(
+            body,
+            columns=[c[0] for c in self.COLUMNS],
+            show="headings",
+            height=self.visible,
+            selectmode="browse",
+            style="Recipients.Treeview"
+        )
+        for column, heading, width in self.COLUMNS:
+            self.tree.heading(column, text=heading, anchor="w")
+            self.tree.column(column, width=width, minwidth=40, anchor="w", stretch=column != "row")
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.scrollbar = ttk.Scrollbar(body, orient="vertical", command=self.on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        # The tree only holds the visible rows, so it cannot scroll itself
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.tree.bind(sequence, self.on_wheel)
+        keys = {"<Up>": -1, "<Down>": 1, "<Prior>": -self.visible, "<Next>": self.visible}
+        for sequence, step in keys.items():
+            self.tree.bind(sequence, lambda e, step=step: self.scroll_by(step))
+        self.tree.bind("<Home>", lambda e: self.scroll_to(0))
+        self.tree.bind("<End>", lambda e: self.scroll_to(self.total))
+
+    def refresh(self):
+        """Reload after the list changed (import, add, clear)"""
+        domains = self.store.domains(50)
+        self.domain_box["values"] = [ALL_DOMAINS] + [f"{domain} ({count:,})" for domain, count in domains]
+        if self.domain_var.get() != ALL_DOMAINS and self.domain_var.get() not in self.domain_box["values"]:
+            self.domain_var.set(ALL_DOMAINS)
+        self.apply_filters(keep_offset=True)
+
+    def on_search_changed(self, *args):
+        """Debounce typing so the table is searched once the user pauses"""
+        if self._search_job is not None:
+            self.frame.after_cancel(self._search_job)
+        self._search_job = self.frame.after(self.SEARCH_DELAY_MS, self.apply_filters)
+
+    def apply_filters(self, keep_offset=False):
+        """Start over with the current search and domain filter"""
+        self._search_job = None
+        search = self.search_var.get().strip() or None
+        domain = self.domain_var.get()
+        domain = None if domain == ALL_DOMAINS else domain.rsplit(" (", 1)[0]
+        self.filters = (search, domain)
+        self.pages.clear()
+        if not keep_offset:
+            self.offset = 0
+
+        self._generation += 1
+        generation = self._generation
+        if search is None:
+            # Counting everything or one domain is answered from an index
+            self.total = self.store.count(None, domain)
+            self._count_result = (generation, self.total)
+            self.schedule_render()
+            return
+
+        # A search scans the table: show the first rows at once and let a
+        # worker count the matches
+        self.total = len(self.rows(0, self.PAGE_SIZE))
+        self.schedule_render()
+
+        def count():
+            self._count_result = (generation, self.store.count(search, domain))
+
+        threading.Thread(target=count, daemon=True).start()
+        self.frame.after(self.POLL_MS, self.poll_count, generation)
+
+    def poll_count(self, generation):
+        """Pick up the worker's row count on the Tk thread"""
+        if generation != self._generation:
+            return
+        result = self._count_result
+        if result is None or result[0] != generation:
+            self.frame.after(self.POLL_MS, self.poll_count, generation)
+            return
+        self.total = result[1]
+        self.schedule_render()
+
+    def page(self, number):
+        """One page of rows, from the LRU or the store"""
+        rows = self.pages.get(number)
+        if rows is None:
+            rows = self.store.page(number * self.PAGE_SIZE, self.PAGE_SIZE, *self.filters)
+            self.pages[number] = rows
+            if len(self.pages) > self.MAX_PAGES:
+                self.pages.popitem(last=False)
+        else:
+            self.pages.move_to_end(number)
+        return rows
+
+    def rows(self, offset, count):
+        """Rows ``offset`` to ``offset + count`` of the filtered list"""
+        rows = []
+        number = offset // self.PAGE_SIZE
+        start = offset % self.PAGE_SIZE
+        while len(rows) < count:
+            page = self.page(number)
+            rows.extend(page[start:start + count - len(rows)])
+            if len(page) < self.PAGE_SIZE:
+                break
+            number += 1
+            start = 0
+        return rows
+
+    def schedule_render(self):
+        """Render once the Tk event loop is idle, coalescing scroll events"""
+        if self._render_job is None:
+            self._render_job = self.frame.after_idle(self.render)
+
+    def render(self):
+        """Replace the tree items with the visible window"""
+        self._render_job = None
+        self.offset = max(0, min(self.offset, self.total - self.visible))
+        rows = self.rows(self.offset, self.visible)
+
+        self.tree.delete(*self.tree.get_children())
+        for position, (row_id, email, name, link, domain, data) in enumerate(rows, self.offset + 1):
+            fields = ""
+            if data:
+                fields = ", ".join(f"{key}={value}" for key, value in json.loads(data).items())
+            self.tree.insert("", tk.END, iid=str(row_id),
+                             values=(f"{position:,}", email, name or "", link or "", domain, fields))
+
+        if self.total:
+            self.scrollbar.set(self.offset / self.total, (self.offset + len(rows)) / self.total)
+            text = f"{self.offset + 1:,}–{self.offset + len(rows):,} of {self.total:,}"
+            if any(self.filters):
+                text += " matches"
+        else:
+            self.scrollbar.set(0, 1)
+            text = "No matches" if any(self.filters) else "No recipients"
+        if self._count_result is None or self._count_result[0] != self._generation:
+            text += " (counting…)"
+        self.count_label.config(text=text)
+
+    def scroll_to(self, offset):
+        self.offset = max(0, int(offset))
+        self.schedule_render()
+        return "break"
+
+    def scroll_by(self, rows):
+        return self.scroll_to(self.offset + rows)
+
+    def on_scrollbar(self, action, amount, unit=None):
+        """Scrollbar drag, arrows and trough clicks"""
+        if action == "moveto":
+            self.scroll_to(float(amount) * self.total)
+        else:
+            step = self.visible if unit == "pages" else 1
+            self.scroll_by(int(amount) * step)
+
+    def on_wheel(self, event):
+        if event.num == 4:
+            step = -3
+        elif event.num == 5:
+            step = 3
+        else:
+            step = -3 if event.delta > 0 else 3
+        # "break" keeps the tab's own canvas from scrolling too
+        return self.scroll_by(step)
@@ -1,13 +1,18 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, scrolledtext, messagebox
-import csv
 import os
+from ..import_job import ImportJob
+from ..recipient_source import iter_recipients
+from .recipient_grid import RecipientGrid
 
 
 class RecipientsTab:
+    IMPORT_POLL_MS = 100
+    
     def __init__(self, parent, app):
         self.parent = parent
         self.app = app
+        self.import_job = None
         self.frame = ttk.Frame(parent, style="Main.TFrame")
         self.create_widgets()
     
@@ -45,21 +50,62 @@ class RecipientsTab:
         import_frame = ttk.Frame(card, style="Card.TFrame")
         import_frame.pack(fill=tk.X, pady=(0, 20))
         
-        ttk.Button(import_frame, text="📂 Import CSV", command=lambda: self.import_file("csv"),
-                   style="Accent.TButton").pack(side=tk.LEFT, padx=8)
+        self.import_csv_btn = ttk.Button(import_frame, text="📂 Import CSV", command=lambda: self.import_file("csv"),
+                                         style="Accent.TButton")
+        self.import_csv_btn.pack(side=tk.LEFT, padx=8)
         
-        ttk.Button(import_frame, text="📄 Import TXT", command=lambda: self.import_file("txt"),
-                   style="Accent.TButton").pack(side=tk.LEFT, padx=8)
+        self.import_txt_btn = ttk.Button(import_frame, text="📄 Import TXT", command=lambda: self.import_file("txt"),
+                                         style="Accent.TButton")
+        self.import_txt_btn.pack(side=tk.LEFT, padx=8)
         
         ttk.Button(import_frame, text="📱 Browse QR Codes", command=self.browse_qr_codes,
                    style="Success.TButton").pack(side=tk.LEFT, padx=8)
         
-        ttk.Button(import_frame, text="🗑️ Clear", command=self.clear_recipients,
-                   style="Warning.TButton").pack(side=tk.LEFT, padx=8)
+        self.clear_btn = ttk.Button(import_frame, text="🗑️ Clear", command=self.clear_recipients,
+                                    style="Warning.TButton")
+        self.clear_btn.pack(side=tk.LEFT, padx=8)
+        
+        # Import progress, shown while a file is loading in the background
+        self.import_frame = ttk.Frame(card, style="Card.TFrame")
+        
+        self.import_progress_var = tk.DoubleVar(value=0)
+        ttk.Progressbar(
+            self.import_frame,
+            variable=self.import_progress_var,
+            maximum=1.0,
+            mode='determinate',
+            style="Success.Horizontal.TProgressbar",
+            length=400
+        ).pack(side=tk.LEFT, fill=tk.X, expand=True)
+        
+        self.import_cancel_btn = ttk.Button(self.import_frame, text="⏹ Cancel", command=self.cancel_import,
+                                            style="Warning.TButton")
+        self.import_cancel_btn.pack(side=tk.RIGHT, padx=(12, 0))
+        
+        self.import_status_label = ttk.Label(card, text="", foreground="#94a3b8", font=("Segoe UI", 10))
+        self.import_anchor = import_frame
         
         # Recipients list
         ttk.Label(card, text="Recipients List:", style="Subheader.TLabel").pack(anchor="w", pady=(20, 8))
         
+        self.summary_label = ttk.Label(card, text="", foreground="#10b981", font=("Segoe UI", 10, "bold"))
+        self.summary_label.pack(anchor="w", pady=(0, 12))
+        
+        # Paged view of the saved list; only the visible rows are rendered
+        self.grid = RecipientGrid(card, self.app.recipient_store)
+        self.grid.frame.pack(fill=tk.BOTH, expand=True, pady=(0, 20))
+        
+        # Paste box for adding recipients by hand
+        paste_header = ttk.Frame(card, style="Card.TFrame")
+        paste_header.pack(fill=tk.X, pady=(0, 8))
+        
+        ttk.Label(paste_header, text="Paste recipients (one per line), then add them to the list:",
+                 foreground="#94a3b8", font=("Segoe UI", 10)).pack(side=tk.LEFT)
+        
+        self.add_btn = ttk.Button(paste_header, text="➕ Add to List", command=self.add_pasted,
+                                  style="Success.TButton")
+        self.add_btn.pack(side=tk.RIGHT)
+        
         # Recipients text frame with better styling
         text_frame = ttk.Frame(card, style="Card.TFrame")
         text_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 5))
@@ -74,7 +120,7 @@ class RecipientsTab:
             relief="flat",
             padx=18,
             pady=18,
-            height=12,
+            height=5,
             highlightthickness=2,
             highlightbackground="#252550",
             highlightcolor="#6366f1"
@@ -133,46 +179,135 @@ class RecipientsTab:
         
         ttk.Button(helper_frame, text="📁 Open QR Folder", command=self.open_qr_folder,
                    style="Success.TButton").pack(side=tk.LEFT, padx=8)
+        
+        self.refresh_list()
     
     def import_file(self, file_type):
-        """Import recipients from file"""
+        """Import recipients from file into the saved list"""
         if file_type == "csv":
             filename = filedialog.askopenfilename(
                 title="Select CSV File",
                 filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
             )
-            if filename:
-                try:
-                    with open(filename, 'r', encoding='utf-8') as f:
-                        reader = csv.reader(f)
-                        for row in reader:
-                            if row:
-                                self.recipients_text.insert(tk.END, ','.join(row) + '\n')
-                    messagebox.showinfo("Success", "✅ Recipients imported!")
-                except Exception as e:
-                    messagebox.showerror("Error", f"❌ Failed to import: {str(e)}")
-        
-        elif file_type == "txt":
+        else:
             filename = filedialog.askopenfilename(
                 title="Select TXT File",
                 filetypes=[("Text files", "*.txt"), ("All files", "*.*")]
             )
-            if filename:
-                try:
-                    with open(filename, 'r', encoding='utf-8') as f:
-                        self.recipients_text.insert(tk.END, f.read())
-                    messagebox.showinfo("Success", "✅ Recipients imported!")
-                except Exception as e:
-                    messagebox.showerror("Error", f"❌ Failed to import: {str(e)}")
+        if not filename:
+            return
+        
+        store = self.app.recipient_store
+        replace = True
+        existing = len(store)
+        if existing:
+            answer = messagebox.askyesnocancel(
+                "Import",
+                f"The list already has {existing:,} recipients.\n\n"
+                "Yes: replace them with this file\nNo: add this file to the list"
+            )
+            if answer is None:
+                return
+            replace = answer
+        
+        # Parse and insert on a worker; the saved list stays usable meanwhile
+        self.import_job = ImportJob(
+            lambda job: store.import_file(filename, replace=replace, progress=job.report),
+            filename
+        ).start()
+        self.set_importing(True)
+        self.poll_import()
+    
+    def poll_import(self):
+        """Show the worker's progress; runs on the Tk thread every IMPORT_POLL_MS"""
+        job = self.import_job
+        for kind, value in job.events():
+            if kind == "batch":
+                continue
+            self.import_job = None
+            self.set_importing(False)
+            if kind == "done":
+                self.refresh_list()
+                messagebox.showinfo("Success", f"✅ {value:,} recipients imported!")
+            elif kind == "cancelled":
+                messagebox.showinfo("Import", "Import cancelled; the list was left as it was.")
+            else:
+                messagebox.showerror("Error", f"❌ Failed to import: {str(value)}")
+            return
+        if job.total_bytes:
+            self.import_progress_var.set(job.bytes_read / job.total_bytes)
+        prefix = "⏹ Cancelling…  " if job.cancelled else f"⏳ Importing {os.path.basename(job.path)}:  "
+        self.import_status_label.config(text=prefix + job.status())
+        self.frame.after(self.IMPORT_POLL_MS, self.poll_import)
+    
+    def cancel_import(self):
+        if self.import_job is not None:
+            self.import_job.cancel()
+    
+    def set_importing(self, importing):
+        """Show the progress row and lock the buttons that change the list"""
+        state = "disabled" if importing else "normal"
+        for button in (self.import_csv_btn, self.import_txt_btn, self.clear_btn, self.add_btn):
+            button.config(state=state)
+        if importing:
+            self.import_progress_var.set(0)
+            self.import_status_label.config(text="")
+            self.import_frame.pack(fill=tk.X, pady=(0, 6), after=self.import_anchor)
+            self.import_status_label.pack(anchor="w", pady=(0, 12), after=self.import_frame)
+        else:
+            self.import_frame.pack_forget()
+            self.import_status_label.pack_forget()
+    
+    def pasted_recipients(self):
+        """Recipients in the paste box; None if it holds text that does not parse"""
+        text = self.recipients_text.get("1.0", tk.END).strip()
+        if not text:
+            return []
+        return list(iter_recipients(text.split('\n'))) or None
+    
+    def add_pasted(self, quiet=False, recipients=None):
+        """Add the recipients in the paste box to the saved list; returns how many"""
+        if recipients is None:
+            recipients = self.pasted_recipients()
+        if recipients is None:
+            messagebox.showerror("Error", "❌ Invalid recipients format!")
+            return 0
+        if not recipients:
+            return 0
+        count = self.app.recipient_store.add(recipients)
+        self.recipients_text.delete("1.0", tk.END)
+        self.refresh_list()
+        if not quiet:
+            messagebox.showinfo("Success", f"✅ {count:,} recipients added!")
+        return count
     
     def clear_recipients(self):
         """Clear all recipients"""
         if messagebox.askyesno("Confirm", "Clear all recipients?"):
+            self.app.recipient_store.clear()
             self.recipients_text.delete("1.0", tk.END)
+            self.refresh_list()
+    
+    def get_recipients(self):
+        """The saved recipient list (not including the paste box)"""
+        return self.app.recipient_store
     
-    def get_recipients_text(self):
-        """Get recipients text"""
-        return self.recipients_text.get("1.0", tk.END)
+    def refresh_list(self):
+        """Show the size and origin of the saved list and reload the grid"""
+        self.grid.refresh()
+        store = self.app.recipient_store
+        count = len(store)
+        if not count:
+            self.summary_label.config(text="📭 No recipients yet: import a file or paste addresses below")
+            return
+        text = f"📇 {count:,} recipients saved"
+        source = store.info().get("source")
+        if source:
+            text += f"  ·  imported from {os.path.basename(source)}"
+        domains = store.domains(3)
+        if domains:
+            text += "  ·  top domains: " + ", ".join(f"{domain} ({n:,})" for domain, n in domains)
+        self.summary_label.config(text=text)
     
     def browse_qr_codes(self):
         """Browse and list QR codes in data/qrcodes folder"""
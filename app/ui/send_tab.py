@@ -3,16 +3,23 @@ Send Campaign Tab
 """
 from tkinter import ttk, scrolledtext, messagebox
 import tkinter as tk
-from datetime import datetime
 import threading
-import time
 from .tab_base import TabBase
+from .status_log import StatusLog
 from ..email_sender import EmailSender
+from ..campaign import CampaignRunner
+from ..sharding import ShardedCampaign
+from ..outbox import Outbox
+from ..event_bus import EventBus
 
 
 class SendTab(TabBase):
     """Send Campaign Tab"""
     
+    # How often the UI applies the campaign's progress events
+    TICK_MS = 100
+    MAX_LOG_LINES = 1000
+    
     def create_header_in_frame(self, parent, title, subtitle, accent_color="#6366f1"):
         """Create header in specific frame"""
         header_frame = ttk.Frame(parent, style="Card.TFrame")
@@ -111,6 +118,8 @@ class SendTab(TabBase):
             highlightcolor="#6366f1"
         )
         self.status_text.pack(fill=tk.BOTH, expand=True, pady=(0, 20))
+        self.status_log = StatusLog(self.status_text, self.MAX_LOG_LINES)
+        self.events = EventBus(self.MAX_LOG_LINES)
         
         # Send button
         self.send_button = ttk.Button(
@@ -121,15 +130,21 @@ class SendTab(TabBase):
         )
         self.send_button.pack(pady=(10, 0))
         
+        # Resume button
+        self.resume_button = ttk.Button(
+            card,
+            text="⏯️ Resume Campaign",
+            command=self.resume_campaign,
+            style="Accent.TButton"
+        )
+        self.resume_button.pack(pady=(10, 0))
+        
         self.is_sending = False
+        self.outbox = None
     
     def log_status(self, message):
-        """Log message to status text"""
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        self.status_text.config(state="normal")
-        self.status_text.insert(tk.END, f"[{timestamp}] {message}\n")
-        self.status_text.see(tk.END)
-        self.status_text.config(state="disabled")
+        """Log message to status text; safe from the send threads"""
+        self.events.log(message)
     
     def start_campaign(self):
         """Start sending campaign"""
@@ -144,90 +159,169 @@ class SendTab(TabBase):
         
         subject = self.app.compose_tab.get_subject()
         body = self.app.compose_tab.get_body()
-        recipients_text = self.app.recipients_tab.get_recipients_text()
         
         if not subject and not body:
             messagebox.showerror("Error", "❌ Email content is empty!")
             return
         
-        if not recipients_text.strip():
-            messagebox.showerror("Error", "❌ No recipients added!")
+        if self.app.recipients_tab.import_job is not None:
+            messagebox.showwarning("Warning", "Recipients are still being imported!")
             return
         
-        # Parse recipients
-        recipients = self.app.email_sender.parse_recipients(recipients_text)
+        # Addresses still in the paste box join the list, but only once the
+        # send is confirmed
+        pasted = self.app.recipients_tab.pasted_recipients()
+        if pasted is None:
+            messagebox.showerror("Error", "❌ Invalid recipients format in the paste box!")
+            return
         
-        if not recipients:
-            messagebox.showerror("Error", "❌ Invalid recipients format!")
+        # The saved list, streamed from SQLite while sending
+        recipients = self.app.recipients_tab.get_recipients()
+        count = len(recipients) + len(pasted)
+        
+        if not count:
+            messagebox.showerror("Error", "❌ No recipients added!")
             return
         
         # Confirm
-        count = len(recipients)
         if not messagebox.askyesno("Confirm", f"Send {count} emails?"):
             return
         
+        if pasted:
+            self.app.recipients_tab.add_pasted(quiet=True, recipients=pasted)
+        
         # Start sending in thread
+        self.start_thread(subject, body, recipients, self.app.compose_tab.get_image())
+    
+    def resume_campaign(self):
+        """Resume the last unfinished campaign, skipping recipients already sent"""
+        if self.is_sending:
+            messagebox.showwarning("Warning", "Campaign already in progress!")
+            return
+        
+        if not self.app.email_sender:
+            messagebox.showerror("Error", "❌ Not connected to SMTP server!")
+            return
+        
+        outbox = self.get_outbox()
+        campaign = outbox.latest_unfinished()
+        if not campaign:
+            messagebox.showinfo("Resume", "No unfinished campaign to resume.")
+            return
+        
+        recipients = outbox.unsent_recipients(campaign['id'])
+        if not recipients:
+            outbox.finish_campaign(campaign['id'])
+            messagebox.showinfo("Resume", "Every recipient of the last campaign was already sent.")
+            return
+        
+        done = campaign['total'] - len(recipients)
+        if not messagebox.askyesno(
+            "Resume",
+            f"Resume \"{campaign['subject'] or 'Untitled'}\"?\n"
+            f"{done} of {campaign['total']} already sent, {len(recipients)} remaining."
+        ):
+            return
+        
+        self.start_thread(campaign['subject'], campaign['body'], recipients, campaign['image'], campaign['id'])
+    
+    def start_thread(self, subject, body, recipients, attached_image, campaign_id=None):
+        """Start the background send thread"""
         self.is_sending = True
         self.send_button.config(state="disabled")
+        self.resume_button.config(state="disabled")
+        self.total = len(recipients)
+        self.sent_count = 0
         
         threading.Thread(
             target=self.send_emails_thread,
-            args=(subject, body, recipients),
+            args=(subject, body, recipients, attached_image, campaign_id),
             daemon=True
         ).start()
+        self.tick()
     
-    def send_emails_thread(self, subject, body, recipients):
-        """Send emails in background thread"""
-        total = len(recipients)
-        success = 0
-        failed = 0
-        
-        self.log_status(f"🚀 Starting campaign: {total} emails")
-        
-        for i, recipient in enumerate(recipients, 1):
-            try:
-                # Default subject if empty
-                final_subject = subject if subject.strip() else f"Campaign - {datetime.now().strftime('%Y-%m-%d')}"
-                
-                # Replace placeholders in HTML content
-                personalized_body = body
-                personalized_body = personalized_body.replace('{{name}}', recipient['name'])
-                personalized_body = personalized_body.replace('{{link}}', recipient['link'])
-                
-                # Handle embedded images
-                embedded_images = None
-                attached_image = self.app.compose_tab.get_image()
-                if attached_image:
-                    embedded_images = {'attached_image': attached_image}
-                
-                # Send email
-                self.app.email_sender.send_email(
-                    to_email=recipient['email'],
-                    subject=final_subject,
-                    html_content=personalized_body,
-                    embedded_images=embedded_images
-                )
-                
-                success += 1
-                self.log_status(f"✅ Sent to {recipient['email']}")
-                
-            except Exception as e:
-                failed += 1
-                self.log_status(f"❌ Failed {recipient['email']}: {str(e)}")
-            
-            # Update progress
-            progress = int((i / total) * 100)
-            self.progress_var.set(progress)
-            self.progress_label.config(text=f"{i} / {total} sent")
-            
-            # Delay between emails
-            if i < total:
-                delay = int(self.app.config_manager.get("delay", "10"))
-                time.sleep(delay)
+    def tick(self):
+        """Apply what the send threads published since the last tick
+        
+        Runs on the Tk thread every TICK_MS while a campaign is running, so
+        the UI does a fixed amount of work per tick however fast mail goes out.
+        """
+        events, lines = self.events.drain()
+        self.status_log.write(lines)
+        step = 0
+        finished = None
+        for kind, args in events:
+            if kind == "progress":
+                step += args[0]
+            elif kind == "finished":
+                finished = args
+        if step:
+            self.update_progress(step)
+        if finished is None:
+            self.frame.after(self.TICK_MS, self.tick)
+            return
         
         # Complete
-        self.log_status(f"✅ Campaign complete: {success} sent, {failed} failed")
         self.is_sending = False
         self.send_button.config(state="normal")
-        
-        messagebox.showinfo("Complete", f"Campaign finished!\n✅ {success} sent\n❌ {failed} failed")
+        self.resume_button.config(state="normal")
+        success, failed, error = finished
+        if error is not None:
+            messagebox.showerror("Error", f"❌ Campaign failed: {error}")
+        else:
+            messagebox.showinfo("Complete", f"Campaign finished!\n✅ {success} sent\n❌ {failed} failed")
+    
+    def get_outbox(self):
+        """Open the campaign outbox on first use"""
+        if self.outbox is None:
+            self.outbox = Outbox.from_config(self.app.config_manager)
+        return self.outbox
+    
+    def send_emails_thread(self, subject, body, recipients, attached_image=None, campaign_id=None):
+        """Send emails in background thread
+        
+        Never touches tkinter: progress and log lines are published to the
+        event bus and applied by ``tick`` on the Tk thread.
+        """
+        events = self.events
+        
+        def on_sent(to_email):
+            events.log(f"✅ Sent to {to_email}")
+            events.publish("progress", 1)
+        
+        def on_failed(to_email, error):
+            events.log(f"❌ Failed {to_email}: {str(error)}")
+            events.publish("progress", 1)
+        
+        def on_retry(to_email, error, delay):
+            events.log(f"🔁 Retrying {to_email} in {delay:.0f}s: {str(error)}")
+        
+        def on_skipped(count, reason):
+            events.publish("progress", count)
+        
+        callbacks = dict(log=self.log_status, on_sent=on_sent, on_failed=on_failed,
+                         on_retry=on_retry, on_skipped=on_skipped)
+        if len(self.app.config_manager.profiles()) > 1:
+            # Several accounts: split the list and merge their progress here
+            runner = ShardedCampaign(self.app.config_manager, self.get_outbox(), **callbacks)
+        else:
+            runner = CampaignRunner(
+                self.app.email_sender, self.app.config_manager, self.get_outbox(), **callbacks
+            )
+        try:
+            success, failed = runner.run(subject, body, recipients, attached_image, campaign_id)
+        except Exception as e:
+            events.log(f"❌ Campaign failed: {str(e)}")
+            events.publish("finished", None, None, str(e))
+            return
+        events.publish("finished", success, failed, None)
+    
+    def update_progress(self, step=1):
+        """Advance the progress bar by ``step`` messages (Tk thread only)"""
+        self.sent_count += step
+        i = self.sent_count
+        total = self.total
+        progress = int((i / total) * 100) if total else 100
+        self.progress_var.set(progress)
+        self.progress_label.config(text=f"{i} / {total} sent")
+        return i
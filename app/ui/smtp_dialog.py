@@ -4,6 +4,7 @@ SMTP Settings Dialog
 from tkinter import ttk, messagebox, scrolledtext
 import tkinter as tk
 from ..email_sender import EmailSender
+from ..rate_limiter import parse_rate
 
 
 class SMTPSettingsDialog:
@@ -141,9 +142,37 @@ class SMTPSettingsDialog:
         self.delay_entry.grid(row=6, column=1, sticky="ew", pady=12, padx=(15, 0))
         self.delay_entry.insert(0, self.app.config_manager.get("delay", "10"))
         
-        tk.Label(form_frame, text="Time to wait between emails", font=("Segoe UI", 9),
+        tk.Label(form_frame, text="Minimum spacing between emails", font=("Segoe UI", 9),
                 fg="#9ca3af", bg="#0e0e22").grid(row=7, column=1, sticky="w", padx=(15, 0))
         
+        # Connection pool size
+        tk.Label(form_frame, text="Connections:", font=("Segoe UI", 11, "bold"),
+                fg="#f8fafc", bg="#0e0e22").grid(row=8, column=0, sticky="w", pady=12)
+        
+        self.pool_size_entry = tk.Entry(form_frame, font=("Segoe UI", 11), width=35,
+                                        bg="#1a1a3a", fg="#f8fafc", insertbackground="#6366f1",
+                                        relief="flat", bd=0, highlightthickness=2,
+                                        highlightbackground="#252550", highlightcolor="#6366f1")
+        self.pool_size_entry.grid(row=8, column=1, sticky="ew", pady=12, padx=(15, 0))
+        self.pool_size_entry.insert(0, self.app.config_manager.get("pool_size", "1"))
+        
+        tk.Label(form_frame, text="Parallel SMTP sessions used while sending", font=("Segoe UI", 9),
+                fg="#9ca3af", bg="#0e0e22").grid(row=9, column=1, sticky="w", padx=(15, 0))
+        
+        # Rate limit
+        tk.Label(form_frame, text="Rate Limit:", font=("Segoe UI", 11, "bold"),
+                fg="#f8fafc", bg="#0e0e22").grid(row=10, column=0, sticky="w", pady=12)
+        
+        self.rate_limit_entry = tk.Entry(form_frame, font=("Segoe UI", 11), width=35,
+                                         bg="#1a1a3a", fg="#f8fafc", insertbackground="#6366f1",
+                                         relief="flat", bd=0, highlightthickness=2,
+                                         highlightbackground="#252550", highlightcolor="#6366f1")
+        self.rate_limit_entry.grid(row=10, column=1, sticky="ew", pady=12, padx=(15, 0))
+        self.rate_limit_entry.insert(0, self.app.config_manager.get("rate_limit", ""))
+        
+        tk.Label(form_frame, text="e.g. 500/hour (overrides delay when set)", font=("Segoe UI", 9),
+                fg="#9ca3af", bg="#0e0e22").grid(row=11, column=1, sticky="w", padx=(15, 0))
+        
         form_frame.columnconfigure(1, weight=1)
         
         # Info section
@@ -233,13 +262,21 @@ class SMTPSettingsDialog:
             "email": self.email_entry.get().strip(),
             "password": self.password_entry.get().strip(),
             "reply_to": self.reply_to_entry.get().strip(),
-            "delay": self.delay_entry.get().strip()
+            "delay": self.delay_entry.get().strip(),
+            "pool_size": self.pool_size_entry.get().strip() or "1",
+            "rate_limit": self.rate_limit_entry.get().strip()
         }
         
         if not all([config["server"], config["port"], config["email"]]):
             messagebox.showerror("Error", "❌ Server, Port, and Email are required!")
             return
         
+        try:
+            parse_rate(config["rate_limit"])
+        except ValueError as e:
+            messagebox.showerror("Error", f"❌ {str(e)}")
+            return
+        
         self.app.config_manager.update(config)
         if self.app.config_manager.save(self.app.config_manager.config):
             messagebox.showinfo("Success", "✅ Settings saved!")
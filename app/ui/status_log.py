@@ -0,0 +1,41 @@
+"""
+Bounded Status Log
+"""
+import tkinter as tk
+
+
+class StatusLog:
+    """A Text widget used as a ring buffer of at most ``max_lines`` lines
+
+    Each ``write`` inserts its lines in one call and trims the oldest from
+    the top, so the widget never grows and the cost of writing does not
+    depend on how much has been logged before.
+    """
+
+    def __init__(self, text, max_lines=1000):
+        self.text = text
+        self.max_lines = max_lines
+        self.lines = 0
+
+    def write(self, lines):
+        if not lines:
+            return
+        lines = lines[-self.max_lines:]
+        state = self.text.cget("state")
+        self.text.config(state="normal")
+        chunk = "\n".join(lines) + "\n"
+        self.text.insert(tk.END, chunk)
+        self.lines += chunk.count("\n")
+        excess = self.lines - self.max_lines
+        if excess > 0:
+            self.text.delete("1.0", f"{excess + 1}.0")
+            self.lines -= excess
+        self.text.see(tk.END)
+        self.text.config(state=state)
+
+    def clear(self):
+        state = self.text.cget("state")
+        self.text.config(state="normal")
+        self.text.delete("1.0", tk.END)
+        self.text.config(state=state)
+        self.lines = 0
@@ -120,6 +120,25 @@ class AppStyles:
                        borderwidth=0,
                        relief="flat")
         
+        # Recipient grid
+        style.configure("Recipients.Treeview",
+                       background=AppStyles.BG_ELEVATED,
+                       fieldbackground=AppStyles.BG_ELEVATED,
+                       foreground=AppStyles.TEXT_PRIMARY,
+                       font=("Segoe UI", 10),
+                       rowheight=26,
+                       borderwidth=0)
+        
+        style.map("Recipients.Treeview",
+                 background=[("selected", AppStyles.ACCENT_PRIMARY)],
+                 foreground=[("selected", "white")])
+        
+        style.configure("Recipients.Treeview.Heading",
+                       background=AppStyles.BG_HOVER,
+                       foreground=AppStyles.TEXT_SECONDARY,
+                       font=("Segoe UI", 10, "bold"),
+                       relief="flat")
+        
         # Progressbar
         style.configure("Custom.Horizontal.TProgressbar",
                        background=AppStyles.ACCENT_SUCCESS,
@@ -0,0 +1,45 @@
+"""
+Debounced Text Change Notifications
+"""
+import hashlib
+
+
+class TextChangeWatcher:
+    """Call ``callback(content)`` once a Text widget's content has changed
+
+    Tk raises ``<<Modified>>`` when the widget's modified flag goes up; the
+    watcher lowers it again so the next edit fires too, and waits for
+    ``delay_ms`` without edits before reading the content. A hash of what
+    was last handed to the callback is kept, so an undo back to the same
+    text or reloading an unchanged template does no work. Nothing runs
+    while the text is left alone.
+    """
+
+    def __init__(self, text, callback, delay_ms=300):
+        self.text = text
+        self.callback = callback
+        self.delay_ms = delay_ms
+        self._digest = None
+        self._job = None
+        text.bind("<<Modified>>", self.on_modified, add="+")
+
+    def on_modified(self, event=None):
+        # Clearing the flag raises <<Modified>> again; ignore that one
+        if not self.text.edit_modified():
+            return
+        self.text.edit_modified(False)
+        if self._job is not None:
+            self.text.after_cancel(self._job)
+        self._job = self.text.after(self.delay_ms, self.check)
+
+    def check(self, force=False):
+        """Run the callback now if the content differs from the last run"""
+        if self._job is not None:
+            self.text.after_cancel(self._job)
+            self._job = None
+        content = self.text.get("1.0", "end-1c")
+        digest = hashlib.blake2b(content.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        if digest == self._digest and not force:
+            return
+        self._digest = digest
+        self.callback(content)
@@ -0,0 +1,210 @@
+"""
+Recipient Address Validation
+"""
+import functools
+import itertools
+import re
+import socket
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Verdicts, also used as the reason when a recipient is skipped
+VALID = "valid"
+INVALID = "invalid"
+DISPOSABLE = "disposable"
+NO_MX = "no-mx"
+
+# RFC 5322 dot-atom local part (at most 64 characters, checked from the
+# match) capturing the domain, and an LDH (letter-digit-hyphen) domain
+ATEXT = r"[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]"
+ADDRESS_RE = re.compile(rf"{ATEXT}+(?:\.{ATEXT}+)*@([^@]+)\Z")
+MAX_LOCAL = 64
+DOMAIN_RE = re.compile(
+    r"(?=.{1,253}\Z)(?:(?!-)[a-z0-9-]{1,63}(?<!-)\.)+(?:[a-z]{2,63}|xn--[a-z0-9-]{1,59})\Z"
+)
+
+# Throwaway-inbox providers; extend with ``disposable_domains``
+DISPOSABLE_DOMAINS = frozenset({
+    "10minutemail.com", "20minutemail.com", "discard.email", "dispostable.com",
+    "emailondeck.com", "fakeinbox.com", "getnada.com", "guerrillamail.com",
+    "guerrillamail.net", "maildrop.cc", "mailinator.com", "mailnesia.com",
+    "mintemail.com", "mohmal.com", "sharklasers.com", "spamgourmet.com",
+    "temp-mail.org", "tempmail.com", "tempmailo.com", "throwawaymail.com",
+    "trashmail.com", "yopmail.com",
+})
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def valid_domain(domain):
+    """True if ``domain`` is a syntactically valid mail domain"""
+    return DOMAIN_RE.match(domain.lower()) is not None
+
+
+def valid_address(email):
+    """True if ``email`` is a syntactically valid address
+
+    One precompiled match covers the local part and captures the domain,
+    whose verdict is cached, so a list dominated by a few providers checks
+    each domain once.
+    """
+    domain = address_domain(email)
+    return domain is not None and valid_domain(domain)
+
+
+def address_domain(email, match=ADDRESS_RE.match):
+    """Domain of an address whose local part is valid, or None"""
+    found = match(email)
+    # Only long addresses can have an over-long local part
+    if found is None or (len(email) > MAX_LOCAL + 1 and found.start(1) > MAX_LOCAL + 1):
+        return None
+    return found[1]
+
+
+def load_domains(path):
+    """Lower-cased domains from a text file, one per line (``#`` comments)"""
+    with open(path, encoding="utf-8") as f:
+        return {
+            line.strip().lower() for line in f
+            if line.strip() and not line.lstrip().startswith("#")
+        }
+
+
+def address_resolver(domain):
+    """True if ``domain`` resolves, False if it does not exist, None if unknown
+
+    Mail for a domain without MX records goes to its address (RFC 5321
+    section 5.1), so resolving the name is the standard-library stand-in
+    for an MX lookup. Pass a real MX resolver to Validator to be stricter.
+    """
+    try:
+        socket.getaddrinfo(domain, 25, type=socket.SOCK_STREAM)
+        return True
+    except socket.gaierror as e:
+        if e.errno in (socket.EAI_NONAME, getattr(socket, "EAI_NODATA", socket.EAI_NONAME)):
+            return False
+        return None
+    except OSError:
+        return None
+
+
+class Validator:
+    """Campaign-scoped address validation with a per-domain verdict cache
+
+    Each address gets a syntax check. Its domain is checked once per
+    campaign: syntax, the disposable-domain list (subdomains included),
+    then, when a ``resolver`` is given, whether it can receive mail.
+    ``resolver(domain)`` returns True, False or None (unknown, accepted);
+    the new domains of each batch are resolved concurrently.
+    """
+
+    def __init__(self, disposable=DISPOSABLE_DOMAINS, resolver=None,
+                 batch_size=1000, resolver_threads=16):
+        self.disposable = frozenset(disposable)
+        self.resolver = resolver
+        self.batch_size = max(1, int(batch_size))
+        self.resolver_threads = resolver_threads
+        self.verdicts = {}
+        self.checked = 0
+        self.rejected = Counter()
+
+    @classmethod
+    def from_config(cls, config_manager):
+        """Validator for the campaign settings; None when ``validate`` is false
+
+        ``reject_disposable`` (default true) applies the built-in list plus
+        any ``disposable_domains`` file, and ``validate_mx`` (default
+        false) rejects domains that do not resolve.
+        """
+        if not config_manager.get("validate", True):
+            return None
+        disposable = set()
+        if config_manager.get("reject_disposable", True):
+            disposable.update(DISPOSABLE_DOMAINS)
+            if config_manager.get("disposable_domains"):
+                disposable.update(load_domains(config_manager.get("disposable_domains")))
+        resolver = address_resolver if config_manager.get("validate_mx", False) else None
+        return cls(disposable=disposable, resolver=resolver)
+
+    def verdict(self, email):
+        """VALID, INVALID, DISPOSABLE or NO_MX for one address"""
+        domain = address_domain(email)
+        if domain is None:
+            return INVALID
+        if domain not in self.verdicts:
+            self.prefetch([domain])
+        return self.verdicts[domain]
+
+    def prefetch(self, domains):
+        """Work out verdicts for domains not seen yet, resolving them concurrently
+
+        Verdicts are keyed by the domain as written; checks use it lower-cased.
+        """
+        new = {domain for domain in domains if domain not in self.verdicts}
+        to_resolve = []
+        for domain in new:
+            if not valid_domain(domain):
+                self.verdicts[domain] = INVALID
+            elif self.is_disposable(domain.lower()):
+                self.verdicts[domain] = DISPOSABLE
+            elif self.resolver is None:
+                self.verdicts[domain] = VALID
+            else:
+                to_resolve.append(domain)
+        if not to_resolve:
+            return
+        if len(to_resolve) == 1:
+            results = [self.resolver(to_resolve[0].lower())]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.resolver_threads, len(to_resolve))) as executor:
+                results = list(executor.map(self.resolver, [d.lower() for d in to_resolve]))
+        for domain, found in zip(to_resolve, results):
+            self.verdicts[domain] = NO_MX if found is False else VALID
+
+    def is_disposable(self, domain):
+        """True if ``domain`` or a parent domain is on the disposable list"""
+        if not self.disposable:
+            return False
+        labels = domain.split(".")
+        return any(".".join(labels[i:]) in self.disposable for i in range(len(labels) - 1))
+
+    def split(self, recipients):
+        """(valid recipients, [(recipient, verdict), ...]) for one batch"""
+        recipients = list(recipients)
+        domains = [address_domain(r['email']) for r in recipients]
+        verdicts = self.verdicts
+        new = {d for d in domains if d is not None and d not in verdicts}
+        if new:
+            self.prefetch(new)
+        valid = []
+        rejected = []
+        for recipient, domain in zip(recipients, domains):
+            verdict = INVALID if domain is None else verdicts[domain]
+            if verdict == VALID:
+                valid.append(recipient)
+            else:
+                rejected.append((recipient, verdict))
+                self.rejected[verdict] += 1
+        self.checked += len(recipients)
+        return valid, rejected
+
+    def filter(self, recipients, on_rejected=None):
+        """Yield valid recipients, validating ``batch_size`` at a time
+
+        ``on_rejected(recipient, verdict)`` is called for each one dropped.
+        """
+        recipients = iter(recipients)
+        while True:
+            batch = list(itertools.islice(recipients, self.batch_size))
+            if not batch:
+                return
+            valid, rejected = self.split(batch)
+            if on_rejected:
+                for recipient, verdict in rejected:
+                    on_rejected(recipient, verdict)
+            yield from valid
+
+    def summary(self):
+        """One line counting rejected recipients by verdict"""
+        counts = ", ".join(f"{count} {verdict}" for verdict, count in self.rejected.most_common())
+        return f"{sum(self.rejected.values())} recipients rejected ({counts})"
@@ -0,0 +1,183 @@
+"""
+Email Builder Watermark Removal
+"""
+import re
+
+
+# Comments (an unclosed one runs to the end) and the tags of the given
+# elements. Quoted attribute values may not contain < or >, which keeps a
+# failed match short and the whole scan linear; such a tag is left as text.
+TOKEN_PATTERN = (
+    r"<!--.*?(?:-->|\Z)"
+    r"|<(/?)(%s)(?![a-zA-Z0-9:-])((?:\"[^\"<>]*\"|'[^'<>]*'|[^'\"<>])*)>"
+)
+
+
+class WatermarkRule:
+    """Remove the innermost ``container`` element whose markup matches ``marker``
+
+    ``marker`` is a regular expression searched in every tag, text run and
+    comment inside the element, e.g. the builder's logo URL or link.
+    """
+
+    def __init__(self, name, container, marker):
+        self.name = name
+        self.container = container.lower()
+        self.marker = re.compile(marker, re.IGNORECASE) if isinstance(marker, str) else marker
+
+    def __repr__(self):
+        return f"WatermarkRule({self.name!r}, {self.container!r}, {self.marker.pattern!r})"
+
+
+# "Designed with Beefree": the logo row and the table linking to the builder
+BEEFREE_RULES = (
+    WatermarkRule("beefree-logo", "tr", r"Beefree-logo\.png"),
+    WatermarkRule("beefree-link", "table", r"designedwithbeefree\.com"),
+)
+
+
+class WatermarkStripper:
+    """Removes watermark blocks from HTML in one pass
+
+    The tags of the rules' container elements are tokenized left to right
+    while a stack of the open ones is kept, and each marker found is
+    charged to the innermost open container of its rule. So a rule removes
+    exactly the element that contains its marker, however deeply tables
+    are nested, where a lazy ``<tr>.*?marker.*?</tr>`` starts at the first
+    row in the document. Unclosed children are closed by their parent's
+    end tag, as browsers do. Other tags do not change which container
+    holds a marker, so they are skipped at regex speed.
+
+    HTML can be fed in pieces: ``feed()`` returns the output that can no
+    longer be affected, which is everything before the outermost open
+    container, and ``close()`` returns the rest.
+    """
+
+    def __init__(self, rules=BEEFREE_RULES):
+        self.rules = tuple(rules)
+        self.containers = frozenset(rule.container for rule in self.rules)
+        self.token_re = re.compile(
+            TOKEN_PATTERN % "|".join(sorted(map(re.escape, self.containers))),
+            re.IGNORECASE | re.DOTALL
+        )
+        self.removed = []
+        self._buffer = ""
+        self._offset = 0       # absolute position of _buffer[0]
+        self._scanned = 0      # absolute position tokenizing has reached
+        self._stack = []       # [tag, start, removed by rule] for open containers
+        self._spans = []       # (start, end) to drop, absolute and ordered
+
+    def feed(self, html):
+        """Add HTML; returns the output that is final so far"""
+        self._buffer += html
+        # Only tokenize up to the last "<": the tag it starts may not be complete
+        end = self._buffer.rfind("<")
+        if end > self._scanned - self._offset:
+            self._scan(end, final=False)
+        return self._emit(final=False)
+
+    def close(self):
+        """Finish the document; returns the remaining output"""
+        self._scan(len(self._buffer), final=True)
+        return self._emit(final=True)
+
+    def strip(self, html):
+        """Whole-document convenience: ``feed(html) + close()``"""
+        return self.feed(html) + self.close()
+
+    def _scan(self, end, final):
+        buffer = self._buffer
+        offset = self._offset
+        position = self._scanned - offset
+        hits = sorted(
+            (found.start(), index)
+            for index, rule in enumerate(self.rules)
+            for found in rule.marker.finditer(buffer, position, end)
+        )
+        hits.reverse()
+        for token in self.token_re.finditer(buffer, position, end):
+            start = token.start()
+            tag = token.group(2)
+            if tag is None and not final and not token.group().endswith("-->"):
+                # A comment that may close in the next piece
+                end = start
+                break
+            position = token.end()
+            if tag is None:
+                self._charge(hits, position)
+                continue
+            tag = tag.lower()
+            self._charge(hits, start)
+            if not token.group(1):
+                # A start tag belongs to its own element: push, then charge
+                if not token.group(3).endswith("/"):
+                    self._stack.append([tag, offset + start, None])
+                self._charge(hits, position)
+                continue
+            self._charge(hits, position)
+            for depth in range(len(self._stack) - 1, -1, -1):
+                if self._stack[depth][0] == tag:
+                    break
+            else:
+                continue
+            closed = self._stack[depth:]
+            del self._stack[depth:]
+            for element in reversed(closed):
+                if element[2] is not None:
+                    self._drop(element, offset + position)
+        # Text after the last token is complete up to ``end``
+        self._charge(hits, end)
+        self._scanned = offset + max(position, end)
+
+    def _charge(self, hits, before):
+        """Mark the innermost open container for each marker found before ``before``
+
+        ``hits`` holds (position, rule index) pairs, last one first.
+        """
+        while hits and hits[-1][0] < before:
+            rule = self.rules[hits.pop()[1]]
+            for element in reversed(self._stack):
+                if element[0] == rule.container:
+                    if element[2] is None:
+                        element[2] = rule
+                    break
+
+    def _drop(self, element, end):
+        """Record the span of a closed, marked element"""
+        start = element[1]
+        # An outer element swallows the spans already recorded inside it
+        while self._spans and self._spans[-1][0] >= start:
+            self._spans.pop()
+        self._spans.append((start, end))
+        self.removed.append(element[2].name)
+
+    def _emit(self, final):
+        """Cut the final part of the buffer, leaving out dropped spans"""
+        if final:
+            safe = self._offset + len(self._buffer)
+        else:
+            safe = self._scanned
+            for tag, start, rule in self._stack:
+                if tag in self.containers:
+                    safe = min(safe, start)
+                    break
+        output = []
+        position = self._offset
+        spans = self._spans
+        kept = 0
+        for span_start, span_end in spans:
+            if span_end > safe:
+                break
+            output.append(self._buffer[position - self._offset:span_start - self._offset])
+            position = span_end
+            kept += 1
+        del spans[:kept]
+        output.append(self._buffer[position - self._offset:safe - self._offset])
+        self._buffer = self._buffer[safe - self._offset:]
+        self._offset = safe
+        return "".join(output)
+
+
+def strip_watermarks(html, rules=BEEFREE_RULES):
+    """``html`` without the watermark blocks matched by ``rules``"""
+    return WatermarkStripper(rules).strip(html)
@@ -0,0 +1,62 @@
+"""
+Benchmark: per-recipient MIME building vs. the compiled message skeleton
+
+Run: python -m benchmarks.bench_mime [--messages N]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.email_sender import EmailSender
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATE = os.path.join(ROOT, "templates", "default_template.html")
+IMAGES = {
+    "banner": os.path.join(ROOT, "data", "qrcodes", "2.png"),
+    "logo": os.path.join(ROOT, "data", "qrcodes", "4.png"),
+}
+
+
+def cpu_per_message(func, messages):
+    """CPU seconds per call of ``func(i)``"""
+    start = time.process_time()
+    for i in range(messages):
+        func(i)
+    return (time.process_time() - start) / messages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=500)
+    args = parser.parse_args()
+
+    sender = EmailSender("localhost", 25, "bench@example.com", "")
+    with open(TEMPLATE, encoding="utf-8") as f:
+        body = f.read()
+
+    def personalize(i):
+        return body.replace("{{name}}", f"Recipient {i}").replace("{{link}}", f"https://example.com/u/{i}")
+
+    def rebuild(i):
+        msg = sender.build_message(f"user{i}@example.com", "Benchmark", personalize(i), IMAGES)
+        return msg.as_string()
+
+    compiled = sender.compile_message("Benchmark", IMAGES)
+
+    def splice(i):
+        return compiled.render(f"user{i}@example.com", personalize(i))
+
+    baseline = cpu_per_message(rebuild, args.messages)
+    spliced = cpu_per_message(splice, args.messages)
+
+    print(f"Messages:              {args.messages}")
+    print(f"Rebuild MIME tree:     {baseline * 1e6:10.1f} us CPU/message")
+    print(f"Compiled + splice:     {spliced * 1e6:10.1f} us CPU/message")
+    print(f"Speed-up:              {baseline / spliced:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
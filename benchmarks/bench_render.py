@@ -0,0 +1,68 @@
+"""
+Benchmark: inline rendering vs. the multi-process render pipeline
+
+Run: python -m benchmarks.bench_render [--messages N] [--workers N]
+
+Renders personalized wire-ready messages without sending them. The
+speed-up needs several cores; on a single core the pool only adds the
+cost of moving messages between processes.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.email_sender import EmailSender
+from app.render_pool import RenderPipeline
+from app.template_engine import CompiledTemplate
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATE = os.path.join(ROOT, "templates", "default_template.html")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=64)
+    args = parser.parse_args()
+
+    with open(TEMPLATE, encoding="utf-8") as f:
+        body = f.read()
+    # A heavily personalized body: greeting, link and a per-recipient note
+    body = body.replace(
+        "<body>", "<body><p>Hello {{name}}, café offer for {{city}}</p>"
+                  "<a href=\"{{link}}\">{{link}}</a><p>{{note}}</p>", 1
+    )
+    recipients = [
+        {"email": f"user{i}@example{i % 7}.com", "name": f"Recipient {i}",
+         "link": f"https://example.com/u/{i}", "city": "Alger", "note": "x" * 200}
+        for i in range(args.messages)
+    ]
+
+    sender = EmailSender("localhost", 25, "bench@example.com", "")
+    compiled = sender.compile_message("Benchmark", None)
+    template = CompiledTemplate(body)
+
+    start = time.perf_counter()
+    inline = [compiled.render(r['email'], template.render(r)) for r in recipients]
+    inline_wall = time.perf_counter() - start
+
+    pipeline = RenderPipeline(template, compiled, workers=args.workers, chunk_size=args.chunk_size)
+    start = time.perf_counter()
+    pooled = [message for _, message in pipeline.render(recipients)]
+    pooled_wall = time.perf_counter() - start
+
+    assert pooled == inline
+
+    print(f"Messages:              {args.messages} ({len(inline[0])} bytes each), {os.cpu_count()} CPUs")
+    print(f"Inline rendering:      {args.messages / inline_wall:10.0f} msgs/sec")
+    print(f"Render pool ({args.workers:>2} proc): {args.messages / pooled_wall:10.0f} msgs/sec"
+          f" (includes worker start-up)")
+    print(f"Speed-up:              {inline_wall / pooled_wall:10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark: fresh HTMLTextExtractor per preview vs. the cached TextRenderer
+
+Run: python -m benchmarks.bench_text [--edits N]
+
+For each bundled template, times a full extraction, a cache hit on
+unchanged content (an idle redraw, or the same template for every
+recipient), and re-rendering after small edits in the middle of the
+document, which only re-parses the segments that changed.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.html_parser import HTMLTextExtractor, TextRenderer, split_segments
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATES = ("default_template.html", "default_template_backup.html")
+
+
+def extract(html):
+    """What the preview did on every tick: a fresh parser over everything"""
+    parser = HTMLTextExtractor()
+    parser.feed(html)
+    parser.close()
+    return parser.get_text()
+
+
+def per_call(func, calls):
+    """Seconds per call of ``func(i)``"""
+    start = time.perf_counter()
+    for i in range(calls):
+        func(i)
+    return (time.perf_counter() - start) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--edits", type=int, default=200)
+    args = parser.parse_args()
+
+    for name in TEMPLATES:
+        with open(os.path.join(ROOT, "templates", name), encoding="utf-8") as f:
+            html = f.read()
+        renderer = TextRenderer()
+        assert renderer.render(html) == extract(html)
+
+        middle = len(html) // 2
+
+        def edited(i):
+            # Typing in the middle of the document, one keystroke per render
+            return html[:middle] + "x" * (i + 1) + html[middle:]
+
+        edits = [edited(i) for i in range(args.edits)]
+        full = per_call(lambda i: extract(edits[i]), args.edits)
+        renderer.parsed = 0
+        incremental = per_call(lambda i: renderer.render(edits[i]), args.edits)
+        parsed = renderer.parsed / args.edits
+        hit = per_call(lambda i: renderer.render(html), args.edits)
+        assert renderer.render(edits[-1]) == extract(edits[-1])
+
+        print(f"{name} ({len(html) / 1024:.0f} KB, {len(split_segments(html))} segments)")
+        print(f"  Fresh extractor per render:  {full * 1000:8.2f} ms")
+        print(f"  TextRenderer after an edit:  {incremental * 1000:8.2f} ms  "
+              f"({parsed:.1f} segments parsed, {full / incremental:.1f}x)")
+        print(f"  TextRenderer, unchanged:     {hit * 1000:8.2f} ms  ({full / hit:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
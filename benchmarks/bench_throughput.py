@@ -0,0 +1,229 @@
+"""
+Benchmark: end-to-end send throughput against the local SMTP sink
+
+Run: python -m benchmarks.bench_throughput [--messages N] [--latency S]
+                                           [--connections N] [--json]
+
+Each scenario runs in a fresh process so peak RSS is its own; the sink
+runs in this process so its CPU is not counted. Reports messages/sec,
+p50/p95/p99 send latency, CPU per message and peak RSS.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.smtp_sink import SMTPSink
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATE = os.path.join(ROOT, "templates", "default_template.html")
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of a list of numbers"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+
+def process_cpu():
+    """CPU seconds of this process plus its finished children (render workers)"""
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return time.process_time() + children.ru_utime + children.ru_stime
+
+
+def timed(owner, name, samples):
+    """Wrap ``owner.name`` so each call's wall time is appended to ``samples``"""
+    func = getattr(owner, name)
+
+    if hasattr(func, "__code__") and func.__code__.co_flags & 0x80:
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                samples.append(time.perf_counter() - start)
+    else:
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                samples.append(time.perf_counter() - start)
+    setattr(owner, name, wrapper)
+
+
+def make_config(port, connections, engine, outbox_path, render_workers=0):
+    """Campaign settings pointing at the sink with no pacing"""
+    return {
+        "server": "127.0.0.1",
+        "port": str(port),
+        "email": "bench@example.com",
+        "password": "bench",
+        "use_tls": False,
+        "delay": "0",
+        "pool_size": str(connections),
+        "engine": engine,
+        "max_in_flight": "200",
+        "retry_base_delay": "0.01",
+        "retry_max_delay": "0.1",
+        "outbox_path": outbox_path,
+        "render_workers": render_workers,
+    }
+
+
+def make_recipients(messages):
+    """Recipients spread over a handful of domains"""
+    return [
+        {"email": f"user{i}@example{i % 7}.com", "name": f"Recipient {i}",
+         "link": f"https://example.com/u/{i}"}
+        for i in range(messages)
+    ]
+
+
+def scenario_send_email(config, body, messages, samples):
+    """EmailSender.send_email one message at a time over one session"""
+    from app.email_sender import EmailSender
+
+    sender = EmailSender.from_config(config)
+    timed(sender, "deliver", samples)
+    sent = failed = 0
+    try:
+        for recipient in make_recipients(messages):
+            html = body.replace("{{name}}", recipient["name"]).replace("{{link}}", recipient["link"])
+            try:
+                sender.send_email(recipient["email"], "Benchmark", html)
+                sent += 1
+            except Exception:
+                # A dropped session reconnects on the next send
+                failed += 1
+    finally:
+        sender.disconnect()
+    return sent, failed
+
+
+def scenario_campaign(config, body, messages, samples):
+    """The full campaign loop (compiled message, outbox, scheduler, retries)"""
+    from app.async_sender import AsyncSMTPClient
+    from app.campaign import CampaignRunner
+    from app.email_sender import EmailSender
+    from app.outbox import Outbox
+
+    sender = EmailSender.from_config(config)
+    if config["engine"] == "async":
+        timed(AsyncSMTPClient, "sendmail", samples)
+    else:
+        timed(sender, "deliver", samples)
+    outbox = Outbox.from_config(config)
+    runner = CampaignRunner(sender, config, outbox)
+    try:
+        return runner.run("Benchmark", body, make_recipients(messages))
+    finally:
+        sender.disconnect()
+        outbox.close()
+
+
+SCENARIOS = {
+    "send_email": (scenario_send_email, "threads", 1),
+    "campaign-threads": (scenario_campaign, "threads", None),
+    "campaign-async": (scenario_campaign, "async", None),
+}
+
+
+def run_scenario(name, port, messages, connections, render_workers, results):
+    """Child process body: run one scenario and report its measurements"""
+    func, engine, fixed_connections = SCENARIOS[name]
+    with open(TEMPLATE, encoding="utf-8") as f:
+        body = f.read().replace("<body>", "<body><p>Hello {{name}}</p>", 1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config = make_config(port, fixed_connections or connections, engine,
+                             os.path.join(tmp, "outbox.db"), render_workers)
+        samples = []
+        wall = time.perf_counter()
+        cpu = process_cpu()
+        sent, failed = func(config, body, messages, samples)
+        cpu = process_cpu() - cpu
+        wall = time.perf_counter() - wall
+
+    results.put({
+        "scenario": name,
+        "connections": fixed_connections or connections,
+        "sent": sent,
+        "failed": failed,
+        "msgs_per_sec": sent / wall if wall else 0.0,
+        "p50_ms": percentile(samples, 0.50) * 1000,
+        "p95_ms": percentile(samples, 0.95) * 1000,
+        "p99_ms": percentile(samples, 0.99) * 1000,
+        "cpu_us_per_msg": cpu / max(1, sent + failed) * 1e6,
+        # ru_maxrss is in kilobytes on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--connections", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.0, help="sink delay per reply, seconds")
+    parser.add_argument("--fail-4xx", type=float, default=0.0)
+    parser.add_argument("--fail-5xx", type=float, default=0.0)
+    parser.add_argument("--drop", type=float, default=0.0)
+    parser.add_argument("--render-workers", type=int, default=0,
+                        help="render campaign messages in this many processes")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), action="append",
+                        help="run only this scenario (repeatable)")
+    parser.add_argument("--json", action="store_true", help="print one JSON object per scenario")
+    args = parser.parse_args()
+
+    sink = SMTPSink(latency=args.latency, fail_4xx=args.fail_4xx, fail_5xx=args.fail_5xx,
+                    drop=args.drop, seed=1).start_in_thread()
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+
+    if not args.json:
+        print(f"Sink latency {args.latency * 1000:.1f} ms/reply, {args.messages} messages per scenario")
+        print(f"{'scenario':<18}{'conns':>6}{'msgs/s':>10}{'p50 ms':>9}{'p95 ms':>9}"
+              f"{'p99 ms':>9}{'CPU us/msg':>12}{'RSS MB':>9}{'failed':>8}")
+    try:
+        for name in args.scenario or list(SCENARIOS):
+            child = context.Process(
+                target=run_scenario,
+                args=(name, sink.port, args.messages, args.connections, args.render_workers, results)
+            )
+            child.start()
+            result = None
+            while result is None:
+                alive = child.is_alive()
+                try:
+                    result = results.get(timeout=1)
+                except queue.Empty:
+                    if not alive:
+                        break
+            child.join()
+            if result is None:
+                print(f"{name}: scenario crashed (exit code {child.exitcode})", file=sys.stderr)
+                continue
+            if args.json:
+                print(json.dumps(result))
+            else:
+                print(f"{result['scenario']:<18}{result['connections']:>6}"
+                      f"{result['msgs_per_sec']:>10.0f}{result['p50_ms']:>9.2f}"
+                      f"{result['p95_ms']:>9.2f}{result['p99_ms']:>9.2f}"
+                      f"{result['cpu_us_per_msg']:>12.0f}{result['peak_rss_mb']:>9.1f}"
+                      f"{result['failed']:>8}")
+    finally:
+        sink.stop()
+
+
+if __name__ == "__main__":
+    main()
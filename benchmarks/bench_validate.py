@@ -0,0 +1,116 @@
+"""
+Benchmark: per-line re.match vs. precompiled, domain-cached batch validation
+
+Run: python -m benchmarks.bench_validate [--addresses N] [--domains N]
+
+Writes a file of N addresses (about 3% malformed and 1% on disposable
+domains, spread over a long tail of domains), then validates it line by
+line the way parse_recipients used to, with the stricter precompiled
+grammar, and with full domain checks (disposable list and a counting
+stand-in resolver) with and without the per-domain verdict cache.
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.validation import VALID, Validator, valid_address, valid_domain
+
+PATTERN = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+
+
+def write_addresses(path, count, domains, seed=7):
+    """Write ``count`` synthetic addresses, one per line"""
+    rng = random.Random(seed)
+    names = [f"domain{i}.{rng.choice(['com', 'net', 'org', 'fr', 'dz'])}" for i in range(domains)]
+    # A few big providers and a long tail, as in real lists
+    names[:4] = ["gmail.com", "yahoo.com", "outlook.com", "hotmail.com"]
+    weights = [40, 15, 10, 5] + [30 / max(1, domains - 4)] * (domains - 4)
+    with open(path, "w", encoding="utf-8") as f:
+        for i, domain in enumerate(rng.choices(names, weights, k=count)):
+            chance = rng.random()
+            if chance < 0.03:
+                f.write(f"user{i}@@{domain}\n" if chance < 0.015 else f"user {i}@{domain}\n")
+            elif chance < 0.04:
+                f.write(f"user{i}@mailinator.com\n")
+            else:
+                f.write(f"first.last{i}@{domain}\n")
+
+
+def timed(func, lines):
+    """(seconds, result) for ``func(lines)``"""
+    start = time.perf_counter()
+    result = func(lines)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--addresses", type=int, default=1_000_000)
+    parser.add_argument("--domains", type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "addresses.txt")
+        write_addresses(path, args.addresses, args.domains)
+        with open(path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+
+    def inline_pattern(lines):
+        # What parse_recipients did: the pattern string looked up per call
+        return sum(1 for line in lines if re.match(PATTERN, line))
+
+    def precompiled(lines):
+        valid_domain.cache_clear()
+        return sum(1 for line in lines if valid_address(line))
+
+    def per_address(lines):
+        # Full checks with no domain cache: every address pays for its domain
+        validator = Validator(resolver=resolver)
+        kept = 0
+        for line in lines:
+            validator.verdicts.clear()
+            kept += validator.verdict(line) == VALID
+        return kept
+
+    def batched(lines):
+        validator = Validator(resolver=resolver)
+        kept = 0
+        for start in range(0, len(lines), validator.batch_size):
+            valid, _ = validator.split({"email": line} for line in lines[start:start + validator.batch_size])
+            kept += len(valid)
+        return kept, validator
+
+    # An instant stand-in for DNS that counts the lookups asked for
+    lookups = []
+
+    def resolver(domain):
+        lookups.append(domain)
+        return True
+
+    baseline, baseline_valid = timed(inline_pattern, lines)
+    syntax, syntax_valid = timed(precompiled, lines)
+    uncached, uncached_valid = timed(per_address, lines)
+    uncached_lookups = len(lookups)
+    lookups.clear()
+    batch, (batch_valid, validator) = timed(batched, lines)
+
+    print(f"Addresses:                      {args.addresses} over {args.domains} domains")
+    print(f"re.match per line (old syntax): {args.addresses / baseline:12.0f} addr/sec  ({baseline_valid} valid)")
+    print(f"valid_address (RFC syntax):     {args.addresses / syntax:12.0f} addr/sec  ({syntax_valid} valid)")
+    print(f"Full checks, no domain cache:   {args.addresses / uncached:12.0f} addr/sec  ({uncached_valid} valid, "
+          f"{uncached_lookups} resolver lookups)")
+    print(f"Validator batches, cached:      {args.addresses / batch:12.0f} addr/sec  ({batch_valid} valid, "
+          f"{len(lookups)} resolver lookups)")
+    print(f"                                {validator.summary()}")
+    print(f"Full-check speed-up:            {uncached / batch:12.2f}x (before any real DNS latency;"
+          f" at 20 ms a lookup the cache saves {(uncached_lookups - len(lookups)) * 0.02 / 3600:.1f} h)")
+
+
+if __name__ == "__main__":
+    main()
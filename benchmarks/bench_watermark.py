@@ -0,0 +1,90 @@
+"""
+Benchmark: DOTALL watermark regexes vs. the one-pass WatermarkStripper
+
+Run: python -m benchmarks.bench_watermark [--repeat N]
+
+Each bundled template is stripped as shipped (no watermark, the regexes'
+worst case: every <tr> scans to the end looking for the logo) and with a
+Beefree-style footer appended, each also concatenated four times to show
+how the two approaches scale with document size. "Removed" shows how much
+of the document each approach deletes.
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.watermark import WatermarkStripper, strip_watermarks
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATES = ("default_template.html", "default_template_backup.html")
+
+# The footer Beefree adds to exported templates (trimmed)
+FOOTER = """<table class="row row-9" align="center" width="100%" border="0" role="presentation"><tbody><tr><td>
+<table class="row-content stack" align="center"><tbody><tr><td class="column column-1" width="100%">
+<table class="icons_block block-1" width="100%"><tr><td class="pad"><table width="100%"><tr><td class="alignment">
+<table class="icons-inner" cellpadding="0" cellspacing="0" role="presentation"><tr>
+<td style="vertical-align: middle;"><a href="http://designedwithbeefree.com/" target="_blank"><img class="icon" alt="Beefree Logo" src="https://d1oco4z2z1fhwp.cloudfront.net/assets/Beefree-logo.png" height="auto" width="34"></a></td>
+<td style="font-family: Arial;"><a href="http://designedwithbeefree.com/" target="_blank">Designed with Beefree</a></td>
+</tr></table></td></tr></table></td></tr></table>
+</td></tr></tbody></table></td></tr></tbody></table>"""
+
+LOGO_RE = re.compile(r'<tr>.*?Beefree-logo\.png.*?</tr>', re.IGNORECASE | re.DOTALL)
+LINK_RE = re.compile(r'<table.*?designedwithbeefree\.com.*?</table>', re.IGNORECASE | re.DOTALL)
+
+
+def regex_strip(html):
+    """What remove_beefree_watermark did"""
+    return LINK_RE.sub('', LOGO_RE.sub('', html))
+
+
+def streamed(html, chunk=8192):
+    """The stripper fed in pieces, as a streamed body would be"""
+    stripper = WatermarkStripper()
+    output = [stripper.feed(html[i:i + chunk]) for i in range(0, len(html), chunk)]
+    output.append(stripper.close())
+    return "".join(output)
+
+
+def per_call(func, html, repeat):
+    """Milliseconds per call of ``func(html)``"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(html)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'Document':<42} {'KB':>5} {'regex ms':>9} {'one-pass ms':>12} "
+          f"{'regex removed':>14} {'one-pass removed':>17}")
+    for name in TEMPLATES:
+        with open(os.path.join(ROOT, "templates", name), encoding="utf-8") as f:
+            html = f.read()
+        body = html.rfind("</body>")
+        watermarked = html[:body] + FOOTER + html[body:]
+        cases = (
+            (name, html),
+            (name + " x4", html * 4),
+            (name + " + footer", watermarked),
+            (name + " + footer x4", watermarked * 4),
+        )
+        for label, document in cases:
+            old = regex_strip(document)
+            new = strip_watermarks(document)
+            assert streamed(document) == new
+            assert "Beefree" not in new
+            old_ms = per_call(regex_strip, document, args.repeat)
+            new_ms = per_call(strip_watermarks, document, args.repeat)
+            print(f"{label:<42} {len(document) / 1024:5.0f} {old_ms:9.2f} {new_ms:12.2f} "
+                  f"{len(document) - len(old):14,} {len(document) - len(new):17,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Local SMTP sink for benchmarks: accepts and discards mail over plaintext SMTP
+
+Run: python -m benchmarks.smtp_sink [--port 2525] [--latency 0.005]
+                                    [--fail-4xx 0.01] [--fail-5xx 0.01] [--drop 0.001]
+
+Point the app at it with server 127.0.0.1, the chosen port and
+"use_tls": false. Any AUTH is accepted.
+"""
+import argparse
+import asyncio
+import random
+import threading
+
+
+class SMTPSink:
+    """Minimal asyncio SMTP server with latency and fault injection
+
+    Every reply is delayed by ``latency`` seconds. Each RCPT is answered
+    with a 451 with probability ``fail_4xx`` or a 550 with probability
+    ``fail_5xx``, and after any command the connection is dropped without
+    a reply with probability ``drop``. EHLO advertises PIPELINING, so
+    pipelined clients are exercised as well.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, fail_4xx=0.0,
+                 fail_5xx=0.0, drop=0.0, seed=None):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.fail_4xx = fail_4xx
+        self.fail_5xx = fail_5xx
+        self.drop = drop
+        self.random = random.Random(seed)
+        self.messages = 0
+        self.bytes = 0
+        self.connections = 0
+        self.dropped = 0
+        self.rejected = 0
+        self._server = None
+        self._loop = None
+
+    async def start(self):
+        """Start listening; ``port`` is updated if 0 was requested"""
+        self._server = await asyncio.start_server(self.handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        """Start and serve until cancelled"""
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    def start_in_thread(self):
+        """Serve from a daemon thread; returns once the port is bound"""
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.start())
+            ready.set()
+            self._loop.run_forever()
+
+        threading.Thread(target=run, daemon=True).start()
+        ready.wait()
+        return self
+
+    def stop(self):
+        """Stop a sink started with ``start_in_thread``"""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._server.close)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+    async def reply(self, writer, text):
+        """Send one (possibly multi-line) reply after the configured latency"""
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        writer.write(text)
+        await writer.drain()
+
+    async def handle(self, reader, writer):
+        """Serve one SMTP session"""
+        self.connections += 1
+        try:
+            await self.reply(writer, b"220 sink ESMTP ready\r\n")
+            accepted = 0
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if self.drop and self.random.random() < self.drop:
+                    self.dropped += 1
+                    break
+
+                verb = line[:4].upper()
+                if verb in (b"EHLO", b"HELO"):
+                    await self.reply(writer, b"250-sink\r\n250-PIPELINING\r\n250-8BITMIME\r\n"
+                                             b"250 AUTH PLAIN LOGIN\r\n")
+                elif verb == b"AUTH":
+                    if line.split()[1:2] == [b"LOGIN"] and len(line.split()) == 2:
+                        # Username and password prompts
+                        await self.reply(writer, b"334 VXNlcm5hbWU6\r\n")
+                        await reader.readline()
+                        await self.reply(writer, b"334 UGFzc3dvcmQ6\r\n")
+                        await reader.readline()
+                    await self.reply(writer, b"235 2.7.0 Authentication successful\r\n")
+                elif verb == b"RCPT":
+                    chance = self.random.random()
+                    if chance < self.fail_4xx:
+                        self.rejected += 1
+                        await self.reply(writer, b"451 4.7.1 Try again later\r\n")
+                    elif chance < self.fail_4xx + self.fail_5xx:
+                        self.rejected += 1
+                        await self.reply(writer, b"550 5.1.1 No such user\r\n")
+                    else:
+                        accepted += 1
+                        await self.reply(writer, b"250 2.1.5 OK\r\n")
+                elif verb == b"DATA" and not accepted:
+                    await self.reply(writer, b"554 5.5.1 No valid recipients\r\n")
+                elif verb == b"DATA":
+                    accepted = 0
+                    await self.reply(writer, b"354 End data with <CR><LF>.<CR><LF>\r\n")
+                    size = 0
+                    while True:
+                        data = await reader.readline()
+                        if not data or data == b".\r\n":
+                            break
+                        size += len(data)
+                    if not data:
+                        break
+                    self.messages += 1
+                    self.bytes += size
+                    await self.reply(writer, b"250 2.0.0 Queued\r\n")
+                elif verb == b"QUIT":
+                    await self.reply(writer, b"221 2.0.0 Bye\r\n")
+                    break
+                elif verb == b"STAR":
+                    await self.reply(writer, b"454 4.7.0 TLS not available\r\n")
+                else:
+                    # MAIL, RSET, NOOP and anything else
+                    if verb in (b"MAIL", b"RSET"):
+                        accepted = 0
+                    await self.reply(writer, b"250 2.0.0 OK\r\n")
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local SMTP sink with fault injection")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=2525)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds before each reply")
+    parser.add_argument("--fail-4xx", type=float, default=0.0, help="probability of a 451 per RCPT")
+    parser.add_argument("--fail-5xx", type=float, default=0.0, help="probability of a 550 per RCPT")
+    parser.add_argument("--drop", type=float, default=0.0, help="probability of dropping the connection per command")
+    args = parser.parse_args()
+
+    sink = SMTPSink(args.host, args.port, args.latency, args.fail_4xx, args.fail_5xx, args.drop)
+    print(f"SMTP sink listening on {args.host}:{args.port} (Ctrl+C to stop)")
+    try:
+        asyncio.run(sink.serve_forever())
+    except KeyboardInterrupt:
+        print(f"\n{sink.messages} messages, {sink.connections} connections, "
+              f"{sink.rejected} rejected, {sink.dropped} dropped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,12 @@
+"""
+Email Campaign Manager - Headless Entry Point
+Send a campaign from the command line, e.g. on a server or from cron:
+
+    python send_campaign.py template.html recipients.csv --subject "Hello"
+"""
+import sys
+from app.cli import main
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -26,19 +26,26 @@ from tkinter import ttk, scrolledtext, filedialog, messagebox
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from email.mime.image import MIMEImage
 from email.mime.base import MIMEBase
 from email import encoders
 import csv
 import json
 import os
-import time
-import random
 from datetime import datetime
 import re
 from html.parser import HTMLParser
 import tempfile
+import threading
 import webbrowser
+from app.rate_limiter import RateLimiter, recipient_domain
+from app.event_bus import EventBus
+from app.image_cache import ImagePartCache
+from app.import_job import ImportJob
+from app.template_engine import CompiledTemplate
+from app.validation import valid_address
+from app.watermark import BEEFREE_RULES, strip_watermarks
+from app.ui.status_log import StatusLog
+from app.ui.text_watcher import TextChangeWatcher
 
 
 class HTMLTextExtractor(HTMLParser):
@@ -109,7 +116,9 @@ class BulkEmailSender:
         self.notebook.add(self.compose_frame, text="  ✍️  Compose  ")
         self.notebook.add(self.send_frame, text="  🚀  Send  ")
         self.HTMLTextExtractor = HTMLTextExtractor
-        self.schedule_preview_update()
+        # The preview follows edits instead of being redrawn every second
+        self.preview_watcher = TextChangeWatcher(self.html_editor, self._on_editor_changed)
+        self.preview_watcher.check()
 
     def setup_styles(self):
         style = ttk.Style()
@@ -795,6 +804,15 @@ class BulkEmailSender:
                    command=self.clear_recipients,
                    style="Warning.TButton").pack(side=tk.LEFT, padx=8)
 
+        # Shown while a file is loading in the background
+        self.import_cancel_btn = ttk.Button(import_frame, text="⏹ Cancel Import",
+                                            command=self.cancel_import,
+                                            style="Warning.TButton")
+        self.import_status_label = ttk.Label(card, text="", foreground="#94a3b8",
+                                             font=("Segoe UI", 10))
+        self.import_buttons_frame = import_frame
+        self.import_job = None
+
         ttk.Label(card, text="Recipients List:",
                   style="Subheader.TLabel").pack(anchor="w", pady=(15, 8))
 
@@ -878,6 +896,9 @@ class BulkEmailSender:
             highlightbackground="#252550"
         )
         self.status_text.pack(fill=tk.BOTH, expand=True, pady=(0, 20))
+        self.status_log = StatusLog(self.status_text, max_lines=1000)
+        self.events = EventBus(max_lines=1000)
+        self.is_sending = False
 
         self.send_button = ttk.Button(
             card,
@@ -988,11 +1009,11 @@ class BulkEmailSender:
             webbrowser.open('file://' + self.temp_html_file, new=0)
 
 
-    def schedule_preview_update(self):
+    def _on_editor_changed(self, content):
+        """Refresh the previews once edits pause and the HTML really changed"""
         self.update_text_preview()
         if self.temp_html_file and os.path.exists(self.temp_html_file):
             self._update_temp_file()
-        self.root.after(1000, self.schedule_preview_update)
 
     def _remove_beefree_watermark(self, html_content):
         """
@@ -1000,20 +1021,7 @@ class BulkEmailSender:
         and the Beefree logo image from the HTML content.
         """
 
-        pattern = re.compile(
-            r'<tr>.*?Beefree-logo\.png.*?</tr>',
-            re.IGNORECASE | re.DOTALL
-        )
-
-        cleaned_html = pattern.sub('', html_content)
-
-        pattern_2 = re.compile(
-            r'<table.*?designedwithbeefree\.com.*?</table>',
-            re.IGNORECASE | re.DOTALL
-        )
-        cleaned_html = pattern_2.sub('', cleaned_html)
-
-        return cleaned_html
+        return strip_watermarks(html_content, BEEFREE_RULES)
 
     def _chunk_list(self, recipients_list, chunk_size):
         """Yield successive n-sized chunks from list."""
@@ -1026,6 +1034,12 @@ class BulkEmailSender:
             messagebox.showerror("Error", "❌ Please configure SMTP settings first!")
             return
 
+        try:
+            port = int(self.smtp_port.get())
+        except ValueError:
+            messagebox.showerror("Error", "❌ SMTP port must be a number!")
+            return
+
         # Use default subject if empty
         subject = self.email_subject.get().strip()
         if not subject:
@@ -1045,7 +1059,7 @@ class BulkEmailSender:
             return
 
         self.send_button.config(state="disabled")
-        self.status_text.delete("1.0", tk.END)
+        self.status_log.clear()
         self.log_status(f"📧 Starting campaign for {len(recipient_emails)} recipients...")
 
         try:
@@ -1055,29 +1069,56 @@ class BulkEmailSender:
         except:
             delay = 10
 
+        # Everything the worker needs is read from the widgets here, on the
+        # Tk thread; the worker only publishes to the event bus
+        settings = {
+            "delay": delay,
+            "html": self.html_editor.get("1.0", tk.END),
+            "server": self.smtp_server.get(),
+            "port": port,
+            "email": self.smtp_email.get(),
+            "password": self.smtp_password.get(),
+            "reply_to": self.reply_to_email.get().strip(),
+            "images": dict(self.embedded_images),
+        }
+        self.is_sending = True
+        threading.Thread(
+            target=self._send_campaign,
+            args=(subject, recipients_data, recipient_emails, settings),
+            daemon=True
+        ).start()
+        self._pump_events()
+
+    def _send_campaign(self, subject, recipients_data, recipient_emails, settings):
+        """Worker thread: send the batches, reporting through the event bus"""
+        delay = settings["delay"]
         BATCH_SIZE = 100
+        limiter = RateLimiter(global_rate=1.0 / delay)
+        # Images and repeated QR codes are read and encoded once per campaign
+        image_cache = ImagePartCache()
 
-        original_html_content = self.html_editor.get("1.0", tk.END)
+        original_html_content = settings["html"]
         cleaned_html_content = self._remove_beefree_watermark(original_html_content)
+        template = CompiledTemplate(cleaned_html_content)
 
         server = None
         total_sent = 0
         total_batches = 0
 
         try:
-            server = smtplib.SMTP(self.smtp_server.get(), int(self.smtp_port.get()))
+            server = smtplib.SMTP(settings["server"], settings["port"])
             server.starttls()
-            server.login(self.smtp_email.get(), self.smtp_password.get())
+            server.login(settings["email"], settings["password"])
 
             # batches = list(self._chunk_list(recipient_emails, BATCH_SIZE))
             batches = list(self._chunk_list(recipient_emails, 1))
             total_batches = len(batches)
 
             # تحديد عنوان الرد (Reply-To)
-            reply_to = self.reply_to_email.get().strip()
+            reply_to = settings["reply_to"]
             if not reply_to:
                 # إذا تُرك فارغاً، استخدم بريد الإرسال (Your Email)
-                reply_to = self.smtp_email.get()
+                reply_to = settings["email"]
 
             # تحديد محتوى الرسالة النهائي (مع إزالة التخصيص)
             # final_html_content = cleaned_html_content.replace("{{name}}", recipients_data[0]['name'] if recipients_data else "Valued Customer")
@@ -1090,22 +1131,22 @@ class BulkEmailSender:
                 # Get recipient data for this batch
                 recipient_data = recipients_data[batch_idx] if batch_idx < len(recipients_data) else {}
                 
-                # Replace template variables
-                temp_html = cleaned_html_content.replace("{{name}}", recipient_data.get('name', 'Valued Customer'))
-                temp_html = temp_html.replace("{{link}}", recipient_data.get('link', '#'))
-                
                 # Check if recipient has a QR code - if yes, prepare to embed it
                 has_qrcode = recipient_data.get('qrcode', '') != ''
-                if has_qrcode:
-                    # Replace {{qrcode}} placeholder with cid reference
-                    temp_html = temp_html.replace("{{qrcode}}", "cid:qrcode")
                 
-                final_html_content = temp_html
+                # Replace template variables ({{qrcode}} becomes a cid reference)
+                values = {
+                    'name': recipient_data.get('name', 'Valued Customer'),
+                    'link': recipient_data.get('link', '#'),
+                }
+                if has_qrcode:
+                    values['qrcode'] = "cid:qrcode"
+                final_html_content = template.render(values)
                 self.log_status(f"Preparing email content...")
 
                 msg = MIMEMultipart('related')  # Changed to 'related' for inline images
-                msg['From'] = self.smtp_email.get()
-                msg['To'] = self.smtp_email.get()
+                msg['From'] = settings["email"]
+                msg['To'] = settings["email"]
                 msg['Subject'] = subject
                 msg['Reply-To'] = reply_to
 
@@ -1113,14 +1154,9 @@ class BulkEmailSender:
                 msg.attach(html_part)
                 
                 # Embed static images (uploaded via Upload Images button)
-                for cid_name, image_path in self.embedded_images.items():
+                for cid_name, image_path in settings["images"].items():
                     try:
-                        with open(image_path, 'rb') as img_file:
-                            img_data = img_file.read()
-                            image = MIMEImage(img_data)
-                            image.add_header('Content-ID', f'<{cid_name}>')
-                            image.add_header('Content-Disposition', 'inline', filename=os.path.basename(image_path))
-                            msg.attach(image)
+                        msg.attach(image_cache.part(image_path, cid_name, os.path.basename(image_path)))
                     except Exception as img_error:
                         self.log_status(f"⚠️ Could not embed {os.path.basename(image_path)}: {str(img_error)}")
                 
@@ -1129,20 +1165,20 @@ class BulkEmailSender:
                     qrcode_path = recipient_data['qrcode']
                     if os.path.exists(qrcode_path):
                         try:
-                            with open(qrcode_path, 'rb') as qr_file:
-                                qr_data = qr_file.read()
-                                qr_image = MIMEImage(qr_data)
-                                qr_image.add_header('Content-ID', '<qrcode>')
-                                qr_image.add_header('Content-Disposition', 'inline', filename='qrcode.png')
-                                msg.attach(qr_image)
+                            msg.attach(image_cache.part(qrcode_path, 'qrcode', 'qrcode.png'))
                         except Exception as qr_error:
                             self.log_status(f"⚠️ Could not embed QR code for {recipient_data.get('email')}: {str(qr_error)}")
                     else:
                         self.log_status(f"⚠️ QR code file not found: {qrcode_path}")
 
+                # Token bucket replaces the fixed sleep: slow sends count towards the delay
+                waited = limiter.acquire(account=settings["email"], domain=recipient_domain(batch[0]))
+                if waited > 0:
+                    self.log_status(f"😴 Waited {waited:.1f} seconds for the rate limit...")
+
                 # الإرسال الفعلي، حيث يتم تمرير 'batch' كقائمة مستلمين، وهي تعمل كـ BCC
                 server.sendmail(
-                    from_addr=self.smtp_email.get(),
+                    from_addr=settings["email"],
                     to_addrs=batch,
                     msg=msg.as_string()
                 )
@@ -1151,12 +1187,7 @@ class BulkEmailSender:
                 self.log_status(f"✅ Batch {batch_idx + 1} sent successfully. ({total_sent} total emails)")
 
                 progress = ((batch_idx + 1) / total_batches) * 100
-                self.progress_var.set(progress)
-
-                if batch_idx < total_batches - 1:
-                    sleep_time = delay + random.uniform(0, 1)
-                    self.log_status(f"😴 Waiting for {sleep_time:.1f} seconds before next batch...")
-                    time.sleep(sleep_time)
+                self.events.publish("progress", progress)
 
             server.quit()
 
@@ -1165,12 +1196,12 @@ class BulkEmailSender:
             self.log_status(f"✅ Successful: {total_sent}")
             self.log_status(f"Total Sent: {total_sent} (in {total_batches} batches)")
 
-            messagebox.showinfo("Complete",
-                                 f"Campaign finished!\n✅ Sent: {total_sent} recipients in {total_batches} batches.")
+            self.events.publish("finished", "Complete",
+                                f"Campaign finished!\n✅ Sent: {total_sent} recipients in {total_batches} batches.")
 
         except Exception as e:
             self.log_status(f"❌ Fatal error during campaign: {str(e)}")
-            messagebox.showerror("Error", f"❌ Campaign failed: {str(e)}")
+            self.events.publish("finished", "Error", f"❌ Campaign failed: {str(e)}")
 
         finally:
             if server:
@@ -1178,8 +1209,32 @@ class BulkEmailSender:
                     server.quit()
                 except:
                     pass
-            self.send_button.config(state="normal")
-            self.progress_var.set(0)
+
+    def _pump_events(self):
+        """Apply the worker's events on the Tk thread, every 100 ms while sending"""
+        events, lines = self.events.drain()
+        self.status_log.write(lines)
+        progress = None
+        finished = None
+        for kind, args in events:
+            if kind == "progress":
+                progress = args[0]
+            elif kind == "finished" and finished is None:
+                finished = args
+        if progress is not None:
+            self.progress_var.set(progress)
+        if finished is None:
+            if self.is_sending:
+                self.root.after(100, self._pump_events)
+            return
+        self.is_sending = False
+        self.send_button.config(state="normal")
+        self.progress_var.set(0)
+        title, message = finished
+        if title == "Error":
+            messagebox.showerror(title, message)
+        elif title is not None:
+            messagebox.showinfo(title, message)
 
 
     def load_smtp_config(self):
@@ -1229,41 +1284,100 @@ class BulkEmailSender:
                     self.html_editor.delete("1.0", tk.END)
                     self.html_editor.insert("1.0", f.read())
                 messagebox.showinfo("Success", "✅ Template loaded successfully!")
-                self.update_text_preview()
+                self.preview_watcher.check()
             except Exception as e:
                 messagebox.showerror("Error", f"❌ Failed to load template: {str(e)}")
 
     def import_recipients(self, file_type):
+        if self.import_job is not None:
+            messagebox.showwarning("Warning", "An import is already running!")
+            return
+
         if file_type == "csv":
             filename = filedialog.askopenfilename(
                 title="Select CSV File",
                 filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
             )
-            if filename:
-                try:
-                    with open(filename, 'r', encoding='utf-8') as f:
-                        reader = csv.reader(f)
-                        for row in reader:
-                            if row:
-                                self.recipients_text.insert(tk.END, ','.join(row) + '\n')
-                    messagebox.showinfo("Success", "✅ Recipients imported successfully!")
-                except Exception as e:
-                    messagebox.showerror("Error", f"❌ Failed to import: {str(e)}")
-
         elif file_type == "txt":
             filename = filedialog.askopenfilename(
                 title="Select TXT File",
                 filetypes=[("Text files", "*.txt"), ("All files", "*.*")]
             )
-            if filename:
-                try:
-                    with open(filename, 'r', encoding='utf-8') as f:
-                        self.recipients_text.insert(tk.END, f.read())
-                    messagebox.showinfo("Success", "✅ Recipients imported successfully!")
-                except Exception as e:
-                    messagebox.showerror("Error", f"❌ Failed to import: {str(e)}")
+        else:
+            return
+        if not filename:
+            return
+
+        # The file is read on a worker thread in chunks of lines and each
+        # chunk is appended to the text box from the Tk thread
+        self.recipients_text.mark_set("import_start", "end-1c")
+        self.recipients_text.mark_gravity("import_start", tk.LEFT)
+        self.import_job = ImportJob(
+            lambda job: self._read_recipients_file(job, filename, file_type == "csv"),
+            filename
+        ).start()
+        self.import_cancel_btn.pack(side=tk.LEFT, padx=8)
+        self.import_status_label.pack(anchor="w", pady=(0, 8), after=self.import_buttons_frame)
+        self._poll_import()
+
+    @staticmethod
+    def _read_recipients_file(job, filename, is_csv, chunk_lines=5000):
+        """Worker: hand the file to the UI ``chunk_lines`` lines at a time"""
+        with open(filename, 'rb') as f:
+            position = 0
+            rows = 0
+
+            def lines():
+                nonlocal position
+                for raw in f:
+                    position += len(raw)
+                    yield raw.decode('utf-8', errors='replace')
+
+            source = (','.join(row) + '\n' for row in csv.reader(lines()) if row) if is_csv else lines()
+            chunk = []
+            for line in source:
+                chunk.append(line if line.endswith('\n') else line + '\n')
+                if len(chunk) >= chunk_lines:
+                    rows += len(chunk)
+                    if not job.report(rows, position, batch=''.join(chunk)):
+                        return rows
+                    chunk = []
+            rows += len(chunk)
+            job.report(rows, position, batch=''.join(chunk))
+            return rows
+
+    def _poll_import(self):
+        """Append waiting chunks and show progress; runs on the Tk thread"""
+        job = self.import_job
+        for kind, value in job.events(limit=4):
+            if kind == "batch":
+                if not job.cancelled:
+                    self.recipients_text.insert(tk.END, value)
+                continue
+            self.import_job = None
+            self.import_cancel_btn.pack_forget()
+            self.import_status_label.pack_forget()
+            if kind == "done":
+                messagebox.showinfo("Success", f"✅ {value:,} recipients imported!")
+            elif kind == "cancelled":
+                self.recipients_text.delete("import_start", tk.END)
+                messagebox.showinfo("Import", "Import cancelled.")
+            else:
+                self.recipients_text.delete("import_start", tk.END)
+                messagebox.showerror("Error", f"❌ Failed to import: {str(value)}")
+            return
+        prefix = "⏹ Cancelling…  " if job.cancelled else f"⏳ Importing {os.path.basename(job.path)}:  "
+        self.import_status_label.config(text=prefix + job.status())
+        self.root.after(100, self._poll_import)
+
+    def cancel_import(self):
+        if self.import_job is not None:
+            self.import_job.cancel()
 
     def clear_recipients(self):
+        if self.import_job is not None:
+            messagebox.showwarning("Warning", "Cancel the running import first.")
+            return
         if messagebox.askyesno("Confirm", "Are you sure you want to clear all recipients?"):
             self.recipients_text.delete("1.0", tk.END)
 
@@ -1325,7 +1439,7 @@ class BulkEmailSender:
                 link = "#"
                 qrcode_path = ""
 
-            if re.match(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', email):
+            if valid_address(email):
                 recipients.append({
                     "email": email, 
                     "name": name if name else "Valued Customer", 
@@ -1336,10 +1450,10 @@ class BulkEmailSender:
         return recipients
 
     def log_status(self, message):
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        self.status_text.insert(tk.END, f"[{timestamp}] {message}\n")
-        self.status_text.see(tk.END)
-        self.root.update()
+        """Log a status line; safe from the send thread"""
+        self.events.log(message)
+        if not self.is_sending and threading.current_thread() is threading.main_thread():
+            self._pump_events()
 
 def main():
     """Main application entry point"""